@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent requests: thread pool + Session vs asyncio AsyncClient.
+
+Starts a local stub HTTP server in a child process (so its handler threads
+do not compete with the client for the GIL) and sends the same number of requests with
+*concurrency* in flight, once from a thread pool sharing a :class:`Session`
+and once from a single event loop sharing an :class:`AsyncClient`.
+
+Usage:
+    python benchmarks/bench_async.py [--requests 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from scripts.dataforseo import AsyncClient, Session, async_make_request, make_request  # noqa: E402
+
+SERVER_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from tests.conftest import StubAPIServer
+with StubAPIServer() as server:
+    print(server.base_url, flush=True)
+    sys.stdin.read()
+"""
+
+
+def _run_threads(n: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    with Session(max_per_host=concurrency) as session, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(make_request, "/v3/bench", body={"keyword": "seo"}, username="u", password="p", session=session)
+            for _ in range(n)
+        ]
+        for future in futures:
+            assert future.result()["status"] == "ok", future.result()
+    return n / (time.perf_counter() - start)
+
+
+async def _run_async(n: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    async with AsyncClient(max_per_host=concurrency) as client:
+        results = await asyncio.gather(*(
+            async_make_request("/v3/bench", body={"keyword": "seo"}, username="u", password="p", client=client)
+            for _ in range(n)
+        ))
+    assert all(result["status"] == "ok" for result in results)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, PROJECT_ROOT], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        base_url = server.stdout.readline().strip()
+        with patch("scripts.dataforseo.BASE_URL", base_url):
+            threaded = _run_threads(args.requests, args.concurrency)
+            evented = asyncio.run(_run_async(args.requests, args.concurrency))
+    finally:
+        server.stdin.close()
+        server.wait()
+
+    print(f"requests:        {args.requests} ({args.concurrency} in flight)")
+    print(f"threads+Session: {threaded:8.1f} req/s")
+    print(f"AsyncClient:     {evented:8.1f} req/s")
+    print(f"speedup:         {evented / threaded:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark compiled field projection against filter_fields.
+
+Builds a synthetic full-format SERP response (one task result with N items)
+and times ``filter_fields`` versus a cached :class:`FieldProjector` for a
+few typical ``--fields`` specs.  Outputs are checked for equality first.
+
+Usage:
+    python benchmarks/bench_fields.py [--items 1000] [--repeat 20]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from scripts.dataforseo import compile_fields, filter_fields  # noqa: E402
+
+SPECS = {
+    "1 path": "*.items.*.url",
+    "4 paths": "*.items.*.url,*.items.*.title,*.items.*.rank_group,*.items.*.domain",
+    "10 paths": ",".join(
+        f"*.items.*.{field}"
+        for field in (
+            "type", "rank_group", "rank_absolute", "domain", "title",
+            "url", "description", "breadcrumb", "rating.value", "links.*.url",
+        )
+    ),
+}
+
+
+def _serp_response(n: int) -> list:
+    return [
+        {
+            "keyword": "seo tools",
+            "type": "organic",
+            "se_domain": "google.com",
+            "items_count": n,
+            "items": [
+                {
+                    "type": "organic",
+                    "rank_group": i,
+                    "rank_absolute": i + 1,
+                    "domain": f"site{i}.com",
+                    "title": f"Result {i}",
+                    "url": f"https://site{i}.com/page",
+                    "description": "lorem ipsum " * 10,
+                    "breadcrumb": f"https://site{i}.com > page",
+                    "is_featured_snippet": False,
+                    "rating": {"rating_type": "Max5", "value": 4.5, "votes_count": i},
+                    "links": [{"type": "link_element", "title": "t", "url": f"https://site{i}.com/{j}"} for j in range(4)],
+                    "about_this_result": {"source_info": "x" * 50, "search_terms": ["seo", "tools"]},
+                }
+                for i in range(n)
+            ],
+        }
+    ]
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = _serp_response(args.items)
+    print(f"items: {args.items}, repeat: {args.repeat}")
+    print(f"{'spec':<10} {'filter_fields':>14} {'FieldProjector':>15} {'speedup':>8}")
+    for name, spec in SPECS.items():
+        assert compile_fields(spec).project(data) == filter_fields(copy.deepcopy(data), spec)
+        legacy = _time(lambda: filter_fields(data, spec), args.repeat)
+        compiled = _time(lambda: compile_fields(spec).project(data), args.repeat)
+        print(f"{name:<10} {legacy * 1000:>12.2f}ms {compiled * 1000:>13.2f}ms {legacy / compiled:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark make_request throughput with and without a pooled Session.
+
+Starts a local stub HTTPS server (self-signed certificate generated with the
+``openssl`` CLI) and measures requests/sec for one-off ``urllib`` connections
+versus keep-alive connections from a :class:`Session`.
+
+Usage:
+    python benchmarks/bench_pool.py [--requests 300]
+"""
+
+import argparse
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from scripts.dataforseo import Session, make_request  # noqa: E402
+from tests.conftest import StubAPIServer  # noqa: E402
+
+
+def _self_signed_contexts(workdir: str) -> tuple[ssl.SSLContext, ssl.SSLContext]:
+    """Return ``(server_context, client_context)`` for a throwaway certificate."""
+    cert = os.path.join(workdir, "cert.pem")
+    key = os.path.join(workdir, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    server_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_ctx.load_cert_chain(cert, key)
+    client_ctx = ssl.create_default_context(cafile=cert)
+    client_ctx.check_hostname = False
+    return server_ctx, client_ctx
+
+
+def _run(n: int, session=None) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        result = make_request("/v3/bench", body={"keyword": "seo"}, username="u", password="p", session=session)
+        assert result["status"] == "ok", result
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server_ctx, client_ctx = _self_signed_contexts(workdir)
+        urllib.request.install_opener(
+            urllib.request.build_opener(urllib.request.HTTPSHandler(context=client_ctx))
+        )
+        with StubAPIServer(ssl_context=server_ctx) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            unpooled = _run(args.requests)
+            with Session(ssl_context=client_ctx) as session:
+                pooled = _run(args.requests, session=session)
+
+    print(f"requests:        {args.requests}")
+    print(f"urlopen:         {unpooled:8.1f} req/s")
+    print(f"Session (pool):  {pooled:8.1f} req/s")
+    print(f"speedup:         {pooled / unpooled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
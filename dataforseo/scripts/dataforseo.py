@@ -17,13 +17,29 @@ Usage:
         --fields "items.*.backlinks,items.*.rank"
 """
 
-import argparse
-import base64
+import codecs
+import collections
+import contextlib
+import copy
+import fnmatch
+import functools
+import heapq
+import io
+import itertools
 import json
 import os
+import random
+import re
 import sys
-import urllib.error
-import urllib.request
+import threading
+import time
+import zlib
+
+# Heavier modules (argparse, base64, csv, hashlib, tempfile, gzip, the
+# http/ssl/socket/urllib network stack, asyncio, concurrent.futures,
+# email.utils) are imported inside the functions that use them, so a CLI
+# call that fails argument checks or is answered from the cache never loads
+# them.  tests/test_startup.py holds the import-time budget.
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -31,6 +47,30 @@ import urllib.request
 
 BASE_URL = "https://api.dataforseo.com"
 
+# DataForSEO's documented account-wide cap on API calls per minute.
+DEFAULT_RATE_LIMIT_PER_MINUTE = 2000
+
+# Maximum number of task objects DataForSEO accepts in one POST array.
+MAX_TASKS_PER_POST = 100
+
+# Largest ``limit`` the paginated endpoints (Backlinks, Labs, ...) accept.
+MAX_PAGE_LIMIT = 1000
+
+# Response cache defaults: one day per entry, 512 MB on disk.
+DEFAULT_CACHE_TTL = 86400
+DEFAULT_CACHE_MAX_MB = 512
+
+# Per-endpoint TTL overrides (fnmatch patterns, first match wins).  Reference
+# data such as locations, languages, categories and filter lists changes
+# rarely, so it is kept for a week regardless of the default TTL.
+CACHE_TTL_OVERRIDES = {
+    "*/locations*": 7 * 86400,
+    "*/languages*": 7 * 86400,
+    "*/categories*": 7 * 86400,
+    "*/available_filters*": 7 * 86400,
+    "*/llm_responses/models": 7 * 86400,
+}
+
 # ---------------------------------------------------------------------------
 # Utility: map_array_to_numbered_keys
 # ---------------------------------------------------------------------------
@@ -77,6 +117,282 @@ def remove_nested(filters):
     return filters
 
 
+# ---------------------------------------------------------------------------
+# Local filter evaluation
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+
+def _field_getter(path: str):
+    """Compile a dot path (``rating.value``, ``links.0.url``) into a getter.
+
+    Missing keys, out-of-range indexes and non-container values give
+    ``None``.
+    """
+    keys = tuple(path.split("."))
+
+    def get(item):
+        value = item
+        for key in keys:
+            if isinstance(value, dict):
+                value = value.get(key, _MISSING)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                return None
+            if value is _MISSING:
+                return None
+        return value
+
+    return get
+
+
+def _like_pattern(pattern: str, ignore_case: bool):
+    """Compile an SQL ``LIKE`` pattern (``%`` any run, ``_`` one character)."""
+    regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.compile(regex, re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+
+
+def _ordered(op):
+    """Wrap a comparison so that ``None`` and mismatched types never match."""
+
+    def compare(actual, expected):
+        if actual is None:
+            return False
+        try:
+            return op(actual, expected)
+        except TypeError:
+            return False
+
+    return compare
+
+
+def _compile_condition(field: str, op: str, value):
+    """Compile one ``[field, op, value]`` condition into a predicate."""
+    get = _field_getter(field)
+
+    if op in ("=", "<>"):
+        test = (lambda actual: actual == value) if op == "=" else (lambda actual: actual != value)
+    elif op in (">", "<", ">=", "<="):
+        compare = _ordered({
+            ">": lambda a, b: a > b,
+            "<": lambda a, b: a < b,
+            ">=": lambda a, b: a >= b,
+            "<=": lambda a, b: a <= b,
+        }[op])
+
+        def test(actual):
+            return compare(actual, value)
+    elif op in ("in", "not_in"):
+        if not isinstance(value, list):
+            raise ValueError(f"Filter {field!r}: {op!r} needs a list value")
+        try:
+            members = frozenset(value)
+        except TypeError:
+            members = value
+        if op == "in":
+            def test(actual):
+                try:
+                    return actual in members
+                except TypeError:
+                    return False
+        else:
+            def test(actual):
+                try:
+                    return actual not in members
+                except TypeError:
+                    return True
+    elif op in ("contains", "not_contains"):
+        needle = str(value)
+        positive = op == "contains"
+
+        def test(actual):
+            return isinstance(actual, str) and (needle in actual) == positive
+    elif op in ("like", "not_like", "ilike", "not_ilike"):
+        pattern = _like_pattern(str(value), ignore_case=op.endswith("ilike"))
+        positive = not op.startswith("not_")
+
+        def test(actual):
+            return isinstance(actual, str) and bool(pattern.fullmatch(actual)) == positive
+    elif op in ("regex", "not_regex"):
+        try:
+            pattern = re.compile(str(value))
+        except re.error as exc:
+            raise ValueError(f"Filter {field!r}: invalid regex: {exc}") from exc
+        positive = op == "regex"
+
+        def test(actual):
+            return isinstance(actual, str) and bool(pattern.search(actual)) == positive
+    elif op in ("match", "not_match"):
+        # Full-text style: every word of the value appears, ignoring case.
+        words = str(value).lower().split()
+        positive = op == "match"
+
+        def test(actual):
+            if not isinstance(actual, str):
+                return False
+            text = actual.lower()
+            return all(word in text for word in words) == positive
+    elif op in ("has", "has_not"):
+        positive = op == "has"
+
+        def test(actual):
+            return isinstance(actual, list) and (value in actual) == positive
+    else:
+        raise ValueError(f"Filter {field!r}: unsupported operator {op!r}")
+
+    return lambda item: test(get(item))
+
+
+def _is_condition(expr) -> bool:
+    return (
+        isinstance(expr, list)
+        and len(expr) == 3
+        and isinstance(expr[0], str)
+        and isinstance(expr[1], str)
+        and expr[1].lower() not in ("and", "or")
+    )
+
+
+def _compile_expression(expr):
+    if _is_condition(expr):
+        return _compile_condition(*expr)
+    if not isinstance(expr, list) or len(expr) % 2 == 0:
+        raise ValueError(f"Invalid filter expression: {json.dumps(expr)}")
+    if len(expr) == 1:
+        return _compile_expression(expr[0])
+
+    # [expr, "and"|"or", expr, ...] with "and" binding tighter than "or"
+    groups = [[_compile_expression(expr[0])]]
+    for joiner, operand in zip(expr[1::2], expr[2::2]):
+        if not isinstance(joiner, str) or joiner.lower() not in ("and", "or"):
+            raise ValueError(f"Invalid filter joiner: {json.dumps(joiner)}")
+        if joiner.lower() == "or":
+            groups.append([])
+        groups[-1].append(_compile_expression(operand))
+
+    def all_of(predicates: tuple):
+        return predicates[0] if len(predicates) == 1 else lambda item: all(p(item) for p in predicates)
+
+    alternatives = tuple(all_of(tuple(group)) for group in groups)
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return lambda item: any(p(item) for p in alternatives)
+
+
+def compile_filter(filters):
+    """Compile a ``filters`` expression into a predicate over one item.
+
+    Accepts the syntax documented in ``references/filters-and-sorting.md``:
+    ``[field, op, value]`` conditions joined by ``"and"`` / ``"or"`` and
+    nested to any depth, with dot paths for nested fields.  The expression
+    is normalized with :func:`remove_nested` first (on a copy).  As in SQL,
+    ``and`` binds tighter than ``or`` and ``None`` never compares greater
+    or less than anything.  Raises ``ValueError`` for malformed expressions
+    and unknown operators.
+    """
+    filters = remove_nested(copy.deepcopy(filters))
+    if not filters:
+        return lambda item: True
+    return _compile_expression(filters)
+
+
+class _Descending:
+    """Sort-key wrapper that reverses the order of any comparable value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _sort_component(value, descending: bool) -> tuple:
+    """Build one rule's part of a sort key.
+
+    Nulls sort last in either direction.  Mixed types are ordered numbers,
+    then strings, then anything else (by its JSON text).
+    """
+    if value is None:
+        return (1,)
+    if isinstance(value, (int, float)):
+        return (0, 0, -value if descending else value)
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True)
+        rank = 2
+    else:
+        rank = 1
+    return (0, rank, _Descending(value) if descending else value)
+
+
+def compile_order_by(rules: list[str]):
+    """Compile ``order_by`` rules (``"field,desc"``) into a sort key function.
+
+    Each rule is a dot path and an optional direction (``asc`` by default),
+    as in ``references/filters-and-sorting.md``.  Raises ``ValueError`` for
+    an unknown direction or an empty field.
+    """
+    compiled = []
+    for rule in rules:
+        field, _, direction = rule.partition(",")
+        field, direction = field.strip(), (direction.strip().lower() or "asc")
+        if not field or direction not in ("asc", "desc"):
+            raise ValueError(f"Invalid order_by rule: {rule!r} (expected \"field,asc\" or \"field,desc\")")
+        compiled.append((_field_getter(field), direction == "desc"))
+
+    def key(item) -> tuple:
+        return tuple(_sort_component(get(item), descending) for get, descending in compiled)
+
+    return key
+
+
+def order_items(items, order_by: list[str] | None = None, top: int | None = None) -> list:
+    """Sort *items* by *order_by* rules and/or keep the first *top* of them.
+
+    With *top*, a heap of *top* items is kept instead of sorting everything,
+    so *items* may be a long iterator (e.g. several merged pages).  Ties keep
+    their input order.
+    """
+    if not order_by:
+        return list(items if top is None else itertools.islice(items, top))
+    key = compile_order_by(order_by)
+    if top is None:
+        return sorted(items, key=key)
+    return heapq.nsmallest(top, items, key=key)
+
+
+def result_items(result):
+    """Yield every item of a response *result* (see :func:`map_result_items`)."""
+    if isinstance(result, dict):
+        if isinstance(result.get("items"), list):
+            yield from result["items"]
+    elif isinstance(result, list):
+        for entry in result:
+            yield from result_items(entry)
+
+
+def map_result_items(result, fn):
+    """Replace every ``items`` list in a response *result* with ``fn(items)``, in place.
+
+    Handles AI-condensed results (``{"items": [...]}``) and full-mode
+    results (a list of result objects, each with its own ``items``).
+    """
+    if isinstance(result, dict):
+        if isinstance(result.get("items"), list):
+            result["items"] = list(fn(result["items"]))
+    elif isinstance(result, list):
+        for entry in result:
+            if isinstance(entry, dict):
+                map_result_items(entry, fn)
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Field filtering (dot-notation with wildcard support)
 # ---------------------------------------------------------------------------
@@ -190,6 +506,176 @@ def filter_fields(data, field_spec: str):
     return result
 
 
+class _FieldNode:
+    """One segment of a compiled field spec (see :class:`FieldProjector`)."""
+
+    __slots__ = ("order", "terminal", "children", "each", "leaves")
+
+    def __init__(self, order: int):
+        self.order = order  # index of the first path through this node
+        self.terminal = False  # a path ends here
+        self.children: dict[str, "_FieldNode"] = {}
+        self.each: "_FieldNode | None" = None  # plan for the elements of a list value
+        self.leaves: tuple | None = None  # set when every child is a plain terminal key
+
+
+def _merge_nodes(nodes: list) -> _FieldNode:
+    """Merge the paths below *nodes* into one node (its ``terminal`` is left False)."""
+    merged = _FieldNode(min(node.order for node in nodes))
+    groups: dict[str, list] = {}
+    for node in nodes:
+        for segment, child in node.children.items():
+            groups.setdefault(segment, []).append(child)
+    for segment, group in sorted(groups.items(), key=lambda entry: min(child.order for child in entry[1])):
+        child = _merge_nodes(group)
+        child.terminal = any(node.terminal for node in group)
+        merged.children[segment] = child
+    return merged
+
+
+def _finish_node(node: _FieldNode) -> None:
+    """Precompute the per-element plan of every node below *node*.
+
+    A list value consumes one following ``*``, so its elements are matched
+    against the node's other children merged with the children of its
+    ``*`` child.
+    """
+    if node.children and all(c.terminal and seg != "*" for seg, c in node.children.items()):
+        node.leaves = tuple(node.children)
+    for child in node.children.values():
+        if child.terminal:
+            continue
+        star = child.children.get("*")
+        rest = _FieldNode(child.order)
+        rest.children = {segment: c for segment, c in child.children.items() if segment != "*"}
+        child.each = _merge_nodes([rest] + ([star] if star is not None else []))
+        child.each.terminal = star is not None and star.terminal
+        _finish_node(child)
+        _finish_node(child.each)
+
+
+def _project(source, target, node: _FieldNode) -> None:
+    """Copy every path below *node* from *source* into *target* in one pass.
+
+    A value already copied whole into *target* is never descended into, so
+    overlapping paths cannot write through to the caller's data.
+    """
+    for segment, child in node.children.items():
+        if child.terminal:
+            if segment == "*":
+                if isinstance(source, list):
+                    target.update({str(i): v for i, v in enumerate(source)})
+                elif isinstance(source, dict):
+                    target.update(source)
+            elif isinstance(source, dict) and segment in source:
+                target[segment] = source[segment]
+        elif segment == "*":
+            if isinstance(source, list) and isinstance(target, list):
+                for idx, item in enumerate(source):
+                    while len(target) <= idx:
+                        target.append({})
+                    if target[idx] is not item:
+                        if not isinstance(target[idx], dict):
+                            target[idx] = {}
+                        _project(item, target[idx], child)
+                continue
+            if isinstance(source, list):
+                entries = ((str(i), v) for i, v in enumerate(source))
+            elif isinstance(source, dict):
+                entries = source.items()
+            else:
+                continue
+            for key, value in entries:
+                if key not in target:
+                    target[key] = {}
+                if target[key] is not value:
+                    _project(value, target[key], child)
+        elif isinstance(source, dict) and segment in source:
+            value = source[segment]
+            if target.get(segment) is value:
+                continue
+            if isinstance(value, list):
+                each = child.each
+                if segment not in target:
+                    # Fast path: nothing written here yet, so no merging needed.
+                    if each.terminal:
+                        target[segment] = list(value)
+                        continue
+                    if each.leaves is not None:
+                        keys = each.leaves
+                        target[segment] = [
+                            {k: item[k] for k in keys if k in item} if isinstance(item, dict) else {}
+                            for item in value
+                        ]
+                        continue
+                    target[segment] = out = []
+                    for item in value:
+                        projected: dict = {}
+                        out.append(projected)
+                        _project(item, projected, each)
+                    continue
+                out = target[segment]
+                for idx, item in enumerate(value):
+                    while len(out) <= idx:
+                        out.append({})
+                    if each.terminal:
+                        out[idx] = item
+                    elif out[idx] is not item:
+                        if not isinstance(out[idx], dict):
+                            out[idx] = {}
+                        _project(item, out[idx], each)
+            elif isinstance(value, dict):
+                if segment not in target:
+                    target[segment] = {}
+                _project(value, target[segment], child)
+
+
+class FieldProjector:
+    """A ``--fields`` spec compiled into a prefix trie.
+
+    Produces the same result as :func:`filter_fields`, but the spec is
+    parsed once and all paths are evaluated together in a single walk of
+    the data, so a shared prefix such as ``items.*`` is traversed once
+    rather than once per path.  Where paths overlap, a path that ends
+    earlier (copying the whole value) takes precedence over deeper ones.
+    """
+
+    def __init__(self, field_spec: str | None):
+        self.field_spec = field_spec
+        fields = [f.strip() for f in (field_spec or "").split(",") if f.strip()]
+        self._root: _FieldNode | None = None
+        if not fields:
+            return
+        root = _FieldNode(0)
+        for index, field in enumerate(_parse_field_paths(fields)):
+            node = root
+            for segment in field if isinstance(field, list) else field.split("."):
+                if segment not in node.children:
+                    node.children[segment] = _FieldNode(index)
+                node = node.children[segment]
+            node.terminal = True
+        _finish_node(root)
+        self._root = root
+
+    def project(self, data):
+        """Return *data* filtered to the compiled fields (``None`` stays ``None``)."""
+        if data is None:
+            return None
+        if self._root is None:
+            return data
+        result: dict = {}
+        _project(data, result, self._root)
+        return result
+
+    __call__ = project
+
+
+@functools.lru_cache(maxsize=256)
+def compile_fields(field_spec: str | None) -> FieldProjector:
+    """Return the cached :class:`FieldProjector` for *field_spec*."""
+    return FieldProjector(field_spec)
+
+
 # ---------------------------------------------------------------------------
 # Field configuration (singleton-like helpers)
 # ---------------------------------------------------------------------------
@@ -241,6 +727,84 @@ def clear_field_config():
     return None
 
 
+def endpoint_tool_names(endpoint: str) -> list[str]:
+    """Return the field-config tool names that may apply to *endpoint*.
+
+    Field configs written for the MCP server key ``supported_fields`` by tool
+    name, which is the endpoint path joined with underscores, minus the
+    ``live`` segment (``/v3/backlinks/anchors/live`` -> ``backlinks_anchors``),
+    or for SERP minus the search engine
+    (``/v3/serp/google/organic/live/advanced`` ->
+    ``serp_organic_live_advanced``).  The endpoint path itself and the fully
+    joined path are also accepted.  Candidates are listed most specific
+    first.
+    """
+    path = endpoint.split("?", 1)[0].rstrip("/")
+    if path.endswith(".ai"):
+        path = path[:-3]
+    parts = [p for p in path.split("/") if p]
+    if parts and parts[0] == "v3":
+        parts = parts[1:]
+    names = [path, "_".join(parts)]
+    if parts and parts[0] == "serp" and len(parts) > 2:
+        names.append("_".join(parts[:1] + parts[2:]))
+    names.append("_".join(p for p in parts if p != "live"))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class FieldConfig:
+    """A field config file whose per-tool field lists are compiled once.
+
+    The file is re-read only when its modification time or size changes, so
+    :meth:`spec_for` can be called for every response.  Each tool's field
+    list is joined into a ``--fields`` spec and compiled with
+    :func:`compile_fields` when the file is loaded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature = None
+        self._specs: dict[str, str] = {}
+        self._by_endpoint: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return
+        config = load_field_config(self.path) if signature is not None else None
+        specs = {}
+        for tool, fields in (config or {}).get("supported_fields", {}).items():
+            if isinstance(fields, list) and fields:
+                specs[tool] = ",".join(fields)
+                compile_fields(specs[tool])
+        self._specs, self._by_endpoint, self._signature = specs, {}, signature
+
+    def spec_for(self, endpoint: str) -> str | None:
+        """Return the field spec configured for *endpoint*, or ``None``."""
+        with self._lock:
+            self._refresh()
+            if endpoint not in self._by_endpoint:
+                names = endpoint_tool_names(endpoint)
+                self._by_endpoint[endpoint] = next((self._specs[n] for n in names if n in self._specs), None)
+            return self._by_endpoint[endpoint]
+
+
+_field_configs: dict[str, FieldConfig] = {}
+
+
+def get_field_config(path: str) -> FieldConfig:
+    """Return the shared :class:`FieldConfig` for *path*."""
+    config = _field_configs.get(path)
+    if config is None:
+        config = _field_configs.setdefault(path, FieldConfig(path))
+    return config
+
+
 # ---------------------------------------------------------------------------
 # URL building
 # ---------------------------------------------------------------------------
@@ -265,6 +829,8 @@ def build_url(endpoint: str, full_response: bool = False, force_full: bool = Fal
 
 def build_auth_header(username: str, password: str) -> str:
     """Build a Basic-Auth ``Authorization`` header value."""
+    import base64
+
     token = base64.b64encode(f"{username}:{password}".encode()).decode()
     return f"Basic {token}"
 
@@ -274,6 +840,18 @@ def build_auth_header(username: str, password: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+class APIError(ValueError):
+    """A DataForSEO ``status_code`` error.  *code* is the offending status code.
+
+    ``cost`` is what the failed response reported it was billed, when known.
+    """
+
+    def __init__(self, message: str, code: int | None = None):
+        super().__init__(message)
+        self.code = code
+        self.cost = None
+
+
 def validate_ai_response(response: dict) -> bool:
     """Validate an AI-condensed response.
 
@@ -284,7 +862,7 @@ def validate_ai_response(response: dict) -> bool:
     code = response.get("status_code", 0)
     if code / 100 != 200:
         msg = response.get("status_message", "Unknown error")
-        raise ValueError(f"API Error: {msg} (Code: {code})")
+        raise APIError(f"API Error: {msg} (Code: {code})", code)
     return True
 
 
@@ -301,25 +879,34 @@ def validate_full_response(response: dict) -> bool:
     outer_code = response.get("status_code", 0)
     if outer_code / 100 != 200:
         msg = response.get("status_message", "Unknown error")
-        raise ValueError(f"API Error: {msg} (Code: {outer_code})")
+        raise APIError(f"API Error: {msg} (Code: {outer_code})", outer_code)
 
     # 2. Tasks non-empty
     tasks = response.get("tasks", [])
     if not tasks:
-        raise ValueError("No tasks in response")
+        raise APIError("No tasks in response")
 
     # 3. First task status
-    task = tasks[0]
-    task_code = task.get("status_code", 0)
-    if task_code / 100 != 200:
-        msg = task.get("status_message", "Unknown error")
-        raise ValueError(f"Task Error: {msg} (Code: {task_code})")
+    validate_task(tasks[0])
 
     # 4. tasks_error count
     tasks_error = response.get("tasks_error", 0)
     if tasks_error > 0:
-        raise ValueError(f"Tasks Error: {tasks_error} tasks failed")
+        raise APIError(f"Tasks Error: {tasks_error} tasks failed")
+
+    return True
 
+
+def validate_task(task: dict, accepted: tuple = (200,)) -> bool:
+    """Validate one entry of a full response's ``tasks`` array.
+
+    ``status_code / 100`` must be one of *accepted*; pass ``(200, 201)`` to
+    also accept 20100 ("Task Created.") from ``task_post`` endpoints.
+    """
+    task_code = task.get("status_code", 0)
+    if task_code / 100 not in accepted:
+        msg = task.get("status_message", "Unknown error")
+        raise APIError(f"Task Error: {msg} (Code: {task_code})", task_code)
     return True
 
 
@@ -328,9 +915,9 @@ def validate_full_response(response: dict) -> bool:
 # ---------------------------------------------------------------------------
 
 
-def _parse_bool_env(name: str, default: bool = False) -> bool:
+def _parse_bool_env(name: str, default: bool = False, environ=None) -> bool:
     """Parse a boolean-ish environment variable."""
-    val = os.environ.get(name, "")
+    val = (os.environ if environ is None else environ).get(name, "")
     if val.lower() in ("true", "1"):
         return True
     if val.lower() in ("false", "0"):
@@ -338,14 +925,66 @@ def _parse_bool_env(name: str, default: bool = False) -> bool:
     return default
 
 
-def get_config() -> dict:
-    """Build a config dict from environment variables."""
+def _parse_float_env(name: str, default: float, environ=None) -> float:
+    """Parse a numeric environment variable, falling back to *default*."""
+    val = (os.environ if environ is None else environ).get(name, "").strip()
+    if not val:
+        return default
+    try:
+        return float(val)
+    except ValueError:
+        return default
+
+
+def _parse_rate_limits_env(environ=None) -> dict[str, float]:
+    """Collect ``DATAFORSEO_RATE_LIMIT_<FAMILY>`` per-minute overrides.
+
+    ``DATAFORSEO_RATE_LIMIT_DATAFORSEO_LABS=600`` -> ``{"dataforseo_labs": 600.0}``
+    """
+    environ = os.environ if environ is None else environ
+    prefix = "DATAFORSEO_RATE_LIMIT_"
+    limits = {}
+    for name in environ:
+        if name.startswith(prefix) and len(name) > len(prefix):
+            limits[name[len(prefix):].lower()] = _parse_float_env(name, DEFAULT_RATE_LIMIT_PER_MINUTE, environ)
+    return limits
+
+
+def config_environ(environ=None) -> dict[str, str]:
+    """Return the variables of *environ* (default ``os.environ``) that :func:`get_config` reads."""
+    environ = os.environ if environ is None else environ
+    return {
+        name: value
+        for name, value in environ.items()
+        if name.startswith("DATAFORSEO_") or name in ("DEBUG", "FIELD_CONFIG_PATH")
+    }
+
+
+def get_config(environ=None) -> dict:
+    """Build a config dict from environment variables.
+
+    *environ* defaults to ``os.environ``; the ``--serve`` daemon passes each
+    client's variables instead.
+    """
+    env = os.environ if environ is None else environ
     return {
-        "username": os.environ.get("DATAFORSEO_USERNAME", ""),
-        "password": os.environ.get("DATAFORSEO_PASSWORD", ""),
-        "full_response": _parse_bool_env("DATAFORSEO_FULL_RESPONSE"),
-        "simple_filter": _parse_bool_env("DATAFORSEO_SIMPLE_FILTER"),
-        "debug": _parse_bool_env("DEBUG"),
+        "username": env.get("DATAFORSEO_USERNAME", ""),
+        "password": env.get("DATAFORSEO_PASSWORD", ""),
+        "full_response": _parse_bool_env("DATAFORSEO_FULL_RESPONSE", environ=env),
+        "simple_filter": _parse_bool_env("DATAFORSEO_SIMPLE_FILTER", environ=env),
+        "debug": _parse_bool_env("DEBUG", environ=env),
+        "rate_limit": _parse_float_env("DATAFORSEO_RATE_LIMIT", DEFAULT_RATE_LIMIT_PER_MINUTE, env),
+        "rate_limits": _parse_rate_limits_env(env),
+        "max_retries": int(_parse_float_env("DATAFORSEO_MAX_RETRIES", 3, env)),
+        "retry_max_time": _parse_float_env("DATAFORSEO_RETRY_MAX_TIME", 60.0, env),
+        "cache_dir": env.get("DATAFORSEO_CACHE_DIR", ""),
+        "cache_ttl": _parse_float_env("DATAFORSEO_CACHE_TTL", DEFAULT_CACHE_TTL, env),
+        "cache_max_mb": _parse_float_env("DATAFORSEO_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB, env),
+        "field_config": env.get("FIELD_CONFIG_PATH", ""),
+        "budget": _parse_float_env("DATAFORSEO_BUDGET", 0.0, env),
+        "price_config": env.get("DATAFORSEO_PRICE_CONFIG", ""),
+        "compress_requests": int(_parse_float_env("DATAFORSEO_COMPRESS_REQUESTS", 0, env)),
+        "socket": env.get("DATAFORSEO_SOCKET", ""),
     }
 
 
@@ -360,184 +999,4061 @@ def _debug_log(*args, **kwargs):
 
 
 # ---------------------------------------------------------------------------
-# HTTP request
+# Timing instrumentation
 # ---------------------------------------------------------------------------
 
+# Phases in the order they are reported.  Network phases come from the
+# Session (dns/connect/tls only for newly opened connections); the rest are
+# timed by make_request and the CLI.
+TIMING_PHASES = (
+    "queue", "dns", "connect", "tls", "ttfb", "download", "decode", "parse", "validate", "total",
+    "filter", "fields", "serialize",
+)
 
-def make_request(
-    endpoint: str,
-    method: str = "POST",
-    body=None,
-    full_response: bool = False,
-    force_full: bool = False,
-    username: str = "",
-    password: str = "",
-    wrap_array: bool = True,
-    debug: bool = False,
-) -> dict:
-    """Execute an HTTP request against the DataForSEO API.
 
-    Returns a dict with ``{"status": "ok", "result": ...}`` on success
-    or ``{"status": "error", "message": ...}`` on failure.
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class RequestStats:
+    """Per-endpoint timing samples for ``--stats``, with an optional JSONL trace.
+
+    :meth:`record` takes the phase durations (seconds) of one request
+    attempt and :meth:`timer` times one post-processing stage.  When *trace*
+    (a text file) is given, every record is also written to it as a JSON
+    line with durations in milliseconds.
     """
-    url = build_url(endpoint, full_response=full_response, force_full=force_full)
-    auth = build_auth_header(username, password)
 
-    headers = {
-        "Authorization": auth,
-        "Content-Type": "application/json",
-    }
+    # Byte-count fields of a record, summed per endpoint by :meth:`transfer`.
+    BYTE_FIELDS = ("sent_bytes", "wire_bytes", "bytes")
 
-    data_bytes = None
-    if body is not None and method.upper() == "POST":
-        payload = body
-        if wrap_array and isinstance(payload, dict):
-            payload = [payload]
-        data_bytes = json.dumps(payload).encode("utf-8")
+    def __init__(self, trace=None, clock=time.perf_counter):
+        self._trace = trace
+        self._clock = clock
+        self._samples: dict[str, dict[str, list]] = {}
+        self._bytes: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
 
-    if debug:
-        _debug_log(f"Request: {method} {url}")
-        if data_bytes:
-            _debug_log(f"Body: {data_bytes.decode()}")
+    def record(self, endpoint: str, timings: dict, **fields) -> None:
+        """Add one sample per phase in *timings*.
 
-    req = urllib.request.Request(
-        url,
-        data=data_bytes,
-        headers=headers,
-        method=method.upper(),
-    )
+        Byte counts among *fields* (see ``BYTE_FIELDS``) are also totalled
+        per endpoint; every field goes to the trace.
+        """
+        endpoint = endpoint.rstrip("/").removesuffix(".ai")
+        with self._lock:
+            phases = self._samples.setdefault(endpoint, {})
+            for phase, seconds in timings.items():
+                phases.setdefault(phase, []).append(seconds)
+            if fields.get("wire_bytes") is not None:
+                totals = self._bytes.setdefault(endpoint, dict.fromkeys(self.BYTE_FIELDS, 0))
+                for name in self.BYTE_FIELDS:
+                    totals[name] += fields.get(name) or 0
+            if self._trace is not None:
+                line = {"ts": round(time.time(), 6), "endpoint": endpoint, **fields}
+                line.update((f"{phase}_ms", round(seconds * 1000, 3)) for phase, seconds in timings.items())
+                self._trace.write(json.dumps(line) + "\n")
+                self._trace.flush()
 
-    try:
-        with urllib.request.urlopen(req) as resp:
-            raw = resp.read()
-            response_data = json.loads(raw)
+    @contextlib.contextmanager
+    def timer(self, endpoint: str, phase: str):
+        """Context manager recording the time spent in its body as *phase*."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(endpoint, {phase: self._clock() - start}, kind="stage")
 
-        # Validate
-        if full_response or force_full:
-            validate_full_response(response_data)
-            result = response_data["tasks"][0]["result"]
-        else:
-            validate_ai_response(response_data)
-            result = response_data
+    def summary(self) -> dict:
+        """Return ``{endpoint: {phase: {"count", "p50", "p95", "p99"}}}`` in milliseconds."""
+        with self._lock:
+            samples = {
+                endpoint: {phase: sorted(values) for phase, values in phases.items()}
+                for endpoint, phases in self._samples.items()
+            }
+        order = {phase: i for i, phase in enumerate(TIMING_PHASES)}
+        return {
+            endpoint: {
+                phase: {
+                    "count": len(values),
+                    **{f"p{pct}": round(_percentile(values, pct) * 1000, 3) for pct in (50, 95, 99)},
+                }
+                for phase, values in sorted(phases.items(), key=lambda item: order.get(item[0], len(order)))
+            }
+            for endpoint, phases in sorted(samples.items())
+        }
 
-        return {"status": "ok", "result": result}
+    def transfer(self) -> dict:
+        """Return ``{endpoint: {"sent_bytes", "wire_bytes", "bytes"}}`` totals.
+
+        ``wire_bytes`` is what responses took on the wire and ``bytes`` their
+        decoded size, so their ratio is the saving from compression.
+        """
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in sorted(self._bytes.items())}
+
+    def format_summary(self) -> str:
+        """Return :meth:`summary` and :meth:`transfer` as plain-text tables."""
+        rows = [("endpoint", "phase", "count", "p50 ms", "p95 ms", "p99 ms")]
+        for endpoint, phases in self.summary().items():
+            for phase, entry in phases.items():
+                rows.append((endpoint, phase, str(entry["count"]),
+                             *(f"{entry[p]:.3f}" for p in ("p50", "p95", "p99"))))
+        text = _format_table(rows, left=2)
+        transfer = self.transfer()
+        if transfer:
+            rows = [("endpoint", "sent", "received", "decoded", "ratio")]
+            for endpoint, totals in transfer.items():
+                ratio = totals["bytes"] / totals["wire_bytes"] if totals["wire_bytes"] else 1.0
+                rows.append((endpoint, *(str(totals[name]) for name in self.BYTE_FIELDS), f"{ratio:.2f}x"))
+            text += "\n\n" + _format_table(rows, left=1)
+        return text
+
+
+def _format_table(rows: list, left: int) -> str:
+    """Align *rows* of strings in columns; the first *left* columns are left-aligned."""
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(w) if i < left else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths)))
+        for row in rows
+    )
 
-    except urllib.error.HTTPError as exc:
-        msg = f"HTTP {exc.code}: {exc.reason}"
-        if debug:
-            _debug_log(msg)
-        return {"status": "error", "message": msg}
-    except urllib.error.URLError as exc:
-        msg = str(exc.reason)
-        if debug:
-            _debug_log(msg)
-        return {"status": "error", "message": msg}
-    except (ValueError, json.JSONDecodeError) as exc:
-        return {"status": "error", "message": str(exc)}
-    except Exception as exc:
-        return {"status": "error", "message": str(exc)}
+
+def _timed(stats: RequestStats | None, endpoint: str, phase: str):
+    """Return ``stats.timer(endpoint, phase)``, or a no-op context without *stats*."""
+    return stats.timer(endpoint, phase) if stats is not None else contextlib.nullcontext()
 
 
 # ---------------------------------------------------------------------------
-# CLI main
+# Rate limiting
 # ---------------------------------------------------------------------------
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="DataForSEO API client",
-    )
-    parser.add_argument(
-        "--endpoint",
-        required=True,
-        help="API endpoint path, e.g. /v3/serp/google/organic/live/advanced",
-    )
-    parser.add_argument(
-        "--method",
-        default="POST",
-        choices=["GET", "POST"],
-        help="HTTP method (default: POST)",
-    )
-    parser.add_argument(
-        "--full-response",
-        action="store_true",
-        default=None,
-        help="Force full response mode (skip .ai suffix)",
-    )
-    parser.add_argument(
-        "--fields",
-        default=None,
-        help="Comma-separated field filter (dot-notation, supports wildcards)",
-    )
-    parser.add_argument(
-        "--field-config",
-        default=None,
-        help="Path to field configuration JSON file",
-    )
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        default=None,
-        help="Enable debug output to stderr",
-    )
-    parser.add_argument(
-        "--no-wrap-array",
-        action="store_true",
-        help="Don't auto-wrap POST body in [{...}]",
-    )
+def endpoint_family(endpoint: str) -> str:
+    """Return the API family of *endpoint*, used to pick its rate budget.
 
-    args = parser.parse_args()
+    Example:
+        ``/v3/dataforseo_labs/google/ranked_keywords/live`` -> ``dataforseo_labs``
+    """
+    parts = [p for p in endpoint.split("/") if p]
+    if parts and parts[0].startswith("v") and parts[0][1:].isdigit():
+        parts = parts[1:]
+    return parts[0] if parts else ""
 
-    # Merge env config with CLI flags
-    config = get_config()
-    debug = args.debug if args.debug is not None else config["debug"]
-    full_response = args.full_response if args.full_response is not None else config["full_response"]
 
-    username = config["username"]
-    password = config["password"]
+class TokenBucket:
+    """Thread-safe token bucket refilled at *rate_per_minute*.
 
-    if not username or not password:
-        output = {"status": "error", "message": "DATAFORSEO_USERNAME and DATAFORSEO_PASSWORD must be set"}
-        print(json.dumps(output))
-        sys.exit(1)
+    Callers *reserve* a token and are told how long to wait for it; tokens may
+    go negative, which queues later callers fairly behind earlier ones.
+    *burst* caps how many tokens accumulate while idle (default: one second's
+    worth of requests).
+    """
 
-    # Read body from stdin for POST
-    body = None
-    if args.method == "POST" and not sys.stdin.isatty():
-        raw_input = sys.stdin.read().strip()
-        if raw_input:
-            try:
-                body = json.loads(raw_input)
-            except json.JSONDecodeError as exc:
-                output = {"status": "error", "message": f"Invalid JSON input: {exc}"}
-                print(json.dumps(output))
-                sys.exit(1)
+    def __init__(self, rate_per_minute: float, burst: float | None = None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
 
-    # Load field config if specified
-    field_config = None
-    config_path = args.field_config or os.environ.get("FIELD_CONFIG_PATH")
-    if config_path:
-        field_config = load_field_config(config_path)
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
 
-    # Make the request
-    result = make_request(
-        endpoint=args.endpoint,
-        method=args.method,
-        body=body,
-        full_response=full_response,
-        force_full=args.full_response or False,
-        username=username,
-        password=password,
-        wrap_array=not args.no_wrap_array,
-        debug=debug,
-    )
+    def acquire(self) -> float:
+        """Block until a token is available.  Returns the seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
 
-    # Apply field filtering
-    if result["status"] == "ok" and args.fields:
-        result["result"] = filter_fields(result["result"], args.fields)
 
-    # Output
-    print(json.dumps(result, indent=2))
+class RateLimiter:
+    """Account-wide request budget, with optional per-family caps, shared by every request path.
+
+    Every request draws from one account-wide bucket refilled at
+    *default_per_minute*, the cap DataForSEO applies to the whole account.
+    A family listed in *family_limits* also draws from its own bucket, so it
+    can be held below that.  A limit of 0 or less disables the account
+    bucket, or for a family, disables limiting of that family altogether.
+    Time spent queued is accumulated per family; see :meth:`stats`.
+    """
+
+    def __init__(self, default_per_minute: float = DEFAULT_RATE_LIMIT_PER_MINUTE, family_limits: dict | None = None):
+        self.default_per_minute = default_per_minute
+        self.family_limits = dict(family_limits or {})
+        self._account = TokenBucket(default_per_minute) if default_per_minute > 0 else None
+        self._buckets: dict[str, TokenBucket | None] = {}
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RateLimiter":
+        """Build a limiter from :func:`get_config` output."""
+        return cls(config["rate_limit"], config["rate_limits"])
+
+    def _bucket(self, family: str) -> TokenBucket | None:
+        with self._lock:
+            if family not in self._buckets:
+                limit = self.family_limits.get(family)
+                self._buckets[family] = TokenBucket(limit) if limit is not None and limit > 0 else None
+            return self._buckets[family]
+
+    def reserve(self, endpoint: str) -> float:
+        """Reserve a slot for *endpoint* and return the seconds to wait for it."""
+        family = endpoint_family(endpoint)
+        wait = 0.0
+        if self.family_limits.get(family, 1) > 0:
+            bucket = self._bucket(family)
+            if bucket is not None:
+                wait = bucket.reserve()
+            if self._account is not None:
+                wait = max(wait, self._account.reserve())
+        with self._lock:
+            entry = self._stats.setdefault(family, {"requests": 0, "queued": 0, "wait_total": 0.0, "wait_max": 0.0})
+            entry["requests"] += 1
+            if wait > 0:
+                entry["queued"] += 1
+                entry["wait_total"] += wait
+                entry["wait_max"] = max(entry["wait_max"], wait)
+        return wait
+
+    def acquire(self, endpoint: str) -> float:
+        """Block until *endpoint* may be called.  Returns the seconds waited."""
+        wait = self.reserve(endpoint)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        """Return ``{family: {"requests", "queued", "wait_total", "wait_max"}}``."""
+        with self._lock:
+            return {family: dict(entry) for family, entry in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Forget accumulated :meth:`stats`; token buckets keep their state."""
+        with self._lock:
+            self._stats.clear()
+
+
+# ---------------------------------------------------------------------------
+# Content encoding
+# ---------------------------------------------------------------------------
+
+# Sent with every request: the API's JSON responses shrink 5-10x compressed.
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Smallest request body gzipped when request compression is on.  Smaller
+# bodies fit in a packet or two anyway.
+DEFAULT_COMPRESS_MIN_BYTES = 8192
+
+_ENCODING_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "x-gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def _deflate_wbits(head: bytes) -> int:
+    """Return the zlib *wbits* for a ``deflate`` body starting with *head*.
+
+    ``deflate`` should mean zlib-wrapped data, but some servers send a raw
+    deflate stream; a valid zlib header tells the two apart.
+    """
+    if len(head) >= 2 and head[0] & 0x0F == 8 and ((head[0] << 8) | head[1]) % 31 == 0:
+        return zlib.MAX_WBITS
+    return -zlib.MAX_WBITS
+
+
+class _BodyReader:
+    """File-like view of a response body that undoes its ``Content-Encoding``.
+
+    gzip and deflate bodies are decompressed incrementally as they are read,
+    so streaming parsers never hold the whole body; other bodies pass
+    through.  ``wire_bytes`` and ``bytes`` count the bytes read from *fp* and
+    returned so far, and ``seconds`` the time spent decompressing.
+    """
+
+    def __init__(self, fp, encoding: str | None = None):
+        self._fp = fp
+        self._encoding = (encoding or "identity").strip().lower()
+        self._decoder = None
+        self._done = False
+        self.wire_bytes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def compressed(self) -> bool:
+        return self._encoding in _ENCODING_WBITS
+
+    def read(self, amt: int | None = None) -> bytes:
+        if not self.compressed:
+            if self._encoding not in ("", "identity"):
+                import http.client
+
+                raise http.client.HTTPException(f"unsupported Content-Encoding: {self._encoding}")
+            data = self._fp.read() if amt is None or amt < 0 else self._fp.read(amt)
+            self.wire_bytes += len(data)
+            self.bytes += len(data)
+            return data
+        if amt is None or amt < 0:
+            return b"".join(iter(functools.partial(self.read, 65536), b""))
+        while not self._done:
+            data = self._decoder.unconsumed_tail if self._decoder is not None else b""
+            if not data:
+                data = self._fp.read(amt)
+                self.wire_bytes += len(data)
+                if not data:
+                    self._done = True
+                    if self._decoder is not None and not self._decoder.eof:
+                        import http.client
+
+                        raise http.client.IncompleteRead(b"")
+                    break
+            if self._decoder is None:
+                # The zlib header is two bytes; a short first read must not hide it.
+                while self._encoding == "deflate" and len(data) < 2 and (more := self._fp.read(amt)):
+                    self.wire_bytes += len(more)
+                    data += more
+                wbits = _deflate_wbits(data) if self._encoding == "deflate" else _ENCODING_WBITS[self._encoding]
+                self._decoder = zlib.decompressobj(wbits)
+            mark = time.perf_counter()
+            try:
+                out = self._decoder.decompress(data, amt)
+            except zlib.error as exc:
+                import http.client
+
+                raise http.client.HTTPException(f"invalid {self._encoding} response body: {exc}") from exc
+            finally:
+                self.seconds += time.perf_counter() - mark
+            if self._decoder.eof:
+                self._done = True
+                # Read the transport to its end so the connection can be reused.
+                while trailing := self._fp.read(65536):
+                    self.wire_bytes += len(trailing)
+            if out:
+                self.bytes += len(out)
+                return out
+        return b""
+
+    def split_timings(self, timings: dict, download: float) -> None:
+        """Record *download* seconds in *timings*, less any ``decode`` time."""
+        timings["download"] = download
+        if self.compressed:
+            timings["download"] -= self.seconds
+            timings["decode"] = self.seconds
+
+    def close(self) -> None:
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _compress_body(data_bytes: bytes | None, headers: dict, min_bytes: int | None) -> bytes | None:
+    """Gzip a request body of at least *min_bytes*, setting ``Content-Encoding`` in *headers*.
+
+    Returns the body to send; without *min_bytes*, or for smaller bodies,
+    it is *data_bytes* unchanged.
+    """
+    if not min_bytes or data_bytes is None or len(data_bytes) < min_bytes:
+        return data_bytes
+    import gzip
+
+    headers["Content-Encoding"] = "gzip"
+    return gzip.compress(data_bytes, mtime=0)
+
+
+# ---------------------------------------------------------------------------
+# HTTP connection pooling
+# ---------------------------------------------------------------------------
+
+
+@functools.cache
+def _stale_connection_errors() -> tuple:
+    """Errors raised when a pooled keep-alive connection was closed by the server while idle.
+
+    A request that fails this way on a *reused* connection never reached the
+    server and is safe to replay once on a fresh connection.
+    """
+    import http.client
+
+    return (
+        http.client.RemoteDisconnected,
+        http.client.CannotSendRequest,
+        BrokenPipeError,
+        ConnectionResetError,
+        ConnectionAbortedError,
+    )
+
+
+class _TimedConnectionMixin:
+    """Record DNS, TCP connect and TLS handshake times in ``self.phases``.
+
+    ``phases`` is reset by :class:`Session` before each request, so it only
+    holds connection phases when that request opened the connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.phases: dict[str, float] = {}
+        self._create_connection = self._timed_create_connection
+
+    def _timed_create_connection(self, address, timeout, source_address=None):
+        import socket
+
+        host, port = address
+        start = time.perf_counter()
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        self.phases["dns"] = time.perf_counter() - start
+        error = None
+        # Connect to each resolved address in turn; "connect" is the time of
+        # the attempt that succeeded, not of the ones that failed before it.
+        for *_, sockaddr in infos:
+            attempt = time.perf_counter()
+            try:
+                sock = socket.create_connection(sockaddr[:2], timeout, source_address)
+            except OSError as exc:
+                error = exc
+                continue
+            self._connected = time.perf_counter()
+            self.phases["connect"] = self._connected - attempt
+            return sock
+        raise error or OSError(f"getaddrinfo returned no addresses for {host}")
+
+    def connect(self):
+        import http.client
+
+        super().connect()
+        if isinstance(self, http.client.HTTPSConnection):
+            self.phases["tls"] = time.perf_counter() - self._connected
+
+
+@functools.cache
+def _timed_connection_classes() -> tuple[type, type]:
+    """Return the timed ``(HTTPConnection, HTTPSConnection)`` classes.
+
+    Built on first use so that ``http.client`` and ``ssl`` are only imported
+    once a connection is opened.
+    """
+    import http.client
+
+    class _TimedHTTPConnection(_TimedConnectionMixin, http.client.HTTPConnection):
+        pass
+
+    class _TimedHTTPSConnection(_TimedConnectionMixin, http.client.HTTPSConnection):
+        pass
+
+    return _TimedHTTPConnection, _TimedHTTPSConnection
+
+
+class SessionResponse:
+    """A fully-read HTTP response returned by :meth:`Session.request`.
+
+    ``data`` is the decoded body and ``wire_bytes`` its size as received
+    (smaller when it was compressed).  ``timings`` holds the request's phase
+    durations in seconds: ``ttfb``, ``download`` and ``decode``, plus
+    ``dns``, ``connect`` and ``tls`` when a new connection was opened for it.
+    """
+
+    def __init__(
+        self, status: int, reason: str, headers, data: bytes, timings: dict | None = None, wire_bytes: int | None = None
+    ):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+        self.timings = timings or {}
+        self.wire_bytes = len(data) if wire_bytes is None else wire_bytes
+
+
+class PooledResponse:
+    """A streaming HTTP response returned by :meth:`Session.open`.
+
+    ``read()`` returns the body with any gzip/deflate encoding undone (see
+    :class:`_BodyReader`, available as ``body`` for its byte counts).
+    ``close()`` returns the connection to the pool if the body was read to
+    the end, and discards it otherwise.
+    """
+
+    def __init__(self, session: "Session", key: tuple, conn, resp, slot, timings: dict | None = None):
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+        self.timings = timings or {}
+        self.body = _BodyReader(resp, resp.headers.get("Content-Encoding"))
+        self._session = session
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self._slot = slot
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self.body.read(amt)
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._resp.isclosed() and not self._resp.will_close:
+            self._session._checkin(self._key, conn)
+        else:
+            self._resp.close()
+            conn.close()
+        self._slot.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Session:
+    """Thread-safe keep-alive connection pool for the DataForSEO API.
+
+    Connections are pooled per ``(scheme, host, port)``.  At most
+    *max_per_host* connections to a host are open at once; callers beyond
+    that block until a connection is returned to the pool.
+
+    HTTP error statuses (>= 400) are raised as ``urllib.error.HTTPError`` and
+    socket failures as ``urllib.error.URLError`` so that callers handle both
+    transports the same way.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 10,
+        timeout: float | None = None,
+        ssl_context: "ssl.SSLContext | None" = None,
+    ):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list] = {}
+        self._slots: dict[tuple, threading.BoundedSemaphore] = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _new_connection(self, scheme: str, host: str, port: int | None):
+        import ssl
+        import urllib.error
+
+        http_class, https_class = _timed_connection_classes()
+        if scheme == "https":
+            context = self.ssl_context or ssl.create_default_context()
+            return https_class(host, port, timeout=self.timeout, context=context)
+        if scheme == "http":
+            return http_class(host, port, timeout=self.timeout)
+        raise urllib.error.URLError(f"unsupported URL scheme: {scheme}")
+
+    def _slot(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _checkout(self, key: tuple):
+        """Return ``(connection, reused)`` for *key*, opening one if none is idle."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(*key), False
+
+    def _checkin(self, key: tuple, conn) -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle.setdefault(key, []).append(conn)
+                return
+        conn.close()
+
+    def open(self, method: str, url: str, body: bytes | None = None, headers: dict | None = None) -> "PooledResponse":
+        """Send a request over a pooled connection and return it unread.
+
+        The caller reads the body from the returned :class:`PooledResponse`
+        and must close it to give the connection back to the pool.  Its
+        ``timings`` hold ``ttfb`` (request sent to headers received) and,
+        for a newly opened connection, ``dns``, ``connect`` and ``tls``.
+        """
+        import http.client
+        import urllib.error
+        import urllib.parse
+
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        slot = self._slot(key)
+        slot.acquire()
+        try:
+            conn, reused = self._checkout(key)
+            while True:
+                try:
+                    conn.phases = {}
+                    start = time.perf_counter()
+                    conn.request(method, path, body=body, headers=headers or {})
+                    resp = conn.getresponse()
+                    timings = dict(conn.phases)
+                    timings["ttfb"] = time.perf_counter() - start - sum(timings.values())
+                    break
+                except _stale_connection_errors() as exc:
+                    conn.close()
+                    if not reused:
+                        raise urllib.error.URLError(exc) from exc
+                    conn, reused = self._new_connection(*key), False
+                except (OSError, http.client.HTTPException) as exc:
+                    conn.close()
+                    raise urllib.error.URLError(exc) from exc
+        except BaseException:
+            slot.release()
+            raise
+
+        response = PooledResponse(self, key, conn, resp, slot, timings)
+        if resp.status >= 400:
+            try:
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                data = b""
+            finally:
+                response.close()
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+        return response
+
+    def request(self, method: str, url: str, body: bytes | None = None, headers: dict | None = None) -> SessionResponse:
+        """Send a request over a pooled connection and read the full response."""
+        import http.client
+        import urllib.error
+
+        response = self.open(method, url, body=body, headers=headers)
+        start = time.perf_counter()
+        try:
+            data = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            raise urllib.error.URLError(exc) from exc
+        finally:
+            response.close()
+        timings = dict(response.timings)
+        response.body.split_timings(timings, time.perf_counter() - start)
+        return SessionResponse(
+            response.status, response.reason, response.headers, data, timings, response.body.wire_bytes
+        )
+
+    def close(self) -> None:
+        """Close every idle connection.  Connections in use close on return."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Retry policy
+# ---------------------------------------------------------------------------
+
+# DataForSEO ``status_code`` 40202 is its own "rate limit per minute
+# exceeded", i.e. the API-level equivalent of HTTP 429.
+_RETRYABLE_API_CODES = (40202,)
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Return the ``Retry-After`` delay carried by an HTTP error, if any."""
+    headers = getattr(exc, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    import email.utils
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient request failures.
+
+    Retried: network errors, HTTP 429 and 5xx, and DataForSEO ``status_code``
+    values in the 50000-50999 range (plus 40202, its per-minute rate limit).
+    Attempt *n* (0-based) sleeps a random time in
+    ``[0, min(max_delay, base_delay * 2**n))``, or the server's
+    ``Retry-After`` when one is sent.  No retry is started that would push the
+    total time past *max_total* seconds.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_total: float = 60.0,
+        rand=random.random,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_total = max_total
+        self._rand = rand
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RetryPolicy":
+        """Build a policy from :func:`get_config` output."""
+        return cls(max_retries=config["max_retries"], max_total=config["retry_max_time"])
+
+    @staticmethod
+    def is_retryable(exc: Exception) -> bool:
+        """Return True if *exc* is a transient failure worth retrying."""
+        import http.client
+        import ssl
+        import urllib.error
+
+        if isinstance(exc, urllib.error.HTTPError):
+            return exc.code == 429 or 500 <= exc.code < 600
+        if isinstance(exc, urllib.error.URLError):
+            reason = exc.reason
+            return isinstance(reason, (OSError, http.client.HTTPException)) and not isinstance(
+                reason, ssl.SSLCertVerificationError
+            )
+        if isinstance(exc, APIError):
+            return exc.code is not None and (50000 <= exc.code < 51000 or exc.code in _RETRYABLE_API_CODES)
+        return isinstance(exc, (ConnectionError, TimeoutError, http.client.HTTPException))
+
+    def next_delay(self, attempt: int, exc: Exception, elapsed: float) -> float | None:
+        """Return seconds to sleep before retry *attempt*, or None to give up."""
+        if attempt >= self.max_retries or not self.is_retryable(exc):
+            return None
+        delay = _retry_after_seconds(exc)
+        if delay is None:
+            delay = self._rand() * min(self.max_delay, self.base_delay * 2**attempt)
+        if elapsed + delay > self.max_total:
+            return None
+        return delay
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+# Sentinel returned by cache lookups on a miss (a cached result may be None).
+CACHE_MISS = object()
+
+
+def request_cache_key(url: str, method: str, payload, mode: str) -> str:
+    """Return a content hash identifying a request.
+
+    *url* is the :func:`build_url` result, *mode* the response mode
+    (``"ai"``, ``"full"`` or ``"raw"``) and *payload* the body as sent.  The
+    body is canonicalised (sorted keys, no whitespace) so that payloads which
+    differ only in key order or formatting share a key.
+    """
+    canonical = json.dumps(
+        [method.upper(), url, mode, payload],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    import hashlib
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of validated API results.
+
+    Entries live at ``<directory>/<key[:2]>/<key>.json`` and expire after
+    :meth:`ttl_for` seconds.  Reads refresh an entry's mtime, and once the
+    cache grows past *max_bytes* the least recently used entries are evicted.
+    *endpoint_ttls* maps fnmatch patterns to TTLs and takes precedence over
+    *ttl*; it defaults to :data:`CACHE_TTL_OVERRIDES`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+        endpoint_ttls: dict | None = None,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.endpoint_ttls = CACHE_TTL_OVERRIDES if endpoint_ttls is None else endpoint_ttls
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ResponseCache":
+        """Build a cache from :func:`get_config` output."""
+        return cls(config["cache_dir"], ttl=config["cache_ttl"], max_bytes=int(config["cache_max_mb"] * 1024 * 1024))
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Return the TTL in seconds for entries of *endpoint*."""
+        for pattern, ttl in self.endpoint_ttls.items():
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return ttl
+        return self.ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str, endpoint: str):
+        """Return the cached result for *key*, or :data:`CACHE_MISS`."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return CACHE_MISS
+        if time.time() - entry.get("created", 0) > self.ttl_for(endpoint):
+            self._discard(path)
+            return CACHE_MISS
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("result")
+
+    def put(self, key: str, endpoint: str, result) -> None:
+        """Store *result* under *key*, evicting old entries if over budget."""
+        path = self._path(key)
+        data = json.dumps({"created": time.time(), "endpoint": endpoint, "result": result}).encode("utf-8")
+        try:
+            import tempfile
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError as exc:
+            _debug_log(f"Cache write failed: {exc}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """Yield ``(path, size, mtime)`` for every cache file."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self._size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._size <= self.max_bytes:
+                break
+            if self._remove(path):
+                self._size -= size
+
+    def _discard(self, path: str) -> None:
+        """Remove the entry at *path* and take its size off the running total."""
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        if self._remove(path):
+            with self._lock:
+                if self._size is not None:
+                    self._size -= size
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+class _Flight:
+    """An in-progress request that identical concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.envelope: dict | None = None
+
+
+class MemoCache:
+    """In-process LRU memo of validated results for long-running workers.
+
+    Bounded by *max_entries* and by *max_bytes* (measured as the JSON size of
+    each result), and entries expire after *ttl* seconds.  :meth:`call`
+    adds single-flight deduplication: while a request for a key is in flight,
+    identical concurrent requests wait for it and share its envelope instead
+    of making their own network call.
+
+    Results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300.0,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        """Return the memoised result for *key*, or :data:`CACHE_MISS`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return CACHE_MISS
+            expires, size, result = entry
+            if self._clock() >= expires:
+                del self._entries[key]
+                self._bytes -= size
+                return CACHE_MISS
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, result) -> None:
+        """Memoise *result*, evicting least recently used entries as needed."""
+        size = len(json.dumps(result))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (self._clock() + self.ttl, size, result)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        """Drop every memoised entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def call(self, key: str, fetch) -> dict:
+        """Return a memoised envelope for *key*, calling *fetch()* at most once.
+
+        *fetch* returns a ``make_request``-style envelope; only successful
+        envelopes are memoised.  Each caller gets its own envelope dict.
+        """
+        result = self.get(key)
+        if result is not CACHE_MISS:
+            return {"status": "ok", "result": result}
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            return dict(flight.envelope)
+
+        try:
+            flight.envelope = fetch()
+            if flight.envelope["status"] == "ok":
+                self.put(key, flight.envelope["result"])
+        except Exception as exc:
+            flight.envelope = {"status": "error", "message": str(exc)}
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+        return dict(flight.envelope)
+
+
+# ---------------------------------------------------------------------------
+# Cost accounting
+# ---------------------------------------------------------------------------
+
+
+class BudgetExceeded(APIError):
+    """Raised instead of sending a request once a :class:`CostLedger` budget is spent."""
+
+
+class CostLedger:
+    """Running total of the ``cost`` (USD) DataForSEO reports for each call.
+
+    Spend is summed per endpoint and overall.  A ledger created with a
+    *parent* also adds everything it records to the parent, so a per-batch
+    ledger rolls up into a per-process one.  With a *budget*, :meth:`check`
+    raises :class:`BudgetExceeded` once the total reaches it;
+    :func:`make_request` checks before every attempt, so no new request is
+    sent past the cap.  Requests already in flight still finish and are
+    recorded, so the total can end slightly above the budget.
+    """
+
+    def __init__(self, budget: float | None = None, parent: "CostLedger | None" = None):
+        self.budget = budget
+        self.parent = parent
+        self.total = 0.0
+        self.requests = 0
+        self._endpoints: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, cost) -> None:
+        """Record one call to *endpoint* costing *cost* (None counts as 0)."""
+        cost = float(cost or 0)
+        endpoint = endpoint.rstrip("/").removesuffix(".ai")
+        with self._lock:
+            self.total += cost
+            self.requests += 1
+            entry = self._endpoints.setdefault(endpoint, [0, 0.0])
+            entry[0] += 1
+            entry[1] += cost
+        if self.parent is not None:
+            self.parent.add(endpoint, cost)
+
+    def check(self) -> None:
+        """Raise :class:`BudgetExceeded` if this ledger or a parent is out of budget."""
+        ledger = self
+        while ledger is not None:
+            if ledger.budget is not None and ledger.total >= ledger.budget:
+                raise BudgetExceeded(f"Budget of ${ledger.budget:.4f} reached (${ledger.total:.4f} spent)")
+            ledger = ledger.parent
+
+    def snapshot(self) -> dict:
+        """Return ``{"total", "requests", "endpoints": {endpoint: {"requests", "cost"}}}``."""
+        with self._lock:
+            return {
+                "total": round(self.total, 6),
+                "requests": self.requests,
+                "endpoints": {
+                    endpoint: {"requests": requests, "cost": round(cost, 6)}
+                    for endpoint, (requests, cost) in sorted(self._endpoints.items())
+                },
+            }
+
+
+class PriceTable:
+    """Per-endpoint prices for estimating what a batch will cost before sending it.
+
+    *prices* maps endpoint paths, or path prefixes such as
+    ``"/v3/backlinks/"``, to a price per task, or to an object with a
+    ``"task"`` price plus a ``"keyword"`` price charged for each entry of
+    the payload's ``keywords`` or ``targets`` array::
+
+        {"/v3/serp/google/organic/live/advanced": 0.002,
+         "/v3/keywords_data/google_ads/search_volume/live": {"task": 0.05},
+         "/v3/dataforseo_labs/": {"task": 0.01, "keyword": 0.0001}}
+
+    The longest matching path wins.
+    """
+
+    def __init__(self, prices: dict):
+        self.prices = {}
+        for path, price in prices.items():
+            if isinstance(price, (int, float)):
+                price = {"task": price}
+            if not isinstance(price, dict):
+                raise ValueError(f"Price for {path} must be a number or an object")
+            self.prices[path] = price
+
+    @classmethod
+    def from_file(cls, path: str) -> "PriceTable":
+        """Load a price table from a JSON file."""
+        with open(path, encoding="utf-8") as f:
+            prices = json.load(f)
+        if not isinstance(prices, dict):
+            raise ValueError(f"Price config {path} must be a JSON object")
+        return cls(prices)
+
+    def price_for(self, endpoint: str) -> dict | None:
+        """Return the price entry for *endpoint*, or None if it has none."""
+        endpoint = endpoint.rstrip("/").removesuffix(".ai")
+        if endpoint in self.prices:
+            return self.prices[endpoint]
+        prefixes = [path for path in self.prices if path.endswith("/") and endpoint.startswith(path)]
+        return self.prices[max(prefixes, key=len)] if prefixes else None
+
+    def estimate(self, endpoint: str, body) -> tuple[int, float | None]:
+        """Return ``(tasks, cost)`` for sending *body* to *endpoint*.
+
+        Oversized bulk arrays count one task per chunk (see
+        :func:`split_bulk_payload`) and array bodies one task per entry.
+        *cost* is None when the endpoint has no price.
+        """
+        tasks = split_bulk_payload(endpoint, body) or (body if isinstance(body, list) else [body])
+        price = self.price_for(endpoint)
+        if price is None:
+            return len(tasks), None
+        cost = 0.0
+        for task in tasks:
+            task = task[0] if isinstance(task, list) and task else task
+            cost += price.get("task", 0)
+            if isinstance(task, dict) and price.get("keyword"):
+                values = task.get("keywords") or task.get("targets") or []
+                cost += price["keyword"] * (len(values) if isinstance(values, list) else 1)
+        return len(tasks), cost
+
+
+# ---------------------------------------------------------------------------
+# HTTP request
+# ---------------------------------------------------------------------------
+
+
+def _error_envelope(exc: Exception, debug: bool = False) -> dict:
+    """Convert a request exception into a ``{"status": "error"}`` envelope."""
+    import urllib.error
+
+    if isinstance(exc, urllib.error.HTTPError):
+        msg = f"HTTP {exc.code}: {exc.reason}"
+    elif isinstance(exc, urllib.error.URLError):
+        msg = str(exc.reason)
+    else:
+        return {"status": "error", "message": str(exc)}
+    if debug:
+        _debug_log(msg)
+    return {"status": "error", "message": msg}
+
+
+def _encode_body(method: str, body, wrap_array: bool = True) -> tuple:
+    """Return ``(payload, data_bytes)`` for a request body.
+
+    Only POST requests carry a body; a dict is wrapped in a one-task array
+    unless *wrap_array* is false.
+    """
+    if body is None or method.upper() != "POST":
+        return None, None
+    payload = [body] if wrap_array and isinstance(body, dict) else body
+    return payload, json.dumps(payload).encode("utf-8")
+
+
+def _decode_response(raw: bytes, mode: str, endpoint: str, timings: dict, ledger: CostLedger | None = None):
+    """Parse and validate a response body and return ``(result, cost)``.
+
+    The ``cost`` is recorded in *ledger* before validation, since failed
+    tasks may still be billed; ``parse`` and ``validate`` durations are
+    added to *timings*.  Raises :class:`APIError`, carrying the ``cost``,
+    on failed status codes.
+    """
+    mark = time.perf_counter()
+    response_data = json.loads(raw)
+    timings["parse"] = time.perf_counter() - mark
+    cost = response_data.get("cost") if isinstance(response_data, dict) else None
+    if ledger is not None:
+        ledger.add(endpoint, cost)
+
+    # Validate
+    mark = time.perf_counter()
+    try:
+        if mode == "full":
+            validate_full_response(response_data)
+            return response_data["tasks"][0]["result"], cost
+        # AI-condensed and raw responses share the outer status check; raw
+        # callers validate individual tasks themselves.
+        validate_ai_response(response_data)
+        return response_data, cost
+    except APIError as exc:
+        exc.cost = cost
+        raise
+    finally:
+        timings["validate"] = time.perf_counter() - mark
+
+
+class _PreparedRequest:
+    """A request ready to send: its URL, headers and encoded body.
+
+    Built once per :func:`make_request`, :func:`async_make_request` or
+    :func:`stream_items` call and reused by every attempt, whatever the
+    transport.  *label* is appended to the debug log line.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        method: str = "POST",
+        body=None,
+        full_response: bool = False,
+        force_full: bool = False,
+        username: str = "",
+        password: str = "",
+        wrap_array: bool = True,
+        debug: bool = False,
+        compress_min_bytes: int | None = None,
+        raw: bool = False,
+        label: str = "",
+    ):
+        self.endpoint = endpoint
+        self.method = method.upper()
+        self.url = build_url(endpoint, full_response=full_response, force_full=force_full or raw)
+        self.mode = "raw" if raw else "full" if full_response or force_full else "ai"
+        self.headers = {
+            "Authorization": build_auth_header(username, password),
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+        self.payload, data_bytes = _encode_body(method, body, wrap_array)
+        if debug:
+            _debug_log(f"Request: {method} {self.url}{label}")
+            if data_bytes:
+                _debug_log(f"Body: {data_bytes.decode()}")
+        self.data_bytes = _compress_body(data_bytes, self.headers, compress_min_bytes)
+
+    def cache_key(self) -> str:
+        return request_cache_key(self.url, self.method, self.payload, self.mode)
+
+
+class _Attempts:
+    """Cache, retry and cost bookkeeping for the attempts at one request.
+
+    Shared by :func:`make_request` and :func:`async_make_request`, which
+    differ only in how an attempt is sent and how a retry delay is waited
+    out.  ``spent`` sums the ``cost`` reported by every attempt.
+    """
+
+    def __init__(
+        self,
+        request: _PreparedRequest,
+        cache_key: str | None,
+        debug: bool,
+        retry: RetryPolicy | None,
+        cache: ResponseCache | None,
+        ledger: CostLedger | None,
+    ):
+        self.request = request
+        self.cache_key = cache_key
+        self.debug = debug
+        self.retry = retry
+        self.cache = cache
+        self.ledger = ledger
+        self.started = time.monotonic()
+        self.attempt = 0
+        self.spent = 0.0
+
+    def cached(self) -> dict | None:
+        """Return the envelope for a *cache* hit, or None on a miss."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self.cache_key, self.request.endpoint)
+        if cached is CACHE_MISS:
+            return None
+        if self.debug:
+            _debug_log(f"Cache hit: {self.cache_key}")
+        return self._envelope(cached)
+
+    def succeeded(self, result, cost) -> dict:
+        """Cache *result* and return its envelope."""
+        self.spent += float(cost or 0)
+        if self.cache is not None:
+            self.cache.put(self.cache_key, self.request.endpoint, result)
+        return self._envelope(result)
+
+    def retry_delay(self, exc: Exception) -> float | None:
+        """Return the seconds to wait before retrying after *exc*, or None to give up.
+
+        A failed attempt may still have been billed; its ``cost`` counts towards ``spent``.
+        """
+        self.spent += float(getattr(exc, "cost", None) or 0)
+        if self.retry is None:
+            return None
+        delay = self.retry.next_delay(self.attempt, exc, time.monotonic() - self.started)
+        if delay is not None:
+            if self.debug:
+                _debug_log(f"Retry {self.attempt + 1} in {delay:.2f}s after: {exc}")
+            self.attempt += 1
+        return delay
+
+    def _envelope(self, result) -> dict:
+        if self.ledger is None:
+            return {"status": "ok", "result": result}
+        return {"status": "ok", "result": result, "cost": round(self.spent, 6)}
+
+
+def _record_attempt(
+    request: _PreparedRequest,
+    timings: dict,
+    status: str,
+    size: int | None,
+    wire: int | None,
+    debug: bool,
+    stats: RequestStats | None,
+) -> None:
+    """Record an attempt's *timings* and byte counts in *stats* and log them with *debug*."""
+    if stats is not None:
+        stats.record(
+            request.endpoint, timings, kind="request", method=request.method, status=status,
+            bytes=size, wire_bytes=wire, sent_bytes=len(request.data_bytes or b""),
+        )
+    if debug:
+        _debug_log("Timing: " + ", ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in timings.items()))
+
+
+def _request_once(
+    request: _PreparedRequest,
+    debug: bool,
+    session: Session | None,
+    rate_limiter: RateLimiter | None,
+    ledger: CostLedger | None = None,
+    stats: RequestStats | None = None,
+):
+    """Make one attempt at a request and return ``(validated result, cost)``.
+
+    The response is decoded with :func:`_decode_response`.  The attempt's
+    phase timings are recorded in *stats*, if given, whether or not it
+    succeeds, and logged with *debug*.  Raises on HTTP, network or
+    validation errors.
+    """
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    status = "error"
+    size = wire = None
+    try:
+        if ledger is not None:
+            ledger.check()
+        if rate_limiter is not None:
+            waited = rate_limiter.acquire(request.endpoint)
+            timings["queue"] = waited
+            if debug and waited > 0:
+                _debug_log(f"Rate limited: queued {waited:.3f}s")
+        if session is not None:
+            resp = session.request(request.method, request.url, body=request.data_bytes, headers=request.headers)
+            timings.update(resp.timings)
+            raw, wire = resp.data, resp.wire_bytes
+        else:
+            import urllib.request
+
+            req = urllib.request.Request(
+                request.url,
+                data=request.data_bytes,
+                headers=request.headers,
+                method=request.method,
+            )
+            sent = time.perf_counter()
+            with urllib.request.urlopen(req) as resp:
+                received = time.perf_counter()
+                body = _BodyReader(resp, resp.headers.get("Content-Encoding"))
+                raw, wire = body.read(), body.wire_bytes
+            timings["ttfb"] = received - sent
+            body.split_timings(timings, time.perf_counter() - received)
+        size = len(raw)
+        result, cost = _decode_response(raw, request.mode, request.endpoint, timings, ledger)
+        status = "ok"
+        return result, cost
+    finally:
+        timings["total"] = time.perf_counter() - started
+        _record_attempt(request, timings, status, size, wire, debug, stats)
+
+
+def make_request(
+    endpoint: str,
+    method: str = "POST",
+    body=None,
+    full_response: bool = False,
+    force_full: bool = False,
+    username: str = "",
+    password: str = "",
+    wrap_array: bool = True,
+    debug: bool = False,
+    session: Session | None = None,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    memo: MemoCache | None = None,
+    raw: bool = False,
+    ledger: CostLedger | None = None,
+    stats: RequestStats | None = None,
+    compress_min_bytes: int | None = None,
+) -> dict:
+    """Execute an HTTP request against the DataForSEO API.
+
+    When *session* is given the request goes over its pooled keep-alive
+    connections; otherwise a one-off ``urllib`` connection is used.  When
+    *rate_limiter* is given each attempt waits for the account's (and its
+    endpoint family's) budget before being sent.  When *retry* is given,
+    transient failures are retried according to that :class:`RetryPolicy`.
+    When *cache* is given, successful results are stored in it and later
+    identical requests are answered from it without touching the network
+    or re-validating.  *memo* adds an in-memory layer in front of *cache*
+    that also collapses concurrent identical requests into one call (see
+    :class:`MemoCache`).
+
+    With *raw* the complete full-mode response (``tasks`` and all) is
+    returned as the result after checking only its outer ``status_code``;
+    per-task status checks are left to the caller.
+
+    When *ledger* is given, every response's ``cost`` is recorded in it,
+    no attempt is made once its budget is spent (see :class:`CostLedger`),
+    and successful envelopes carry the request's ``"cost"`` (summed over
+    retries; 0 for cache hits).  When *stats* is given, the phase timings
+    and byte counts of every attempt are recorded in it (see
+    :class:`RequestStats`).
+
+    Responses are requested gzip/deflate-compressed and decoded on arrival.
+    With *compress_min_bytes*, POST bodies of at least that many bytes are
+    sent gzipped too.
+
+    Returns a dict with ``{"status": "ok", "result": ...}`` on success
+    or ``{"status": "error", "message": ...}`` on failure.
+    """
+    request = _PreparedRequest(
+        endpoint, method, body, full_response, force_full, username, password, wrap_array, debug,
+        compress_min_bytes, raw,
+    )
+    cache_key = request.cache_key() if cache is not None or memo is not None else None
+
+    def fetch() -> dict:
+        attempts = _Attempts(request, cache_key, debug, retry, cache, ledger)
+        cached = attempts.cached()
+        if cached is not None:
+            return cached
+        while True:
+            try:
+                result, cost = _request_once(request, debug, session, rate_limiter, ledger, stats)
+                return attempts.succeeded(result, cost)
+            except Exception as exc:
+                delay = attempts.retry_delay(exc)
+                if delay is None:
+                    return _error_envelope(exc, debug)
+                time.sleep(delay)
+
+    if memo is not None:
+        return memo.call(cache_key, fetch)
+    return fetch()
+
+
+# ---------------------------------------------------------------------------
+# Async client
+# ---------------------------------------------------------------------------
+
+
+async def _read_chunked(reader: "asyncio.StreamReader") -> bytes:
+    """Read a ``Transfer-Encoding: chunked`` body, discarding any trailers."""
+    import http.client
+
+    parts = []
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise http.client.IncompleteRead(b"".join(parts))
+        size = int(size_line.split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(parts)
+        parts.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+class _AsyncConnection:
+    """One HTTP/1.1 keep-alive connection over asyncio streams."""
+
+    def __init__(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter"):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, scheme: str, host: str, port: int | None, ssl_context, timings: dict):
+        """Connect to *host*, recording ``dns`` and ``connect`` (TLS included) in *timings*."""
+        import asyncio
+        import socket
+        import ssl
+        import urllib.error
+
+        if scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unsupported URL scheme: {scheme}")
+        context = (ssl_context or ssl.create_default_context()) if scheme == "https" else None
+        port = port or (443 if context else 80)
+        start = time.perf_counter()
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        timings["dns"] = resolved - start
+        error = None
+        for family, _, _, _, sockaddr in infos:
+            try:
+                reader, writer = await asyncio.open_connection(
+                    sockaddr[0], sockaddr[1], ssl=context, server_hostname=host if context else None, family=family
+                )
+            except OSError as exc:
+                error = exc
+                continue
+            timings["connect"] = time.perf_counter() - resolved
+            return cls(reader, writer)
+        raise error or OSError(f"getaddrinfo returned no addresses for {host}")
+
+    async def exchange(self, method: str, host: str, path: str, headers: dict, body: bytes | None):
+        """Send one request and read its response.
+
+        Returns ``(status, reason, headers, data, will_close)``.
+        """
+        import http.client
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None or method == "POST":
+            lines.append(f"Content-Length: {len(body or b'')}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        if not version.startswith("HTTP/") or not status.isdigit():
+            raise http.client.BadStatusLine(status_line)
+        status = int(status)
+        head = []
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            head.append(line)
+        message = http.client.parse_headers(io.BytesIO(b"".join(head)))
+
+        connection = (message.get("Connection") or "").lower()
+        will_close = "close" in connection or (version == "HTTP/1.0" and "keep-alive" not in connection)
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            data = b""
+        elif "chunked" in (message.get("Transfer-Encoding") or "").lower():
+            data = await _read_chunked(self.reader)
+        elif message.get("Content-Length") is not None:
+            data = await self.reader.readexactly(int(message["Content-Length"]))
+        else:
+            data = await self.reader.read()
+            will_close = True
+        return status, reason, message, data, will_close
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncClient:
+    """asyncio keep-alive connection pool, the event-loop counterpart of :class:`Session`.
+
+    Speaks HTTP/1.1 over ``asyncio`` streams, so many requests can be in
+    flight on one event loop without a thread each.  At most *max_per_host*
+    connections to a host are open at once; further requests wait for a
+    free one.  *timeout* bounds opening a connection (DNS, TCP and TLS) and,
+    separately, each request/response exchange.  Errors are
+    raised as ``urllib.error.HTTPError`` / ``URLError``, exactly like
+    :class:`Session`.  A client belongs to the event loop it is first used
+    on.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 10,
+        timeout: float | None = None,
+        ssl_context: "ssl.SSLContext | None" = None,
+    ):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle: dict[tuple, list] = {}
+        self._slots: dict[tuple, "asyncio.Semaphore"] = {}
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def request(
+        self, method: str, url: str, body: bytes | None = None, headers: dict | None = None
+    ) -> SessionResponse:
+        """Send a request over a pooled connection and read the full response."""
+        import asyncio
+        import http.client
+        import urllib.error
+        import urllib.parse
+
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        host = parts.netloc.rpartition("@")[2]
+
+        slot = self._slots.setdefault(key, asyncio.Semaphore(self.max_per_host))
+        async with slot:
+            idle = self._idle.get(key)
+            conn, reused = (idle.pop(), True) if idle else (None, False)
+            while True:
+                timings: dict[str, float] = {}
+                try:
+                    if conn is None:
+                        opening = _AsyncConnection.open(*key, self.ssl_context, timings)
+                        conn = await asyncio.wait_for(opening, self.timeout)
+                    start = time.perf_counter()
+                    exchange = conn.exchange(method, host, path, headers or {}, body)
+                    status, reason, message, data, will_close = await asyncio.wait_for(exchange, self.timeout)
+                    timings["ttfb"] = time.perf_counter() - start
+                    break
+                except (*_stale_connection_errors(), asyncio.IncompleteReadError) as exc:
+                    if conn is not None:
+                        conn.close()
+                    if not reused:
+                        raise urllib.error.URLError(exc) from exc
+                    conn, reused = None, False
+                except asyncio.TimeoutError as exc:
+                    if conn is not None:
+                        conn.close()
+                    raise urllib.error.URLError(TimeoutError("timed out")) from exc
+                except (OSError, http.client.HTTPException, ValueError) as exc:
+                    if conn is not None:
+                        conn.close()
+                    raise urllib.error.URLError(exc) from exc
+                except BaseException:
+                    if conn is not None:
+                        conn.close()
+                    raise
+            if will_close or self._closed:
+                conn.close()
+            else:
+                self._idle.setdefault(key, []).append(conn)
+
+        body = _BodyReader(io.BytesIO(data), message.get("Content-Encoding"))
+        try:
+            data = body.read()
+        except http.client.HTTPException as exc:
+            raise urllib.error.URLError(exc) from exc
+        if body.compressed:
+            timings["decode"] = body.seconds
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason, message, io.BytesIO(data))
+        return SessionResponse(status, reason, message, data, timings, body.wire_bytes)
+
+    async def aclose(self) -> None:
+        """Close every idle connection.  Connections in use close on return."""
+        self._closed = True
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+async def _async_request_once(
+    client: AsyncClient,
+    request: _PreparedRequest,
+    debug: bool,
+    rate_limiter: RateLimiter | None,
+    ledger: CostLedger | None,
+    stats: RequestStats | None,
+):
+    """Async counterpart of :func:`_request_once`."""
+    import asyncio
+
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    status = "error"
+    size = wire = None
+    try:
+        if ledger is not None:
+            ledger.check()
+        if rate_limiter is not None:
+            waited = timings["queue"] = rate_limiter.reserve(request.endpoint)
+            if waited > 0:
+                if debug:
+                    _debug_log(f"Rate limited: queued {waited:.3f}s")
+                await asyncio.sleep(waited)
+        resp = await client.request(request.method, request.url, body=request.data_bytes, headers=request.headers)
+        timings.update(resp.timings)
+        size, wire = len(resp.data), resp.wire_bytes
+        result, cost = _decode_response(resp.data, request.mode, request.endpoint, timings, ledger)
+        status = "ok"
+        return result, cost
+    finally:
+        timings["total"] = time.perf_counter() - started
+        _record_attempt(request, timings, status, size, wire, debug, stats)
+
+
+async def async_make_request(
+    endpoint: str,
+    method: str = "POST",
+    body=None,
+    full_response: bool = False,
+    force_full: bool = False,
+    username: str = "",
+    password: str = "",
+    wrap_array: bool = True,
+    debug: bool = False,
+    client: AsyncClient | None = None,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    raw: bool = False,
+    ledger: CostLedger | None = None,
+    stats: RequestStats | None = None,
+    compress_min_bytes: int | None = None,
+) -> dict:
+    """Execute a request like :func:`make_request` without blocking the event loop.
+
+    URL building, auth, validation, retries, rate limiting, caching, cost
+    accounting and the returned envelope are the same as
+    :func:`make_request`; *client* takes the place of *session* (a one-off
+    :class:`AsyncClient` is used when it is None).  Retry and rate-limit
+    waits are ``asyncio.sleep`` calls.  There is no *memo*: identical
+    concurrent requests can be collapsed with ``asyncio`` tasks instead.
+    """
+    import asyncio
+
+    if client is None:
+        async with AsyncClient() as client:
+            return await async_make_request(
+                endpoint, method, body, full_response, force_full, username, password, wrap_array, debug,
+                client, rate_limiter, retry, cache, raw, ledger, stats, compress_min_bytes,
+            )
+
+    request = _PreparedRequest(
+        endpoint, method, body, full_response, force_full, username, password, wrap_array, debug,
+        compress_min_bytes, raw, label=" (async)",
+    )
+    attempts = _Attempts(request, request.cache_key() if cache is not None else None, debug, retry, cache, ledger)
+    cached = attempts.cached()
+    if cached is not None:
+        return cached
+    while True:
+        try:
+            result, cost = await _async_request_once(client, request, debug, rate_limiter, ledger, stats)
+            return attempts.succeeded(result, cost)
+        except Exception as exc:
+            delay = attempts.retry_delay(exc)
+            if delay is None:
+                return _error_envelope(exc, debug)
+            await asyncio.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Streaming response parsing
+# ---------------------------------------------------------------------------
+
+
+class _JSONReader:
+    """Incremental JSON reader over a binary stream.
+
+    Containers are walked with :meth:`keys` and :meth:`elements`; any other
+    value is decoded whole with :meth:`value`, so only one such value is
+    held in the buffer at a time.
+    """
+
+    def __init__(self, fp, chunk_size: int = 65536):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the stream is exhausted."""
+        if self._eof:
+            return False
+        # Grow reads with the pending buffer so one large value is decoded
+        # in O(n) rather than re-scanned once per chunk.
+        chunk = self._fp.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._text.decode(b"", final=True)
+        else:
+            self._buf = self._buf[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ("" at end of stream)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON response: expected {chars!r}, got {char or 'end of data'!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decode and return the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                if self._fill():
+                    continue
+                raise ValueError(f"Invalid JSON response: {exc}") from exc
+            # A number running up to the buffer edge ("1" of "12", "0" of
+            # "0.5") may continue in the next chunk.
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and not self._eof:
+                tail = end
+                while tail < len(self._buf) and self._buf[tail] in "0123456789.eE+-":
+                    tail += 1
+                if tail == len(self._buf) and self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def keys(self):
+        """Walk an object, yielding each key; the caller consumes its value."""
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self):
+        """Walk an array, yielding once per element; the caller consumes it."""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self._expect(",]") == "]":
+                return
+
+
+def iter_response_items(fp, envelope: dict | None = None, chunk_size: int = 65536):
+    """Yield the ``items`` of a DataForSEO response read incrementally from *fp*.
+
+    Items are taken from ``tasks[].result[].items[]`` in full responses and
+    from the top-level ``items`` in AI-condensed ones; each is decoded and
+    yielded on its own, so memory stays flat however many items there are.
+    Everything else is collected into *envelope* (the response minus its
+    items) and validated: status codes that precede the items are checked
+    before any item of that task is yielded, and the whole envelope is
+    checked with :func:`validate_full_response` or
+    :func:`validate_ai_response` at the end.  Raises :class:`APIError` on
+    failed status codes and ``ValueError`` on malformed JSON.
+    """
+    reader = _JSONReader(fp, chunk_size)
+    envelope = {} if envelope is None else envelope
+
+    def elements_of():
+        # ``result`` is null for tasks that produced nothing.
+        if reader.peek() == "n":
+            reader.value()
+            return
+        yield from reader.elements()
+
+    for key in reader.keys():
+        if key == "items":
+            if "status_code" in envelope:
+                validate_ai_response(envelope)
+            for _ in elements_of():
+                yield reader.value()
+        elif key == "tasks":
+            if "status_code" in envelope:
+                validate_ai_response(envelope)
+            tasks = envelope["tasks"] = []
+            for _ in elements_of():
+                task = {}
+                tasks.append(task)
+                for task_key in reader.keys():
+                    if task_key != "result":
+                        task[task_key] = reader.value()
+                        continue
+                    if "status_code" in task:
+                        validate_task(task)
+                    results = task["result"] = None if reader.peek() == "n" else []
+                    for _ in elements_of():
+                        result = {}
+                        results.append(result)
+                        for result_key in reader.keys():
+                            if result_key == "items":
+                                for _ in elements_of():
+                                    yield reader.value()
+                            else:
+                                result[result_key] = reader.value()
+        else:
+            envelope[key] = reader.value()
+
+    if "tasks" in envelope:
+        validate_full_response(envelope)
+    else:
+        validate_ai_response(envelope)
+
+
+def _open_response(url: str, method: str, data_bytes: bytes | None, headers: dict, session: Session | None):
+    """Send a request and return the unread response (a context manager).
+
+    Reads from it undo any gzip/deflate encoding: it is a
+    :class:`PooledResponse` or a :class:`_BodyReader` over ``urlopen``.
+    """
+    if session is not None:
+        return session.open(method, url, body=data_bytes, headers=headers)
+    import urllib.request
+
+    req = urllib.request.Request(url, data=data_bytes, headers=headers, method=method)
+    resp = urllib.request.urlopen(req)
+    return _BodyReader(resp, resp.headers.get("Content-Encoding"))
+
+
+def stream_items(
+    endpoint: str,
+    method: str = "POST",
+    body=None,
+    full_response: bool = False,
+    force_full: bool = False,
+    username: str = "",
+    password: str = "",
+    wrap_array: bool = True,
+    debug: bool = False,
+    session: Session | None = None,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    ledger: CostLedger | None = None,
+    stats: RequestStats | None = None,
+    compress_min_bytes: int | None = None,
+):
+    """Send a request like :func:`make_request` and yield its items as they arrive.
+
+    The response is parsed from the socket with :func:`iter_response_items`
+    instead of being read and decoded whole.  Failures before the first item
+    is yielded are retried per *retry*; after that they are raised, since
+    the caller has already consumed part of the response.  Responses are
+    never cached.  The response's ``cost`` is recorded in *ledger* once it
+    has been read to the end, and its connection phases plus a ``total``
+    (send to last item, including the caller's time) in *stats*.  Raises
+    the same exceptions
+    :func:`make_request` turns into error envelopes (see
+    :func:`_error_envelope`).
+    """
+    request = _PreparedRequest(
+        endpoint, method, body, full_response, force_full, username, password, wrap_array, debug,
+        compress_min_bytes, label=" (streaming)",
+    )
+
+    started = time.monotonic()
+    attempt = 0
+    yielded = 0
+    while True:
+        try:
+            if ledger is not None:
+                ledger.check()
+            if rate_limiter is not None:
+                rate_limiter.acquire(endpoint)
+            envelope: dict = {}
+            sent = time.perf_counter()
+            with _open_response(request.url, request.method, request.data_bytes, request.headers, session) as resp:
+                for item in iter_response_items(resp, envelope):
+                    yield item
+                    yielded += 1
+                # Drain any trailing bytes so the connection can be reused.
+                while resp.read(65536):
+                    pass
+            if ledger is not None:
+                ledger.add(endpoint, envelope.get("cost"))
+            if stats is not None:
+                counts = getattr(resp, "body", resp)
+                timings = dict(getattr(resp, "timings", {}), total=time.perf_counter() - sent)
+                if counts.compressed:
+                    timings["decode"] = counts.seconds
+                stats.record(
+                    endpoint, timings, kind="stream", method=request.method, status="ok", items=yielded,
+                    bytes=counts.bytes, wire_bytes=counts.wire_bytes, sent_bytes=len(request.data_bytes or b""),
+                )
+            return
+        except Exception as exc:
+            delay = None
+            if yielded == 0 and retry is not None:
+                delay = retry.next_delay(attempt, exc, time.monotonic() - started)
+            if delay is None:
+                raise
+            if debug:
+                _debug_log(f"Retry {attempt + 1} in {delay:.2f}s after: {exc}")
+            time.sleep(delay)
+            attempt += 1
+
+
+# ---------------------------------------------------------------------------
+# Concurrent execution
+# ---------------------------------------------------------------------------
+
+
+def run_concurrently(fn, items, concurrency: int = 1):
+    """Yield ``fn(item)`` for each of *items*, in input order.
+
+    Up to *concurrency* calls run at once on a thread pool, and at most
+    ``2 * concurrency`` results are buffered ahead of the consumer, so *items*
+    may be an unbounded iterator.  An exception raised by *fn* is yielded as a
+    ``{"status": "error", "message": ...}`` envelope in that item's place
+    instead of aborting the rest of the run.
+    """
+
+    def call(item):
+        try:
+            return fn(item)
+        except Exception as exc:
+            return {"status": "error", "message": str(exc)}
+
+    if concurrency <= 1:
+        for item in items:
+            yield call(item)
+        return
+
+    import concurrent.futures
+
+    pending: collections.deque = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for item in items:
+            pending.append(pool.submit(call, item))
+            if len(pending) >= 2 * concurrency:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# ---------------------------------------------------------------------------
+# Standard task queue (task_post / tasks_ready / task_get)
+# ---------------------------------------------------------------------------
+
+
+def standard_task_endpoints(endpoint: str) -> tuple[str, str, str]:
+    """Derive the Standard-queue endpoints for a Live endpoint.
+
+    Returns ``(task_post, tasks_ready, task_get)`` where *task_get* contains a
+    ``{id}`` placeholder.  The Live result type is kept for ``task_get``::
+
+        /v3/serp/google/organic/live/advanced ->
+            /v3/serp/google/organic/task_post
+            /v3/serp/google/organic/tasks_ready
+            /v3/serp/google/organic/task_get/advanced/{id}
+
+    An endpoint without a ``/live`` segment is treated as the queue's base
+    path (a trailing ``/task_post`` is ignored).
+    """
+    endpoint = endpoint.rstrip("/")
+    if "/live" in endpoint:
+        base, _, result_type = endpoint.partition("/live")
+        result_type = result_type.strip("/")
+    else:
+        base = endpoint[: -len("/task_post")] if endpoint.endswith("/task_post") else endpoint
+        result_type = ""
+    task_get = f"{base}/task_get/{result_type}/{{id}}" if result_type else f"{base}/task_get/{{id}}"
+    return f"{base}/task_post", f"{base}/tasks_ready", task_get
+
+
+def send_packed(
+    endpoint: str,
+    payloads: list,
+    pack_size: int = MAX_TASKS_PER_POST,
+    accepted: tuple = (200,),
+    extract=lambda task: task.get("result"),
+    concurrency: int = 1,
+    **request_kwargs,
+) -> list[dict]:
+    """POST *payloads* to *endpoint* packed into arrays of up to *pack_size* tasks.
+
+    One HTTP request is sent per array (up to *concurrency* at once), and the
+    response's ``tasks`` array is split back out by position.  Each task is
+    validated on its own with :func:`validate_task`, so one bad payload does
+    not fail its neighbours.
+
+    Returns one envelope per payload, in order, whose result is
+    ``extract(task)`` -- by default the task's ``result``, matching
+    :func:`make_request` in full-response mode.  *request_kwargs* are passed
+    to :func:`make_request` (credentials, session, retry, ...); with a
+    ``ledger``, each successful envelope carries its task's ``"cost"``.
+    """
+    with_cost = request_kwargs.get("ledger") is not None
+    chunks = [payloads[start:start + pack_size] for start in range(0, len(payloads), pack_size)]
+
+    def send_chunk(chunk: list) -> list[dict]:
+        response = make_request(endpoint, "POST", chunk, raw=True, wrap_array=False, **request_kwargs)
+        if response["status"] != "ok":
+            return [dict(response) for _ in chunk]
+        tasks = response["result"].get("tasks") or []
+        outcomes = []
+        for i in range(len(chunk)):
+            if i >= len(tasks):
+                outcomes.append({"status": "error", "message": "No task returned for payload"})
+                continue
+            try:
+                validate_task(tasks[i], accepted=accepted)
+                outcome = {"status": "ok", "result": extract(tasks[i])}
+                if with_cost:
+                    outcome["cost"] = tasks[i].get("cost") or 0
+                outcomes.append(outcome)
+            except APIError as exc:
+                outcomes.append({"status": "error", "message": str(exc)})
+        return outcomes
+
+    outcomes: list[dict] = []
+    for chunk, result in zip(chunks, run_concurrently(send_chunk, chunks, concurrency)):
+        outcomes.extend(result if isinstance(result, list) else [dict(result) for _ in chunk])
+    return outcomes
+
+
+def post_tasks(endpoint: str, payloads: list, **request_kwargs) -> list[dict]:
+    """Submit *payloads* to a ``task_post`` *endpoint*, 100 tasks per call.
+
+    Returns one envelope per payload, in order: ``{"status": "ok", "result":
+    <task id>}`` for accepted tasks, or an error envelope.
+    """
+    return send_packed(endpoint, payloads, accepted=(200, 201), extract=lambda task: task["id"], **request_kwargs)
+
+
+def run_standard_tasks(
+    endpoint: str,
+    payloads: list,
+    concurrency: int = 4,
+    poll_interval: float = 5.0,
+    max_poll_interval: float = 60.0,
+    timeout: float = 3600.0,
+    **request_kwargs,
+):
+    """Run *payloads* through the Standard queue and yield results as they finish.
+
+    Tasks are submitted with :func:`post_tasks`, then ``tasks_ready`` is
+    polled every *poll_interval* seconds, backing off up to
+    *max_poll_interval* while nothing new is ready (the API allows about 20
+    ``tasks_ready`` calls a minute).  Ready tasks are fetched with
+    ``task_get`` on up to *concurrency* threads while polling continues.
+
+    Yields ``(index, envelope)`` pairs in completion order, where *index* is
+    the payload's position in *payloads*.  Tasks still pending after
+    *timeout* seconds yield an error envelope.  A ``cache`` or ``memo`` in
+    *request_kwargs* is only used for ``task_get``, never for submitting or
+    polling.
+    """
+    post_endpoint, ready_endpoint, get_endpoint = standard_task_endpoints(endpoint)
+    queue_kwargs = {k: v for k, v in request_kwargs.items() if k not in ("cache", "memo")}
+
+    pending: dict[str, int] = {}
+    for index, outcome in enumerate(post_tasks(post_endpoint, payloads, **queue_kwargs)):
+        if outcome["status"] == "ok":
+            pending[outcome["result"]] = index
+        else:
+            yield index, outcome
+
+    deadline = time.monotonic() + timeout
+    interval = poll_interval
+    next_poll = time.monotonic() + interval
+    import concurrent.futures
+
+    downloads: dict[concurrent.futures.Future, int] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while pending or downloads:
+            if pending and time.monotonic() >= next_poll:
+                ready = make_request(ready_endpoint, "GET", full_response=True, **queue_kwargs)
+                ready_ids = []
+                if ready["status"] == "ok":
+                    ready_ids = [t.get("id") for t in ready["result"] or [] if t.get("id") in pending]
+                for task_id in ready_ids:
+                    future = pool.submit(
+                        make_request, get_endpoint.format(id=task_id), "GET", full_response=True, **request_kwargs
+                    )
+                    downloads[future] = pending.pop(task_id)
+                interval = poll_interval if ready_ids else min(max_poll_interval, interval * 2)
+                next_poll = time.monotonic() + interval
+
+                if pending and time.monotonic() >= deadline:
+                    for task_id, index in sorted(pending.items(), key=lambda item: item[1]):
+                        yield index, {"status": "error", "message": f"Timed out waiting for task {task_id}"}
+                    pending.clear()
+
+            wait = max(0.0, next_poll - time.monotonic()) if pending else None
+            if downloads:
+                done, _ = concurrent.futures.wait(
+                    downloads, timeout=wait, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    index = downloads.pop(future)
+                    try:
+                        yield index, future.result()
+                    except Exception as exc:
+                        yield index, {"status": "error", "message": str(exc)}
+            elif pending:
+                time.sleep(wait)
+
+
+# ---------------------------------------------------------------------------
+# Bulk array chunking
+# ---------------------------------------------------------------------------
+
+# Bulk endpoints that answer each keyword/target independently, mapped to the
+# array field they take and its per-call maximum.  Endpoints whose results
+# compare the inputs with each other (Trends graphs, serp_competitors) can't be
+# split and are deliberately absent.
+BULK_ARRAY_LIMITS = {
+    "/v3/keywords_data/google_ads/search_volume/live": ("keywords", 1000),
+    "/v3/ai_optimization/ai_keyword_data/keywords_search_volume/live": ("keywords", 1000),
+    "/v3/dataforseo_labs/google/bulk_keyword_difficulty/live": ("keywords", 1000),
+    "/v3/dataforseo_labs/google/search_intent/live": ("keywords", 1000),
+    "/v3/dataforseo_labs/google/keyword_overview/live": ("keywords", 700),
+    "/v3/dataforseo_labs/google/historical_keyword_data/live": ("keywords", 700),
+    "/v3/dataforseo_labs/google/bulk_traffic_estimation/live": ("targets", 1000),
+    "/v3/backlinks/bulk_backlinks/live": ("targets", 1000),
+    "/v3/backlinks/bulk_referring_domains/live": ("targets", 1000),
+    "/v3/backlinks/bulk_ranks/live": ("targets", 1000),
+    "/v3/backlinks/bulk_spam_score/live": ("targets", 1000),
+    "/v3/backlinks/bulk_new_lost_backlinks/live": ("targets", 1000),
+    "/v3/backlinks/bulk_new_lost_referring_domains/live": ("targets", 1000),
+    "/v3/backlinks/bulk_pages_summary/live": ("targets", 1000),
+}
+
+# Chunks of one oversized request sent at once
+DEFAULT_CHUNK_CONCURRENCY = 4
+
+# Counters summed across chunks when their results are merged
+_SUMMED_COUNTS = ("items_count", "total_count")
+
+
+def split_bulk_payload(endpoint: str, body) -> list | None:
+    """Split an oversized bulk *body* into payloads within the endpoint's limit.
+
+    *body* is a payload dict, or a one-task array holding one (chunks keep
+    that shape).  Returns the chunk bodies in input order, or None when
+    *endpoint* is not in :data:`BULK_ARRAY_LIMITS` or the array already fits.
+    """
+    limit = BULK_ARRAY_LIMITS.get(endpoint.rstrip("/").removesuffix(".ai"))
+    if limit is None:
+        return None
+    field, size = limit
+    wrapped = isinstance(body, list) and len(body) == 1
+    task = body[0] if wrapped else body
+    if not isinstance(task, dict) or not isinstance(task.get(field), list) or len(task[field]) <= size:
+        return None
+    values = task[field]
+    chunks = [dict(task, **{field: values[start:start + size]}) for start in range(0, len(values), size)]
+    return [[chunk] for chunk in chunks] if wrapped else chunks
+
+
+def merge_chunk_results(results: list):
+    """Merge the results of the chunks of one bulk request, in chunk order.
+
+    ``items`` lists are concatenated and ``items_count``/``total_count``
+    summed; every other field is taken from the first chunk.  Full-mode
+    results of ``[{"items": ...}]`` objects are merged position by position;
+    other full-mode lists (such as ``search_volume``'s one object per
+    keyword) are concatenated.
+    """
+    first = results[0]
+    if isinstance(first, list) and all(isinstance(r, list) for r in results):
+        has_items = any(isinstance(entry, dict) and "items" in entry for r in results for entry in r)
+        if has_items and all(len(r) == len(first) for r in results):
+            return [merge_chunk_results(list(group)) for group in zip(*results)]
+        return [entry for r in results for entry in r]
+    if not isinstance(first, dict) or not all(isinstance(r, dict) for r in results):
+        return first
+    merged = dict(first)
+    if any(isinstance(r.get("items"), list) for r in results):
+        merged["items"] = [item for r in results for item in r.get("items") or []]
+    for key in _SUMMED_COUNTS:
+        counts = [r.get(key) for r in results]
+        if all(isinstance(c, int) for c in counts):
+            merged[key] = sum(counts)
+    return merged
+
+
+def make_chunked_request(
+    endpoint: str,
+    method: str = "POST",
+    body=None,
+    concurrency: int = DEFAULT_CHUNK_CONCURRENCY,
+    **request_kwargs,
+) -> dict:
+    """Call :func:`make_request`, splitting oversized bulk arrays across calls.
+
+    When :func:`split_bulk_payload` splits *body*, the chunks are sent up to
+    *concurrency* at a time and their results merged with
+    :func:`merge_chunk_results`, so the caller sees one response with every
+    item in input order, and any ``"cost"`` summed over the chunks.  If any
+    chunk fails, the error envelope of the first failed chunk is returned,
+    its message prefixed with the chunk's position.  Otherwise this is
+    exactly :func:`make_request`.
+    """
+    chunks = split_bulk_payload(endpoint, body) if method.upper() == "POST" else None
+    if chunks is None:
+        return make_request(endpoint, method, body, **request_kwargs)
+
+    def send(chunk) -> dict:
+        return make_request(endpoint, method, chunk, **request_kwargs)
+
+    envelopes = list(run_concurrently(send, chunks, min(concurrency, len(chunks))))
+    for number, envelope in enumerate(envelopes, 1):
+        if envelope["status"] != "ok":
+            return {**envelope, "message": f"Chunk {number}/{len(chunks)}: {envelope['message']}"}
+    merged = {"status": "ok", "result": merge_chunk_results([envelope["result"] for envelope in envelopes])}
+    if any("cost" in envelope for envelope in envelopes):
+        merged["cost"] = round(sum(envelope.get("cost") or 0 for envelope in envelopes), 6)
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Pagination
+# ---------------------------------------------------------------------------
+
+
+def _next_page_body(body: dict, page: dict, offset: int, limit: int) -> dict | None:
+    """Return the body for the page after *page*, or None if it was the last.
+
+    Endpoints that return a ``search_after_token`` are continued with it;
+    the rest are continued with ``offset``.
+    """
+    items = page.get("items") or []
+    if not items or len(items) < limit:
+        return None
+    total = page.get("total_count")
+    token = page.get("search_after_token")
+    if token:
+        next_body = {k: v for k, v in body.items() if k != "offset"}
+        next_body["search_after_token"] = token
+        return next_body
+    if total is not None and offset + len(items) >= total:
+        return None
+    return dict(body, offset=offset + len(items))
+
+
+def paginate(
+    endpoint: str,
+    body: dict | None = None,
+    max_items: int | None = None,
+    page_size: int = MAX_PAGE_LIMIT,
+    **request_kwargs,
+):
+    """Yield the ``items`` of *endpoint* page by page.
+
+    Pages of up to *page_size* items are requested in full-response mode,
+    advancing with ``search_after_token`` when the endpoint returns one and
+    with ``offset`` otherwise.  The next page is fetched in the background
+    while the current one is being consumed.  Iteration stops after
+    *max_items* items, or when a page comes back short, empty or past
+    ``total_count``; the last request asks only for the items still needed.
+
+    Any ``limit`` in *body* is replaced by the page size; an ``offset`` is
+    used as the starting point.  *request_kwargs* are passed to
+    :func:`make_request`.  Raises :class:`APIError` if a page fails.
+    """
+    body = dict(body or {})
+    page_size = max(1, min(page_size, MAX_PAGE_LIMIT))
+    offset = body.get("offset", 0)
+    yielded = 0
+
+    def fetch(page_body: dict) -> dict:
+        return make_request(endpoint, "POST", page_body, full_response=True, **request_kwargs)
+
+    def limit_for(count: int) -> int:
+        return page_size if max_items is None else min(page_size, max_items - count)
+
+    if max_items is not None and max_items <= 0:
+        return
+    limit = limit_for(0)
+    page_body = dict(body, limit=limit)
+    # A prefetch still in flight when the caller stops iterating is left to
+    # finish on its own rather than blocking the caller.
+    import concurrent.futures
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(fetch, page_body)
+    try:
+        while future is not None:
+            response = future.result()
+            if response["status"] != "ok":
+                raise APIError(response["message"])
+            result = response["result"]
+            page = (result[0] if result else {}) if isinstance(result, list) else result or {}
+            items = page.get("items") or []
+            fetched = yielded + len(items)
+
+            future = None
+            next_body = _next_page_body(page_body, page, offset, limit)
+            if next_body is not None and (max_items is None or fetched < max_items):
+                offset = next_body.get("offset", offset + len(items))
+                limit = limit_for(fetched)
+                page_body = dict(next_body, limit=limit)
+                future = pool.submit(fetch, page_body)
+
+            for item in items:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield item
+                yielded += 1
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Batch mode (newline-delimited JSON)
+# ---------------------------------------------------------------------------
+
+
+def apply_fields(result: dict, field_spec: str | None) -> dict:
+    """Apply ``--fields`` filtering to a successful response envelope.
+
+    A full-mode result (a list of result objects) is projected one object at
+    a time, so the same paths work with and without ``--full-response``.
+    """
+    if result["status"] == "ok" and field_spec:
+        projector = compile_fields(field_spec)
+        if isinstance(result["result"], list):
+            result["result"] = [projector.project(entry) for entry in result["result"]]
+        else:
+            result["result"] = projector.project(result["result"])
+    return result
+
+
+def parse_batch_line(line: str, endpoint: str | None = None, method: str = "POST") -> dict:
+    """Parse one NDJSON batch line into a request spec.
+
+    A line is either a bare payload sent to *endpoint*, or an envelope object
+    carrying its own ``"endpoint"`` plus optional ``"body"`` and ``"method"``::
+
+        {"keyword": "seo"}
+        {"endpoint": "/v3/backlinks/summary/live", "body": {"target": "example.com"}}
+
+    Returns ``{"endpoint": ..., "method": ..., "body": ...}``.  Raises
+    ``ValueError`` for invalid JSON or when no endpoint is known.
+    """
+    try:
+        parsed = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON input: {exc}") from exc
+
+    if isinstance(parsed, dict) and "endpoint" in parsed:
+        return {
+            "endpoint": parsed["endpoint"],
+            "method": str(parsed.get("method", method)).upper(),
+            "body": parsed.get("body"),
+        }
+    if not endpoint:
+        raise ValueError('No endpoint given: pass --endpoint or set "endpoint" on the line')
+    return {"endpoint": endpoint, "method": method, "body": parsed}
+
+
+def _parse_batch_lines(lines, endpoint: str | None, method: str):
+    """Yield a spec, or a ``ValueError`` for unparsable input, per non-blank line."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield parse_batch_line(line, endpoint, method)
+        except ValueError as exc:
+            yield exc
+
+
+def _windows(items, size: int):
+    """Yield successive lists of up to *size* items from the iterable *items*."""
+    window: list = []
+    for item in items:
+        window.append(item)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def _plan_packs(specs: list, pack_size: int) -> list[tuple]:
+    """Split parsed batch *specs* into jobs of ``(positions, specs, packed)``.
+
+    POST payloads bound for the same endpoint are packed together, up to
+    *pack_size* per job; GET requests, array bodies and parse errors become
+    single unpacked jobs.
+    """
+    jobs: list[tuple] = []
+    open_packs: dict[str, tuple] = {}
+    for pos, spec in enumerate(specs):
+        if isinstance(spec, ValueError) or spec["method"] != "POST" or not isinstance(spec["body"], dict):
+            jobs.append(([pos], [spec], False))
+            continue
+        pack = open_packs.get(spec["endpoint"])
+        if pack is None or len(pack[0]) >= pack_size:
+            pack = open_packs[spec["endpoint"]] = ([], [], True)
+            jobs.append(pack)
+        pack[0].append(pos)
+        pack[1].append(spec)
+    return jobs
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Return *keyword* lowercased, trimmed and with runs of whitespace collapsed."""
+    return " ".join(keyword.split()).lower()
+
+
+def apply_defaults(body, defaults: dict | None):
+    """Return a copy of a request *body* with *defaults* filled in.
+
+    Each *defaults* entry (e.g. ``{"location_code": 2840, "language_code":
+    "en"}``) is added when the payload sets no field with the same prefix, so
+    a payload with ``location_name`` keeps it and gets no ``location_code``.
+    Nothing else changes.  Array bodies are handled task by task; other
+    values are returned unchanged.
+    """
+    if isinstance(body, list):
+        return [apply_defaults(task, defaults) for task in body]
+    if not isinstance(body, dict) or not defaults:
+        return body
+    body = dict(body)
+    for key, value in defaults.items():
+        prefix = key.split("_", 1)[0] + "_"
+        if not any(name.startswith(prefix) for name in body):
+            body[key] = value
+    return body
+
+
+def canonical_payload(body, defaults: dict | None = None):
+    """Return a canonical copy of a request *body* for deduplication.
+
+    *defaults* are filled in with :func:`apply_defaults`, ``keyword`` and
+    each string in ``keywords`` are normalised with :func:`normalize_keyword`
+    and ``target`` is trimmed.  Keys are sorted.  Array bodies are
+    canonicalised task by task; other values are returned unchanged.
+    """
+    if isinstance(body, list):
+        return [canonical_payload(task, defaults) for task in body]
+    if not isinstance(body, dict):
+        return body
+    body = apply_defaults(body, defaults) if defaults else dict(body)
+    if isinstance(body.get("keyword"), str):
+        body["keyword"] = normalize_keyword(body["keyword"])
+    if isinstance(body.get("keywords"), list):
+        body["keywords"] = [normalize_keyword(k) if isinstance(k, str) else k for k in body["keywords"]]
+    if isinstance(body.get("target"), str):
+        body["target"] = body["target"].strip()
+    return {key: body[key] for key in sorted(body)}
+
+
+class BatchPlanner:
+    """Fill in batch defaults and send each distinct request only once.
+
+    Spec bodies get *defaults* via :func:`apply_defaults` and are otherwise
+    sent as written.  With *dedupe*, specs whose :func:`canonical_payload`
+    is the same share one request (the first such spec's) and its envelope
+    is fanned out to every line that asked for it.  Successful results are held
+    in a :class:`MemoCache` for the rest of the batch, so a repeat later in
+    the input is answered from memory; a failed request is retried by the
+    next duplicate.  ``lines``, ``sent`` and ``saved`` count what happened.
+    """
+
+    def __init__(self, defaults: dict | None = None, dedupe: bool = True, memo: MemoCache | None = None):
+        self.defaults = dict(defaults or {})
+        self.dedupe = dedupe
+        self.memo = memo if memo is not None else MemoCache(max_entries=1 << 20, ttl=float("inf"))
+        self.lines = 0
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def saved(self) -> int:
+        """Number of requests avoided by deduplication."""
+        return self.lines - self.sent
+
+    def prepare(self, spec: dict) -> dict:
+        """Return *spec* with the batch defaults filled into its body."""
+        return dict(spec, body=apply_defaults(spec["body"], self.defaults))
+
+    @staticmethod
+    def key(spec: dict) -> str:
+        """Return the deduplication key of *spec*, computed from its canonical body."""
+        return request_cache_key(spec["endpoint"], spec["method"], canonical_payload(spec["body"]), "batch")
+
+    def _count(self, lines: int, sent: int) -> None:
+        with self._lock:
+            self.lines += lines
+            self.sent += sent
+
+    def call(self, spec: dict, send) -> dict:
+        """Send *spec*, defaults filled in, with ``send(spec)``, at most once per key.
+
+        Concurrent duplicates wait for the request in flight and share its
+        envelope.  Each caller gets its own envelope dict.
+        """
+        spec = self.prepare(spec)
+        self._count(1, 0)
+        if not self.dedupe:
+            self._count(0, 1)
+            return send(spec)
+
+        def fetch() -> dict:
+            self._count(0, 1)
+            return send(spec)
+
+        return self.memo.call(self.key(spec), fetch)
+
+    def plan(self, specs: list) -> tuple[list, list]:
+        """Collapse a list of parsed *specs* into the requests to send.
+
+        Returns ``(unique, slots)``: *unique* holds the specs to send, and
+        ``slots[i]`` is either the position in *unique* whose envelope
+        answers ``specs[i]`` or, for a key already memoised, that envelope.
+        Parse errors (``ValueError`` entries) pass through unchanged and are
+        never merged.  Call :meth:`remember` with the envelopes of *unique*
+        once they are known.
+        """
+        unique: list = []
+        slots: list = []
+        positions: dict[str, int] = {}
+        for spec in specs:
+            if isinstance(spec, ValueError):
+                slots.append(len(unique))
+                unique.append(spec)
+                continue
+            spec = self.prepare(spec)
+            self._count(1, 0)
+            if not self.dedupe:
+                slots.append(len(unique))
+                unique.append(spec)
+                continue
+            key = self.key(spec)
+            if key in positions:
+                slots.append(positions[key])
+                continue
+            cached = self.memo.get(key)
+            if cached is not CACHE_MISS:
+                slots.append({"status": "ok", "result": cached})
+                continue
+            positions[key] = len(unique)
+            slots.append(len(unique))
+            unique.append(spec)
+        self._count(0, sum(1 for spec in unique if not isinstance(spec, ValueError)))
+        return unique, slots
+
+    def remember(self, unique: list, envelopes: list) -> None:
+        """Memoise the successful *envelopes* of specs returned by :meth:`plan`."""
+        if not self.dedupe:
+            return
+        for spec, envelope in zip(unique, envelopes):
+            if not isinstance(spec, ValueError) and envelope["status"] == "ok":
+                self.memo.put(self.key(spec), envelope["result"])
+
+    def summary(self) -> str:
+        """Return a one-line report of the calls saved."""
+        return f"Deduplicated {self.lines} batch lines into {self.sent} requests ({self.saved} calls saved)"
+
+
+def iter_batch(
+    lines,
+    send,
+    endpoint: str | None = None,
+    method: str = "POST",
+    field_spec: str | None = None,
+    concurrency: int = 1,
+    send_packed=None,
+    pack_size: int = 1,
+    fields_for=None,
+    planner: BatchPlanner | None = None,
+    stats: RequestStats | None = None,
+):
+    """Yield one response envelope per non-blank line of NDJSON *lines*.
+
+    *send* is called with each parsed spec (see :func:`parse_batch_line`) and
+    must return a ``make_request``-style envelope; with *concurrency* > 1 it is
+    called from worker threads.  Envelopes are yielded in input order, and
+    lines that fail to parse yield an error envelope in their place, so output
+    stays aligned with input.
+
+    With *pack_size* > 1, POST payloads for the same endpoint are grouped into
+    arrays of up to *pack_size* tasks and sent with
+    ``send_packed(endpoint, payloads)``, which returns one envelope per
+    payload.  Input is processed in windows of ``pack_size * concurrency``
+    lines so memory stays bounded.
+
+    *fields_for*, if given, maps each line's endpoint to the field spec
+    applied to its result and takes the place of *field_spec*.
+
+    With a *planner* (see :class:`BatchPlanner`), specs are canonicalised
+    before sending and duplicates share one request.  With *stats*, field
+    projection is timed per endpoint.
+    """
+
+    def finish(envelope: dict, endpoint: str) -> dict:
+        spec = fields_for(endpoint) if fields_for is not None else field_spec
+        if not spec:
+            return envelope
+        with _timed(stats, endpoint, "fields"):
+            return apply_fields(envelope, spec)
+
+    def run(spec):
+        if isinstance(spec, ValueError):
+            return {"status": "error", "message": str(spec)}
+        envelope = send(spec) if planner is None else planner.call(spec, send)
+        return finish(envelope, spec["endpoint"])
+
+    specs = _parse_batch_lines(lines, endpoint, method)
+    if pack_size <= 1 or send_packed is None:
+        yield from run_concurrently(run, specs, concurrency)
+        return
+
+    def run_job(job: tuple) -> list[dict]:
+        _, job_specs, packed = job
+        if not packed:
+            spec = job_specs[0]
+            return [{"status": "error", "message": str(spec)} if isinstance(spec, ValueError) else send(spec)]
+        return send_packed(job_specs[0]["endpoint"], [spec["body"] for spec in job_specs])
+
+    for window in _windows(specs, pack_size * concurrency):
+        unique, slots = planner.plan(window) if planner is not None else (window, range(len(window)))
+        jobs = _plan_packs(unique, pack_size)
+        envelopes: list = [None] * len(unique)
+        for job, outcome in zip(jobs, run_concurrently(run_job, jobs, concurrency)):
+            positions = job[0]
+            if not isinstance(outcome, list):
+                outcome = [dict(outcome) for _ in positions]
+            for pos, envelope in zip(positions, outcome):
+                envelopes[pos] = envelope
+        if planner is not None:
+            planner.remember(unique, envelopes)
+        for spec, slot in zip(window, slots):
+            envelope = dict(envelopes[slot] if isinstance(slot, int) else slot)
+            yield envelope if isinstance(spec, ValueError) else finish(envelope, spec["endpoint"])
+
+
+# ---------------------------------------------------------------------------
+# Batch journal (--journal / --resume)
+# ---------------------------------------------------------------------------
+
+
+class BatchJournal:
+    """Append-only checkpoint journal that lets an interrupted batch resume.
+
+    Every request is recorded in the JSONL file at *path* before it is sent
+    (``"pending"``) and again when it completes: ``"ok"`` records give the
+    ``offset`` and ``length`` of the envelope in the append-only results
+    file ``<path>.results``, ``"error"`` records its ``message``.  Records
+    are keyed by :meth:`key`, and the last record for a key wins.  Records
+    are flushed as they are written, so they survive the process dying.
+
+    With *resume*, an existing journal is loaded and requests already
+    ``"ok"`` are answered from the results file instead of being sent
+    again; failed and pending ones are sent.  Without it the journal and
+    results file start empty.  :meth:`compact` rewrites the journal with one
+    record per finished request.
+
+    *settings* describes how results are shaped (response mode and local
+    post-processing) and is written as the journal's header record.  A
+    resume whose *settings* differ from the header's raises ``ValueError``,
+    since the stored envelopes would not match what the run asks for.
+    """
+
+    def __init__(self, path: str, resume: bool = False, settings: dict | None = None):
+        self.path = path
+        self.results_path = path + ".results"
+        self.settings = settings
+        self.resumed = 0
+        self.sent = 0
+        self.failed = 0
+        self._latest: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        stored = self._load() if resume else None
+        if stored is not None and settings is not None and stored != settings:
+            changed = sorted(name for name in stored.keys() | settings.keys() if stored.get(name) != settings.get(name))
+            raise ValueError(f"{path} was written with different {', '.join(changed)} settings")
+        self._journal = open(path, "a" if resume else "w", encoding="utf-8")
+        self._results = open(self.results_path, "a+b" if resume else "w+b")
+        if resume and self._journal.tell() and not self._ends_with_newline():
+            # Start after a record torn by the previous run dying mid-write.
+            self._journal.write("\n")
+        if settings is not None and stored is None:
+            self._write({"settings": settings})
+
+    def _load(self) -> dict | None:
+        """Load the records of an existing journal and return its header's settings."""
+        settings = None
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                for line in fp:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(record, dict) and "key" in record:
+                        self._latest[record["key"]] = record
+                    elif isinstance(record, dict) and "settings" in record:
+                        settings = record["settings"]
+        except FileNotFoundError:
+            pass
+        return settings
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as fp:
+            fp.seek(-1, os.SEEK_END)
+            return fp.read(1) == b"\n"
+
+    @staticmethod
+    def key(endpoint: str, method: str, body) -> str:
+        """Return the journal key of one request."""
+        return request_cache_key(endpoint, method, body, "journal")
+
+    def pending(self) -> int:
+        """Number of requests whose last record is not ``"ok"``."""
+        with self._lock:
+            return sum(1 for record in self._latest.values() if record["status"] != "ok")
+
+    def _append(self, record: dict) -> None:
+        self._latest[record["key"]] = record
+        self._write(record)
+
+    def _write(self, record: dict) -> None:
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+
+    def lookup(self, key: str) -> dict | None:
+        """Return the stored envelope of a completed request, or None.
+
+        An envelope missing from the results file (deleted or truncated
+        since) or unreadable counts as not completed, so it is sent again.
+        """
+        with self._lock:
+            record = self._latest.get(key)
+            if record is None or record["status"] != "ok":
+                return None
+            self._results.seek(record["offset"])
+            data = self._results.read(record["length"])
+        if len(data) != record["length"]:
+            return None
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            return None
+        return envelope if isinstance(envelope, dict) else None
+
+    def begin(self, key: str) -> None:
+        """Record that the request *key* is about to be sent."""
+        with self._lock:
+            self._append({"key": key, "status": "pending"})
+
+    def finish(self, key: str, envelope: dict) -> None:
+        """Record the outcome of the request *key*, storing a successful *envelope*."""
+        with self._lock:
+            self.sent += 1
+            if envelope["status"] != "ok":
+                self.failed += 1
+                self._append({"key": key, "status": "error", "message": envelope.get("message")})
+                return
+            data = json.dumps(envelope, separators=(",", ":")).encode("utf-8") + b"\n"
+            self._results.seek(0, os.SEEK_END)
+            offset = self._results.tell()
+            self._results.write(data)
+            self._results.flush()
+            self._append({"key": key, "status": "ok", "offset": offset, "length": len(data) - 1})
+
+    def run(self, endpoint: str, method: str, bodies: list, send_many):
+        """Yield ``(position, envelope)`` for each of *bodies* sent to *endpoint*.
+
+        Completed requests are answered from the journal first.  The rest
+        are recorded as pending and passed, as one list, to
+        ``send_many(bodies)``, which yields ``(position, envelope)`` pairs
+        for that list in any order; each is recorded as it arrives.
+        """
+        keys = [self.key(endpoint, method, body) for body in bodies]
+        todo = []
+        for position, key in enumerate(keys):
+            envelope = self.lookup(key)
+            if envelope is None:
+                todo.append(position)
+                continue
+            with self._lock:
+                self.resumed += 1
+            yield position, envelope
+        if not todo:
+            return
+        for position in todo:
+            self.begin(keys[position])
+        for index, envelope in send_many([bodies[position] for position in todo]):
+            self.finish(keys[todo[index]], envelope)
+            yield todo[index], envelope
+
+    def call(self, spec: dict, send) -> dict:
+        """Journaled ``send(spec)`` for one parsed batch spec."""
+        [(_, envelope)] = self.run(spec["endpoint"], spec["method"], [spec["body"]], lambda _: [(0, send(spec))])
+        return envelope
+
+    def call_packed(self, endpoint: str, payloads: list, send_packed) -> list[dict]:
+        """Journaled ``send_packed(endpoint, payloads)``; only unfinished payloads are sent."""
+        envelopes: list = [None] * len(payloads)
+        for position, envelope in self.run(
+            endpoint, "POST", payloads, lambda rest: enumerate(send_packed(endpoint, rest))
+        ):
+            envelopes[position] = envelope
+        return envelopes
+
+    def compact(self) -> None:
+        """Rewrite the journal with the last record of every finished request.
+
+        Pending records are dropped: a request without a record is sent
+        again on resume anyway.  The header is kept, and the new journal
+        replaces the old one atomically.
+        """
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fp:
+                if self.settings is not None:
+                    fp.write(json.dumps({"settings": self.settings}, separators=(",", ":")) + "\n")
+                for record in self._latest.values():
+                    if record["status"] != "pending":
+                        fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._journal.close()
+            os.replace(tmp, self.path)
+            self._journal = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        self._journal.close()
+        self._results.close()
+
+    def summary(self) -> str:
+        """Return a one-line report of the run."""
+        return f"Journal: {self.resumed} requests resumed, {self.sent} sent ({self.failed} failed)"
+
+
+# ---------------------------------------------------------------------------
+# Output formats
+# ---------------------------------------------------------------------------
+
+# Formats that write result items rather than response envelopes.
+ITEM_FORMATS = ("ndjson", "csv", "tsv")
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _column_getter(path: str):
+    """Compile a ``--fields``-style path into a column getter.
+
+    Plain paths give one value (``None`` if missing); paths with ``*`` give
+    the list of every match.
+    """
+    segments = path.replace("[", ".").replace("]", "").split(".")
+    if "*" not in segments:
+        return _field_getter(".".join(segments))
+
+    def get(item):
+        values = [item]
+        for segment in segments:
+            matched = []
+            for value in values:
+                if segment == "*":
+                    if isinstance(value, list):
+                        matched.extend(value)
+                    elif isinstance(value, dict):
+                        matched.extend(value.values())
+                elif isinstance(value, dict) and segment in value:
+                    matched.append(value[segment])
+                elif isinstance(value, list) and segment.isdigit() and int(segment) < len(value):
+                    matched.append(value[int(segment)])
+            values = matched
+        return values
+
+    return get
+
+
+def _leaf_paths(value, prefix: str = "") -> list[str]:
+    """Dot paths of every non-object leaf of *value* (lists count as leaves)."""
+    if not isinstance(value, dict) or not value:
+        return [prefix] if prefix else []
+    paths = []
+    for key, child in value.items():
+        paths.extend(_leaf_paths(child, f"{prefix}.{key}" if prefix else str(key)))
+    return paths
+
+
+def _cell(value) -> str:
+    """Render one value as CSV/TSV text: ``null`` is empty, containers are JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+class ItemWriter:
+    """Write result items to *stream* one at a time in an item format.
+
+    *fmt* is ``"ndjson"``, ``"csv"`` or ``"tsv"``.  Columns are the
+    ``--fields`` paths in *field_spec*, made item-relative (a leading
+    ``items.*.`` is dropped); without a spec they are the leaf paths of the
+    first item, and fields that first appear in later items are not
+    written.  NDJSON rows are objects keyed by column, or the items
+    unchanged when no spec is given.
+
+    Output depends only on the items and the spec: columns keep spec order,
+    lines end in ``\\n`` and containers are written as sorted-key JSON.
+    """
+
+    def __init__(self, stream, fmt: str, field_spec: str | None = None):
+        if fmt not in ITEM_FORMATS:
+            raise ValueError(f"Unknown item format: {fmt!r}")
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        spec = _item_field_spec(field_spec)
+        self.columns = [c.strip() for c in spec.split(",") if c.strip()] if spec else None
+        self._getters = None
+        import csv
+
+        self._csv = csv.writer(stream, lineterminator="\n") if fmt == "csv" else None
+
+    def _start(self, item) -> None:
+        if self.columns is None and self.fmt != "ndjson":
+            self.columns = _leaf_paths(item)
+        if self.columns is not None:
+            self._getters = [_column_getter(column) for column in self.columns]
+            if self.fmt != "ndjson":
+                self._row(self.columns)
+
+    def _row(self, cells: list) -> None:
+        if self._csv is not None:
+            self._csv.writerow(cells)
+        else:
+            self.stream.write("\t".join(cell.translate(_TSV_ESCAPES) for cell in cells) + "\n")
+
+    def write(self, item) -> None:
+        if self.count == 0:
+            self._start(item)
+        self.count += 1
+        if self.fmt == "ndjson":
+            if self._getters is not None:
+                item = {column: get(item) for column, get in zip(self.columns, self._getters)}
+            self.stream.write(json.dumps(item) + "\n")
+        else:
+            self._row([_cell(get(item)) for get in self._getters])
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def _item_field_spec(field_spec: str | None) -> str | None:
+    """Make ``--fields`` paths item-relative by dropping an ``items.*.`` or ``items.`` prefix."""
+    if not field_spec:
+        return field_spec
+    paths = [f.strip() for f in field_spec.split(",") if f.strip()]
+    return ",".join(re.sub(r"^items\.(\*\.)?", "", p) for p in paths)
+
+
+def _dumps(envelope: dict, fmt: str | None, pretty: bool = False) -> str:
+    """Serialize an envelope for the ``json`` / ``json-compact`` formats."""
+    if fmt == "json-compact":
+        return json.dumps(envelope, separators=(",", ":"))
+    return json.dumps(envelope, indent=2) if pretty else json.dumps(envelope)
+
+
+# ---------------------------------------------------------------------------
+# Daemon mode (--serve)
+# ---------------------------------------------------------------------------
+
+# Each frame the daemon sends is a one-byte channel, a 4-byte big-endian
+# length and the payload.  b"r" (ready) or b"s" (stale: run in-process)
+# answers the client's header line; b"1" / b"2" carry stdout / stderr bytes;
+# b"x" carries the exit status and ends the run.
+_FRAME_HEADER = 5
+
+
+class WarmState:
+    """Objects kept between CLI runs: connection pools, rate limiters, caches.
+
+    Each object is built on first use by *factory* and stored under *key*,
+    which names the config values it was built from so that runs with other
+    settings get their own.  Used as a context manager it closes the
+    sessions it holds.
+    """
+
+    def __init__(self):
+        self._objects: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, factory):
+        """Return the object stored under *key*, building it with *factory*."""
+        with self._lock:
+            if key not in self._objects:
+                self._objects[key] = factory()
+            return self._objects[key]
+
+    def close(self) -> None:
+        with self._lock:
+            objects, self._objects = list(self._objects.values()), {}
+        for obj in objects:
+            if isinstance(obj, Session):
+                obj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _FrameWriter(io.RawIOBase):
+    """Raw stream that sends each write to the client as one *channel* frame."""
+
+    def __init__(self, sock, channel: bytes, lock: threading.Lock):
+        self._sock = sock
+        self._channel = channel
+        self._lock = lock
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        with self._lock:
+            self._sock.sendall(self._channel + len(data).to_bytes(4, "big") + data)
+        return len(data)
+
+
+class _ClientStdin(io.TextIOWrapper):
+    """The client's stdin as forwarded over the socket, reporting its ``isatty()``."""
+
+    def __init__(self, buffer, encoding: str, errors: str, tty: bool):
+        super().__init__(buffer, encoding=encoding, errors=errors)
+        self._tty = tty
+
+    def isatty(self) -> bool:
+        return self._tty
+
+
+def _read_frame(reader) -> tuple[bytes, bytes] | None:
+    """Read one ``(channel, payload)`` frame, or ``None`` at end of stream."""
+    head = reader.read(_FRAME_HEADER)
+    if len(head) < _FRAME_HEADER:
+        return None
+    payload = reader.read(int.from_bytes(head[1:], "big"))
+    return head[:1], payload
+
+
+def _send_frame(sock, channel: bytes, payload: bytes = b"") -> None:
+    sock.sendall(channel + len(payload).to_bytes(4, "big") + payload)
+
+
+def _script_signature() -> list:
+    """Identify this copy of the script so a client never talks to a stale daemon."""
+    path = os.path.realpath(__file__)
+    stat = os.stat(path)
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+
+def _exit_status(exc: SystemExit) -> int:
+    """Return the exit status Python gives for *exc*; a non-integer code is printed to stderr."""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def _stream_spec(stream) -> list:
+    return [getattr(stream, "encoding", None) or "utf-8", getattr(stream, "errors", None) or "strict", stream.isatty()]
+
+
+def _serve_connection(conn, warm: WarmState) -> None:
+    """Run the CLI invocation a client sent on *conn* with the daemon's *warm* state."""
+    import traceback
+
+    reader = conn.makefile("rb")
+    header = json.loads(reader.readline() or b"null")
+    if not isinstance(header, dict) or header.get("signature") != _script_signature():
+        _send_frame(conn, b"s")
+        return
+    cwd = os.getcwd()
+    try:
+        os.chdir(header["cwd"])
+    except OSError:
+        _send_frame(conn, b"s")
+        return
+    lock = threading.Lock()
+    (in_enc, in_err, in_tty), (out_enc, out_err, out_tty), (err_enc, err_err, _) = header["streams"]
+    stdin = _ClientStdin(io.BytesIO() if in_tty else reader, in_enc, in_err, in_tty)
+    stdout = io.TextIOWrapper(
+        io.BufferedWriter(_FrameWriter(conn, b"1", lock)), encoding=out_enc, errors=out_err, line_buffering=out_tty
+    )
+    stderr = io.TextIOWrapper(
+        io.BufferedWriter(_FrameWriter(conn, b"2", lock)), encoding=err_enc, errors=err_err, line_buffering=True
+    )
+    saved = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+    try:
+        _send_frame(conn, b"r")
+        try:
+            parser = _build_parser(prog=header["prog"])
+            _run(parser, parser.parse_args(header["argv"]), get_config(header["env"]), warm)
+            status = 0
+        except SystemExit as exc:
+            status = _exit_status(exc)
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        stdout.flush()
+        stderr.flush()
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved
+        os.chdir(cwd)
+    with lock:
+        _send_frame(conn, b"x", str(status).encode())
+
+
+def serve(path: str, idle_timeout: float | None = None) -> None:
+    """Answer CLI invocations forwarded by :func:`forward_to_daemon` on the Unix socket *path*.
+
+    Runs until interrupted (SIGINT or SIGTERM), or until no client has
+    connected for *idle_timeout* seconds if one is given.  Invocations run
+    one at a time in this process, since each borrows ``sys.stdin`` /
+    ``sys.stdout`` / ``sys.stderr``; connection pools, rate limiters and
+    caches persist between them in a :class:`WarmState`.  A socket file left
+    behind by a daemon that is no longer running is replaced.
+    """
+    import signal
+    import socket
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+        else:
+            raise OSError(f"a daemon is already listening on {path}")
+        finally:
+            probe.close()
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(umask)
+    listener.listen(64)
+    listener.settimeout(idle_timeout)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"Serving on {path}", file=sys.stderr, flush=True)
+    try:
+        with WarmState() as warm:
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except TimeoutError:
+                    break
+                conn.settimeout(None)
+                with conn:
+                    try:
+                        _serve_connection(conn, warm)
+                    except (OSError, ValueError, KeyError) as exc:
+                        # The client went away or sent a malformed header
+                        print(f"Dropped connection: {exc}", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+
+
+def forward_to_daemon(path: str, argv: list[str]) -> int | None:
+    """Run *argv* on the ``--serve`` daemon at *path*, relaying stdin, stdout and stderr.
+
+    Returns the exit status, or ``None`` when no daemon (or only one running
+    a different copy of this script) is listening, in which case nothing has
+    been read from stdin and the caller runs the command itself.
+    """
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    with sock:
+        header = {
+            "signature": _script_signature(),
+            "argv": list(argv),
+            "prog": os.path.basename(sys.argv[0]),
+            "cwd": os.getcwd(),
+            "env": config_environ(),
+            "streams": [_stream_spec(sys.stdin), _stream_spec(sys.stdout), _stream_spec(sys.stderr)],
+        }
+        reader = sock.makefile("rb")
+        try:
+            sock.sendall(json.dumps(header).encode() + b"\n")
+            frame = _read_frame(reader)
+        except OSError:
+            return None
+        if frame is None or frame[0] != b"r":
+            return None
+
+        def pump_stdin():
+            try:
+                if not sys.stdin.isatty():
+                    while chunk := sys.stdin.buffer.read1(65536):
+                        sock.sendall(chunk)
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+        threading.Thread(target=pump_stdin, daemon=True).start()
+        streams = {b"1": sys.stdout.buffer, b"2": sys.stderr.buffer}
+        while (frame := _read_frame(reader)) is not None:
+            channel, payload = frame
+            if channel == b"x":
+                return int(payload)
+            streams[channel].write(payload)
+            streams[channel].flush()
+    print(json.dumps({"status": "error", "message": f"Daemon at {path} closed the connection"}), file=sys.stderr)
+    return 1
+
+
+# ---------------------------------------------------------------------------
+# CLI main
+# ---------------------------------------------------------------------------
+
+
+def _build_parser(prog: str | None = None) -> "argparse.ArgumentParser":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="DataForSEO API client",
+    )
+    parser.add_argument(
+        "--endpoint",
+        default=None,
+        help="API endpoint path, e.g. /v3/serp/google/organic/live/advanced",
+    )
+    parser.add_argument(
+        "--method",
+        default="POST",
+        choices=["GET", "POST"],
+        help="HTTP method (default: POST)",
+    )
+    parser.add_argument(
+        "--full-response",
+        action="store_true",
+        default=None,
+        help="Force full response mode (skip .ai suffix)",
+    )
+    parser.add_argument(
+        "--fields",
+        default=None,
+        help="Comma-separated field filter (dot-notation, supports wildcards)",
+    )
+    parser.add_argument(
+        "--filter",
+        default=None,
+        metavar="JSON",
+        help="Filter result items locally with a DataForSEO filters expression, "
+        "e.g. '[[\"rank\", \">\", 10], \"and\", [\"url\", \"like\", \"%%blog%%\"]]'",
+    )
+    parser.add_argument(
+        "--order-by",
+        action="append",
+        default=None,
+        metavar="RULE",
+        help="Sort result items locally by \"field,asc\" or \"field,desc\" (repeatable; earlier rules win)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Keep only the first N result items (after --filter and --order-by)",
+    )
+    parser.add_argument(
+        "--field-config",
+        default=None,
+        help="Path to field configuration JSON file",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "json-compact", *ITEM_FORMATS],
+        default=None,
+        help="Output format: json (default), json-compact, or one row per result item as "
+        "ndjson, csv or tsv (columns from --fields)",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=None,
+        help="Enable debug output to stderr",
+    )
+    parser.add_argument(
+        "--no-wrap-array",
+        action="store_true",
+        help="Don't auto-wrap POST body in [{...}]",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read one JSON payload per stdin line and write one JSON result per line",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of batch requests in flight at once (default: 1)",
+    )
+    parser.add_argument(
+        "--pack",
+        type=int,
+        default=1,
+        metavar="N",
+        help="With --batch: send up to N payloads for the same endpoint in one POST array "
+        "(full response format; only for endpoints that accept multiple tasks per call)",
+    )
+    parser.add_argument(
+        "--standard",
+        action="store_true",
+        help="With --batch: use the cheaper Standard task queue (task_post/tasks_ready/task_get) "
+        "instead of Live calls; results stream in completion order with an \"index\" field",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="With --batch: send each request once, copying its result to every line whose payload is the same "
+        "after canonicalization (calls saved are reported on stderr)",
+    )
+    parser.add_argument(
+        "--default-location-code",
+        type=int,
+        default=None,
+        metavar="CODE",
+        help="With --batch: location_code added to payloads that set no location_* field",
+    )
+    parser.add_argument(
+        "--default-language-code",
+        default=None,
+        metavar="CODE",
+        help="With --batch: language_code added to payloads that set no language_* field",
+    )
+    parser.add_argument(
+        "--journal",
+        default=None,
+        metavar="FILE",
+        help="With --batch: record every request and its result in FILE (plus FILE.results) "
+        "so an interrupted run can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --journal: answer requests the journal already completed from it and send only "
+        "failed or unfinished ones",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        metavar="USD",
+        help="Stop sending requests once reported spend reaches USD (default: $DATAFORSEO_BUDGET; unset disables)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --batch: estimate each line's cost from the price config and send nothing",
+    )
+    parser.add_argument(
+        "--price-config",
+        default=None,
+        help="Path to a JSON file of per-endpoint prices for --dry-run (default: $DATAFORSEO_PRICE_CONFIG)",
+    )
+    parser.add_argument(
+        "--compress-requests",
+        type=int,
+        nargs="?",
+        const=DEFAULT_COMPRESS_MIN_BYTES,
+        default=None,
+        metavar="BYTES",
+        help=f"Gzip POST bodies of at least BYTES (default {DEFAULT_COMPRESS_MIN_BYTES}; "
+        "$DATAFORSEO_COMPRESS_REQUESTS; 0 disables)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print p50/p95/p99 timings per endpoint and phase (network, decode, parse, validate, "
+        "filter, fields, serialize) and bytes sent/received to stderr at exit",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FILE",
+        help="Write one JSON line of phase timings per request attempt and post-processing stage to FILE",
+    )
+    parser.add_argument(
+        "--paginate",
+        action="store_true",
+        help="Follow offset/search_after_token pages and write one JSON item per line "
+        "(--fields paths are relative to each item)",
+    )
+    parser.add_argument(
+        "--max-items",
+        type=int,
+        default=None,
+        metavar="N",
+        help="With --paginate: stop after N items (default: all)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the response as it arrives and write one JSON item per line "
+        "(--fields paths are relative to each item)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=None,
+        help="Retries for transient failures (default: $DATAFORSEO_MAX_RETRIES or 3; 0 disables)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the on-disk response cache (default: $DATAFORSEO_CACHE_DIR; unset disables)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Default cache entry lifetime in seconds (default: $DATAFORSEO_CACHE_TTL or 86400)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the response cache even if a cache directory is configured",
+    )
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="SOCKET",
+        help="Run as a daemon on the Unix socket SOCKET (default: $DATAFORSEO_SOCKET), keeping connections, "
+        "rate limiters and caches warm; calls made with DATAFORSEO_SOCKET set are forwarded to it",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="With --serve: exit after SECONDS without a client (default: run until interrupted)",
+    )
+    return parser
+
+
+def _run_batch(args, send, send_pack, fields_for, planner=None, stats=None) -> None:
+    """Stream one compact JSON envelope per NDJSON stdin line.
+
+    With an item ``--format`` the items of every line are written instead,
+    in input order, and failed lines are reported on stderr with their
+    ``"index"``; the exit status is then 1 if any line failed.
+    """
+    tabular = args.format in ITEM_FORMATS
+    envelopes = iter_batch(
+        sys.stdin,
+        send,
+        args.endpoint,
+        args.method,
+        concurrency=args.concurrency,
+        send_packed=send_pack,
+        pack_size=args.pack,
+        fields_for=(lambda endpoint: None) if tabular else fields_for,
+        planner=planner,
+        stats=stats,
+    )
+    if not tabular:
+        for envelope in envelopes:
+            with _timed(stats, args.endpoint or "batch", "serialize"):
+                line = _dumps(envelope, args.format)
+            print(line, flush=True)
+        return
+
+    failed = False
+    writer = ItemWriter(sys.stdout, args.format, fields_for(args.endpoint) if args.endpoint else args.fields)
+    for index, envelope in enumerate(envelopes):
+        if envelope["status"] != "ok":
+            failed = True
+            print(json.dumps({"index": index, **envelope}), file=sys.stderr, flush=True)
+            continue
+        for item in result_items(envelope["result"]):
+            writer.write(item)
+    writer.flush()
+    if failed:
+        sys.exit(1)
+
+
+def _run_standard(args, request_kwargs: dict, fields_for, local, planner=None, stats=None, journal=None) -> None:
+    """Queue every NDJSON stdin payload as a Standard task and stream results.
+
+    Lines are grouped by endpoint; each output line is the result envelope
+    plus the ``"index"`` of its input line.  With a *planner*, duplicate
+    payloads are queued once and their result is written for every line.
+    With a *journal*, payloads it completed are not queued again.
+    """
+    groups: dict[str, list] = {}
+    for index, spec in enumerate(_parse_batch_lines(sys.stdin, args.endpoint, args.method)):
+        if isinstance(spec, ValueError):
+            print(json.dumps({"index": index, "status": "error", "message": str(spec)}), flush=True)
+            continue
+        groups.setdefault(spec["endpoint"], []).append((index, spec))
+
+    for endpoint, entries in groups.items():
+        specs = [spec for _, spec in entries]
+        unique, slots = planner.plan(specs) if planner is not None else (specs, range(len(specs)))
+        indexes: list[list[int]] = [[] for _ in unique]
+        for (index, _), slot in zip(entries, slots):
+            indexes[slot].append(index)
+        payloads = [spec["body"] for spec in unique]
+
+        def run(payloads: list, endpoint: str = endpoint):
+            for position, envelope in run_standard_tasks(
+                endpoint, payloads, concurrency=args.concurrency, **request_kwargs
+            ):
+                yield position, local(envelope, endpoint)
+
+        results = run(payloads) if journal is None else journal.run(endpoint, "POST", payloads, run)
+        for position, envelope in results:
+            for index in indexes[position]:
+                with _timed(stats, endpoint, "fields"):
+                    line = apply_fields(dict(envelope), fields_for(endpoint))
+                with _timed(stats, endpoint, "serialize"):
+                    line = json.dumps({"index": index, **line})
+                print(line, flush=True)
+
+
+def _run_dry_run(args, prices: PriceTable, planner, budget: float | None) -> None:
+    """Write each NDJSON stdin line's estimated cost without sending anything.
+
+    Each output line's result holds the line's ``endpoint``, its number of
+    ``tasks`` and its ``estimated_cost`` (null without a price; 0 for a line
+    deduplicated by *planner*).  A summary goes to stderr, and the exit
+    status is 1 if the estimate exceeds *budget*.
+    """
+    specs = list(_parse_batch_lines(sys.stdin, args.endpoint, args.method))
+    unique, slots = planner.plan(specs) if planner is not None else (specs, range(len(specs)))
+    total, tasks, unpriced, estimated = 0.0, 0, 0, set()
+    for spec, slot in zip(specs, slots):
+        if isinstance(spec, ValueError):
+            print(_dumps({"status": "error", "message": str(spec)}, args.format), flush=True)
+            continue
+        line = {"endpoint": spec["endpoint"], "tasks": 0, "estimated_cost": 0}
+        if slot not in estimated:
+            estimated.add(slot)
+            spec = unique[slot]
+            line["tasks"], line["estimated_cost"] = prices.estimate(spec["endpoint"], spec["body"])
+            tasks += line["tasks"]
+            if line["estimated_cost"] is None:
+                unpriced += 1
+            else:
+                line["estimated_cost"] = round(line["estimated_cost"], 6)
+                total += line["estimated_cost"]
+        print(_dumps({"status": "ok", "result": line}, args.format), flush=True)
+
+    summary = f"Estimated ${total:.4f} for {tasks} tasks"
+    if unpriced:
+        summary += f" ({unpriced} lines have no price)"
+    over = budget is not None and total > budget
+    if over:
+        summary += f"; exceeds budget of ${budget:.4f}"
+    print(summary, file=sys.stderr, flush=True)
+    if over:
+        sys.exit(1)
+
+
+def _read_body(args):
+    """Read the JSON request body from stdin for POST, exiting on bad JSON."""
+    body = None
+    if args.method == "POST" and not sys.stdin.isatty():
+        raw_input = sys.stdin.read().strip()
+        if raw_input:
+            try:
+                body = json.loads(raw_input)
+            except json.JSONDecodeError as exc:
+                output = {"status": "error", "message": f"Invalid JSON input: {exc}"}
+                print(json.dumps(output))
+                sys.exit(1)
+    return body
+
+
+def _write_items(items, field_spec: str | None, fmt: str | None = None) -> None:
+    """Write each item as it arrives, projecting *field_spec* per item.
+
+    Items are compact JSON lines, or rows of an item format (see
+    :class:`ItemWriter`).  A failure part-way through is reported as an
+    error envelope, on stdout for JSON lines and on stderr for CSV/TSV, and
+    exits with status 1.
+    """
+    writer = ItemWriter(sys.stdout, fmt, field_spec) if fmt in ITEM_FORMATS else None
+    projector = compile_fields(_item_field_spec(field_spec))
+    try:
+        for item in items:
+            if writer is not None:
+                writer.write(item)
+            else:
+                print(_dumps(projector.project(item), fmt), flush=True)
+    except Exception as exc:
+        error_stream = sys.stderr if fmt in ("csv", "tsv") else sys.stdout
+        print(json.dumps(_error_envelope(exc)), file=error_stream, flush=True)
+        sys.exit(1)
+    finally:
+        sys.stdout.flush()
+
+
+def _run_paginate(args, request_kwargs: dict, fields_for, items_stage=None) -> None:
+    """Stream every item of a paginated endpoint as one compact JSON line."""
+    body = _read_body(args)
+    if isinstance(body, list):
+        body = body[0] if body else {}
+    items = paginate(args.endpoint, body, max_items=args.max_items, **request_kwargs)
+    if items_stage is not None:
+        items = items_stage(items)
+    _write_items(items, fields_for(args.endpoint), args.format)
+
+
+def _run_stream(args, request_kwargs: dict, full_response: bool, fields_for, items_stage=None) -> None:
+    """Parse the response incrementally and write one JSON line per item."""
+    body = _read_body(args)
+    stream_kwargs = {k: v for k, v in request_kwargs.items() if k not in ("cache", "memo")}
+    items = stream_items(
+        args.endpoint,
+        args.method,
+        body,
+        full_response=full_response,
+        force_full=args.full_response or False,
+        wrap_array=not args.no_wrap_array,
+        **stream_kwargs,
+    )
+    if items_stage is not None:
+        items = items_stage(items)
+    _write_items(items, fields_for(args.endpoint), args.format)
+
+
+def _run_single(args, send, fields_for, stats=None) -> None:
+    """Send the single JSON body read from stdin and pretty-print the result."""
+    # Read body from stdin for POST
+    body = _read_body(args)
+
+    # Make the request
+    result = send({"endpoint": args.endpoint, "method": args.method, "body": body})
+
+    if args.format in ITEM_FORMATS:
+        if result["status"] != "ok":
+            print(json.dumps(result), file=sys.stderr if args.format != "ndjson" else sys.stdout)
+            sys.exit(1)
+        _write_items(result_items(result["result"]), fields_for(args.endpoint), args.format)
+        return
+
+    # Apply field filtering
+    with _timed(stats, args.endpoint, "fields"):
+        result = apply_fields(result, fields_for(args.endpoint))
+
+    # Output
+    with _timed(stats, args.endpoint, "serialize"):
+        output = _dumps(result, args.format, pretty=True)
+    print(output)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    config = get_config()
+    if args.serve is not None:
+        if args.endpoint or args.batch:
+            parser.error("--serve cannot be combined with --endpoint or --batch")
+        if args.idle_timeout is not None and args.idle_timeout <= 0:
+            parser.error("--idle-timeout must be positive")
+        path = args.serve or config["socket"]
+        if not path:
+            parser.error("--serve needs a socket path or DATAFORSEO_SOCKET")
+        try:
+            serve(path, args.idle_timeout)
+        except OSError as exc:
+            parser.error(f"--serve: {exc}")
+        return
+    if config["socket"]:
+        code = forward_to_daemon(config["socket"], sys.argv[1:] if argv is None else argv)
+        if code is not None:
+            if code:
+                sys.exit(code)
+            return
+    _run(parser, args, config)
+
+
+def _run(parser, args, config: dict, warm: "WarmState | None" = None) -> None:
+    """Run one CLI invocation with *config* from :func:`get_config`.
+
+    *warm* holds the connection pools, rate limiters and caches that a
+    ``--serve`` daemon keeps between invocations; without it they are built
+    for this run only.
+    """
+    if not args.endpoint and not args.batch:
+        parser.error("--endpoint is required unless --batch is given")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.standard and not args.batch:
+        parser.error("--standard requires --batch")
+    if args.format in ITEM_FORMATS and args.standard:
+        parser.error(f"--format {args.format} cannot be combined with --standard")
+    if args.journal and not args.batch:
+        parser.error("--journal requires --batch")
+    if args.resume and not args.journal:
+        parser.error("--resume requires --journal")
+
+    items_stage = None
+    predicate = None
+    if args.filter is not None:
+        try:
+            predicate = compile_filter(json.loads(args.filter))
+        except ValueError as exc:
+            parser.error(f"--filter: {exc}")
+    if args.order_by:
+        try:
+            compile_order_by(args.order_by)
+        except ValueError as exc:
+            parser.error(f"--order-by: {exc}")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
+    if predicate is not None or args.order_by or args.top is not None:
+
+        def items_stage(items):
+            if predicate is not None:
+                items = filter(predicate, items)
+            if args.order_by or args.top is not None:
+                items = order_items(items, args.order_by, args.top)
+            return items
+
+    if not 1 <= args.pack <= MAX_TASKS_PER_POST:
+        parser.error(f"--pack must be between 1 and {MAX_TASKS_PER_POST}")
+    if args.paginate and (args.batch or args.method != "POST"):
+        parser.error("--paginate requires a single POST request (no --batch)")
+    if args.stream and (args.batch or args.paginate):
+        parser.error("--stream cannot be combined with --batch or --paginate")
+    if args.max_items is not None and (not args.paginate or args.max_items < 1):
+        parser.error("--max-items requires --paginate and must be at least 1")
+    defaults = {
+        key: value
+        for key, value in (
+            ("location_code", args.default_location_code),
+            ("language_code", args.default_language_code),
+        )
+        if value is not None
+    }
+    if (args.dedupe or defaults) and not args.batch:
+        parser.error("--dedupe and --default-location-code/--default-language-code require --batch")
+    if args.dry_run and not args.batch:
+        parser.error("--dry-run requires --batch")
+    if args.budget is not None and args.budget <= 0:
+        parser.error("--budget must be positive")
+    planner = BatchPlanner(defaults, dedupe=args.dedupe) if args.dedupe or defaults else None
+
+    # Merge env config with CLI flags
+    debug = args.debug if args.debug is not None else config["debug"]
+    full_response = args.full_response if args.full_response is not None else config["full_response"]
+    for key, value in (
+        ("max_retries", args.max_retries),
+        ("cache_dir", args.cache_dir),
+        ("cache_ttl", args.cache_ttl),
+        ("field_config", args.field_config),
+        ("budget", args.budget),
+        ("price_config", args.price_config),
+        ("compress_requests", args.compress_requests),
+    ):
+        if value is not None:
+            config[key] = value
+    budget = config["budget"] if config["budget"] > 0 else None
+
+    if args.dry_run:
+        if not config["price_config"]:
+            parser.error("--dry-run needs --price-config or DATAFORSEO_PRICE_CONFIG")
+        try:
+            prices = PriceTable.from_file(config["price_config"])
+        except (OSError, ValueError) as exc:
+            parser.error(f"--price-config: {exc}")
+        _run_dry_run(args, prices, planner, budget)
+        return
+
+    username = config["username"]
+    password = config["password"]
+
+    if not username or not password:
+        output = {"status": "error", "message": "DATAFORSEO_USERNAME and DATAFORSEO_PASSWORD must be set"}
+        print(json.dumps(output))
+        sys.exit(1)
+
+    # Connection pool, rate limiter, retry policy and cache shared by every
+    # request in the run (and, under --serve, by later runs with the same config)
+    if warm is None:
+        warm = WarmState()
+        session_scope = warm
+    else:
+        session_scope = contextlib.nullcontext()
+    rate_limiter = warm.get(
+        ("rate_limiter", username, config["rate_limit"], tuple(sorted(config["rate_limits"].items()))),
+        lambda: RateLimiter.from_config(config),
+    )
+    rate_limiter.reset_stats()
+    retry = RetryPolicy.from_config(config) if config["max_retries"] > 0 else None
+    cache = None
+    if config["cache_dir"] and not args.no_cache:
+        cache = warm.get(
+            ("cache", config["cache_dir"], config["cache_ttl"], config["cache_max_mb"]),
+            lambda: ResponseCache.from_config(config),
+        )
+    field_config = get_field_config(config["field_config"]) if config["field_config"] else None
+    ledger = CostLedger(budget)
+    try:
+        trace = open(args.trace, "w", encoding="utf-8") if args.trace else None
+    except OSError as exc:
+        parser.error(f"--trace: {exc}")
+    stats = RequestStats(trace) if args.stats or trace is not None else None
+    journal = None
+    if args.journal:
+        for path in (args.journal, args.journal + ".results"):
+            if not args.resume and os.path.exists(path) and os.path.getsize(path):
+                parser.error(f"--journal: {path} exists; pass --resume to continue it or remove it")
+        # Everything that shapes the stored envelopes or the output written from them
+        settings = {
+            "full_response": bool(full_response or args.full_response),
+            "filter": args.filter,
+            "order_by": args.order_by,
+            "top": args.top,
+            "fields": args.fields,
+            "field_config": config["field_config"],
+        }
+        try:
+            journal = BatchJournal(args.journal, resume=args.resume, settings=settings)
+        except OSError as exc:
+            parser.error(f"--journal: {exc}")
+        except ValueError as exc:
+            parser.error(f"--resume: {exc}; resume with the same flags or start a new journal")
+        if debug and args.resume:
+            _debug_log(f"Journal: resuming {args.journal} ({journal.pending()} requests failed or unfinished)")
+
+    def fields_for(endpoint: str) -> str | None:
+        # --fields wins; otherwise the field config's list for the endpoint
+        if args.fields or field_config is None:
+            return args.fields
+        return field_config.spec_for(endpoint)
+
+    max_per_host = max(10, args.concurrency)
+    with session_scope:
+        session = warm.get(("session", max_per_host), lambda: Session(max_per_host=max_per_host))
+        request_kwargs = dict(
+            username=username,
+            password=password,
+            debug=debug,
+            session=session,
+            rate_limiter=rate_limiter,
+            retry=retry,
+            cache=cache,
+            ledger=ledger,
+            stats=stats,
+            compress_min_bytes=config["compress_requests"] or None,
+        )
+
+        def local(envelope: dict, endpoint: str) -> dict:
+            # Local filtering happens before --fields may drop filtered fields
+            if items_stage is not None and envelope["status"] == "ok":
+                with _timed(stats, endpoint, "filter"):
+                    envelope["result"] = map_result_items(envelope["result"], items_stage)
+            return envelope
+
+        def send(spec: dict) -> dict:
+            return local(make_chunked_request(
+                endpoint=spec["endpoint"],
+                method=spec["method"],
+                body=spec["body"],
+                full_response=full_response,
+                force_full=args.full_response or False,
+                wrap_array=not args.no_wrap_array,
+                **request_kwargs,
+            ), spec["endpoint"])
+
+        def send_pack(endpoint: str, payloads: list) -> list[dict]:
+            envelopes = send_packed(endpoint, payloads, pack_size=args.pack, **request_kwargs)
+            return [local(envelope, endpoint) for envelope in envelopes]
+
+        if journal is not None:
+            send = functools.partial(journal.call, send=send)
+            send_pack = functools.partial(journal.call_packed, send_packed=send_pack)
+
+        try:
+            if args.paginate:
+                _run_paginate(args, request_kwargs, fields_for, items_stage)
+            elif args.stream:
+                _run_stream(args, request_kwargs, full_response, fields_for, items_stage)
+            elif args.batch and args.standard:
+                _run_standard(args, request_kwargs, fields_for, local, planner, stats, journal)
+            elif args.batch:
+                _run_batch(args, send, send_pack, fields_for, planner, stats)
+            else:
+                _run_single(args, send, fields_for, stats)
+        finally:
+            if journal is not None:
+                journal.compact()
+                journal.close()
+                print(journal.summary(), file=sys.stderr, flush=True)
+            if planner is not None and planner.dedupe:
+                print(planner.summary(), file=sys.stderr, flush=True)
+            if budget is not None:
+                print(
+                    f"Spent ${ledger.total:.4f} of ${budget:.4f} budget on {ledger.requests} requests",
+                    file=sys.stderr,
+                    flush=True,
+                )
+            if args.stats:
+                print(stats.format_summary(), file=sys.stderr, flush=True)
+            if trace is not None:
+                trace.close()
+
+    if debug:
+        for family, entry in sorted(rate_limiter.stats().items()):
+            _debug_log(
+                f"Rate limiter [{family}]: {entry['requests']} requests, {entry['queued']} queued, "
+                f"{entry['wait_total']:.3f}s total wait, {entry['wait_max']:.3f}s max wait"
+            )
+        for endpoint, entry in ledger.snapshot()["endpoints"].items():
+            _debug_log(f"Cost [{endpoint}]: ${entry['cost']:.4f} over {entry['requests']} requests")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,11 @@
 """Shared fixtures and mock HTTP helpers for DataForSEO client tests."""
 
+import http.server
 import io
 import json
 import os
 import sys
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -110,7 +112,103 @@ class EnvVarMixin:
             self._original_env = {}
 
 
+def run_cli(argv, stdin_text="", env=None):
+    """Run ``scripts.dataforseo.main`` in-process.
+
+    Returns ``(exit_code, stdout_text, stderr_text)``.  Credentials default to
+    dummy values so tests only need to pass overrides in *env*.
+    """
+    from scripts import dataforseo
+
+    full_env = {"DATAFORSEO_USERNAME": "user", "DATAFORSEO_PASSWORD": "pass"}
+    full_env.update(env or {})
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    with patch.object(sys, "argv", ["dataforseo.py", *argv]), \
+            patch.object(sys, "stdin", io.StringIO(stdin_text)), \
+            patch.object(sys, "stdout", stdout), \
+            patch.object(sys, "stderr", stderr), \
+            patch.dict(os.environ, full_env):
+        try:
+            dataforseo.main()
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
 def patch_urlopen(response_data, status_code=200):
     """Return a patch context manager for urllib.request.urlopen."""
     mock_resp = MockHTTPResponse(response_data, status_code)
     return patch("urllib.request.urlopen", return_value=mock_resp)
+
+
+class StubAPIServer:
+    """Local keep-alive HTTP/1.1 server standing in for api.dataforseo.com.
+
+    *handler* is called as ``handler(method, path, body)`` and returns either
+    a JSON-serialisable object (sent with status 200) or a
+    ``(status, headers, payload)`` tuple.  Every request is recorded in
+    ``requests`` as ``(method, path, body, client_port)`` and its headers in
+    ``request_headers``.
+
+    Use as a context manager; ``base_url`` is suitable for patching
+    ``scripts.dataforseo.BASE_URL``.
+    """
+
+    def __init__(self, handler=None, ssl_context=None):
+        self.handler = handler or (lambda method, path, body: make_ai_response())
+        self.requests = []
+        self.request_headers = []
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                stub.requests.append((self.command, self.path, raw, self.client_address[1]))
+                stub.request_headers.append(dict(self.headers))
+                reply = stub.handler(self.command, self.path, raw)
+                status, headers, payload = reply if isinstance(reply, tuple) else (200, {}, reply)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _handle
+            do_POST = _handle
+
+            def log_message(self, *args):
+                pass
+
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+            # Room for many connections opened at once (asyncio clients)
+            request_queue_size = 128
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        scheme = "http"
+        if ssl_context is not None:
+            self._server.socket = ssl_context.wrap_socket(self._server.socket, server_side=True)
+            scheme = "https"
+        self.base_url = f"{scheme}://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def client_ports(self) -> set:
+        """Distinct client ports seen, i.e. the number of TCP connections used."""
+        return {req[3] for req in self.requests}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,130 @@
+"""Test cases for the asyncio client (AsyncClient / async_make_request)."""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response
+
+
+def echo_keyword(method, path, body):
+    keyword = json.loads(body)[0]["keyword"] if body else None
+    return make_ai_response(items=[{"keyword": keyword, "path": path}])
+
+
+class TestAsyncMakeRequest(unittest.IsolatedAsyncioTestCase):
+    """Test async_make_request against the stub server."""
+
+    async def test_envelope_matches_make_request(self):
+        from scripts.dataforseo import async_make_request, make_request
+
+        with StubAPIServer(echo_keyword) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            expected = make_request("/v3/test", body={"keyword": "seo"}, username="u", password="p")
+            got = await async_make_request("/v3/test", body={"keyword": "seo"}, username="u", password="p")
+        self.assertEqual(got, expected)
+        self.assertEqual(server.requests[1][:3], server.requests[0][:3])
+
+    async def test_full_response_validation_error(self):
+        from scripts.dataforseo import async_make_request
+
+        reply = make_full_response(tasks=[{"id": "t", "status_code": 40501, "status_message": "Invalid Field."}])
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            got = await async_make_request("/v3/test", body={"a": 1}, full_response=True, username="u", password="p")
+        self.assertEqual(got["status"], "error")
+        self.assertIn("40501", got["message"])
+
+    async def test_http_error_envelope(self):
+        from scripts.dataforseo import async_make_request
+
+        with StubAPIServer(lambda m, p, b: (401, {}, b"no")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            got = await async_make_request("/v3/test", body={"a": 1}, username="u", password="p")
+        self.assertEqual(got, {"status": "error", "message": "HTTP 401: Unauthorized"})
+
+    async def test_retries_then_reports_cost(self):
+        from scripts.dataforseo import CostLedger, RetryPolicy, async_make_request
+
+        calls = []
+
+        def flaky(method, path, body):
+            calls.append(path)
+            return (503, {}, b"busy") if len(calls) == 1 else make_full_response()
+
+        ledger = CostLedger()
+        with StubAPIServer(flaky) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            got = await async_make_request(
+                "/v3/test", body={"a": 1}, full_response=True, username="u", password="p",
+                retry=RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01), ledger=ledger,
+            )
+        self.assertEqual(got["status"], "ok")
+        self.assertEqual(got["cost"], 0.001)
+        self.assertEqual(len(calls), 2)
+
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    """Test connection pooling in AsyncClient."""
+
+    async def test_many_concurrent_requests_share_a_bounded_pool(self):
+        from scripts.dataforseo import AsyncClient, async_make_request
+
+        with StubAPIServer(echo_keyword) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            async with AsyncClient(max_per_host=4) as client:
+                results = await asyncio.gather(*(
+                    async_make_request("/v3/test", body={"keyword": f"k{i}"}, username="u", password="p", client=client)
+                    for i in range(200)
+                ))
+        self.assertEqual([r["result"]["items"][0]["keyword"] for r in results], [f"k{i}" for i in range(200)])
+        self.assertEqual(len(server.requests), 200)
+        self.assertLessEqual(len(server.client_ports), 4)
+
+    async def test_reads_chunked_bodies(self):
+        from scripts.dataforseo import _AsyncConnection
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"5\r\nhello\r\n6;ext=1\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\n"
+        )
+
+        class Writer:
+            def write(self, data):
+                self.sent = data
+
+            async def drain(self):
+                pass
+
+        conn = _AsyncConnection(reader, Writer())
+        status, reason, _, data, will_close = await conn.exchange("GET", "h", "/", {}, None)
+        self.assertEqual((status, reason, data, will_close), (200, "OK", b"hello world", False))
+        self.assertTrue(conn.writer.sent.startswith(b"GET / HTTP/1.1\r\nHost: h\r\n"))
+
+    async def test_timeout_covers_connection_setup(self):
+        import socket
+        import time
+        import urllib.error
+
+        from scripts.dataforseo import AsyncClient
+
+        # Accepts TCP connections (via the listen backlog) but never answers the TLS handshake
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            port = listener.getsockname()[1]
+            async with AsyncClient(timeout=0.2) as client:
+                start = time.perf_counter()
+                with self.assertRaises(urllib.error.URLError) as caught:
+                    await client.request("GET", f"https://127.0.0.1:{port}/v3/a")
+                elapsed = time.perf_counter() - start
+        self.assertIsInstance(caught.exception.reason, TimeoutError)
+        self.assertLess(elapsed, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
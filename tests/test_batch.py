@@ -0,0 +1,98 @@
+"""Test cases for NDJSON batch mode."""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, run_cli
+
+
+class TestParseBatchLine(unittest.TestCase):
+    """Test parsing of individual NDJSON batch lines."""
+
+    def test_bare_payload_uses_default_endpoint(self):
+        from scripts.dataforseo import parse_batch_line
+
+        spec = parse_batch_line('{"keyword": "seo"}', "/v3/test", "POST")
+        self.assertEqual(spec, {"endpoint": "/v3/test", "method": "POST", "body": {"keyword": "seo"}})
+
+    def test_envelope_carries_its_own_endpoint(self):
+        from scripts.dataforseo import parse_batch_line
+
+        line = '{"endpoint": "/v3/other", "method": "get", "body": {"a": 1}}'
+        spec = parse_batch_line(line, "/v3/test")
+        self.assertEqual(spec, {"endpoint": "/v3/other", "method": "GET", "body": {"a": 1}})
+
+    def test_envelope_without_body(self):
+        from scripts.dataforseo import parse_batch_line
+
+        spec = parse_batch_line('{"endpoint": "/v3/other"}')
+        self.assertIsNone(spec["body"])
+
+    def test_invalid_json_raises_value_error(self):
+        from scripts.dataforseo import parse_batch_line
+
+        with self.assertRaises(ValueError):
+            parse_batch_line("{not json", "/v3/test")
+
+    def test_missing_endpoint_raises_value_error(self):
+        from scripts.dataforseo import parse_batch_line
+
+        with self.assertRaises(ValueError):
+            parse_batch_line('{"keyword": "seo"}')
+
+
+class TestIterBatch(unittest.TestCase):
+    """Test iter_batch alignment and post-processing."""
+
+    def test_one_envelope_per_non_blank_line(self):
+        from scripts.dataforseo import iter_batch
+
+        lines = ['{"k": 1}\n', "\n", "bad json\n", '{"k": 2}\n']
+        sent = []
+
+        def send(spec):
+            sent.append(spec["body"])
+            return {"status": "ok", "result": {"k": spec["body"]["k"], "extra": True}}
+
+        out = list(iter_batch(lines, send, "/v3/test", field_spec="k"))
+        self.assertEqual(sent, [{"k": 1}, {"k": 2}])
+        self.assertEqual(len(out), 3)
+        self.assertEqual(out[0], {"status": "ok", "result": {"k": 1}})
+        self.assertEqual(out[1]["status"], "error")
+        self.assertEqual(out[2], {"status": "ok", "result": {"k": 2}})
+
+
+class TestBatchCLI(unittest.TestCase):
+    """Test the --batch CLI mode end to end against a stub server."""
+
+    def test_batch_streams_one_line_per_input_over_one_connection(self):
+        def handler(method, path, body):
+            keyword = json.loads(body)[0]["keyword"]
+            return make_ai_response(items=[{"keyword": keyword, "volume": 10}])
+
+        stdin = '{"keyword": "a"}\n{"keyword": "b"}\n{"endpoint": "/v3/other", "body": {"keyword": "c"}}\n'
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(["--batch", "--endpoint", "/v3/test", "--fields", "items.*.keyword"], stdin)
+
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual([line["result"]["items"][0]["keyword"] for line in lines], ["a", "b", "c"])
+        self.assertEqual([req[1] for req in server.requests], ["/v3/test.ai", "/v3/test.ai", "/v3/other.ai"])
+        self.assertEqual(len(server.client_ports), 1)
+
+    def test_endpoint_required_without_batch(self):
+        code, _, _ = run_cli([], "")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+"""Test cases for the on-disk response cache."""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+
+class TestRequestCacheKey(unittest.TestCase):
+    """Test cache key canonicalisation."""
+
+    def test_key_ignores_key_order(self):
+        from scripts.dataforseo import request_cache_key
+
+        a = request_cache_key("u", "POST", [{"keyword": "seo", "location_code": 2840}], "ai")
+        b = request_cache_key("u", "post", [{"location_code": 2840, "keyword": "seo"}], "ai")
+        self.assertEqual(a, b)
+
+    def test_key_depends_on_url_mode_and_body(self):
+        from scripts.dataforseo import request_cache_key
+
+        base = request_cache_key("u", "POST", [{"keyword": "seo"}], "ai")
+        self.assertNotEqual(base, request_cache_key("u.ai", "POST", [{"keyword": "seo"}], "ai"))
+        self.assertNotEqual(base, request_cache_key("u", "POST", [{"keyword": "seo"}], "full"))
+        self.assertNotEqual(base, request_cache_key("u", "POST", [{"keyword": "sem"}], "ai"))
+        self.assertNotEqual(base, request_cache_key("u", "GET", [{"keyword": "seo"}], "ai"))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test storage, expiry and eviction."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_and_miss(self):
+        from scripts.dataforseo import CACHE_MISS, ResponseCache
+
+        cache = ResponseCache(self.dir)
+        self.assertIs(cache.get("ab" * 32, "/v3/test"), CACHE_MISS)
+        cache.put("ab" * 32, "/v3/test", {"items": [1, 2]})
+        self.assertEqual(cache.get("ab" * 32, "/v3/test"), {"items": [1, 2]})
+
+    def test_none_result_is_a_hit(self):
+        from scripts.dataforseo import ResponseCache
+
+        cache = ResponseCache(self.dir)
+        cache.put("cd" * 32, "/v3/test", None)
+        self.assertIsNone(cache.get("cd" * 32, "/v3/test"))
+
+    def test_expired_entries_miss(self):
+        from scripts.dataforseo import CACHE_MISS, ResponseCache
+
+        cache = ResponseCache(self.dir, ttl=10)
+        cache.put("ab" * 32, "/v3/test", 1)
+        with patch("time.time", return_value=time.time() + 11):
+            self.assertIs(cache.get("ab" * 32, "/v3/test"), CACHE_MISS)
+        self.assertFalse(os.path.exists(cache._path("ab" * 32)))
+
+    def test_per_endpoint_ttls(self):
+        from scripts.dataforseo import ResponseCache
+
+        cache = ResponseCache(self.dir, ttl=60)
+        self.assertEqual(cache.ttl_for("/v3/serp/google/organic/live/advanced"), 60)
+        self.assertEqual(cache.ttl_for("/v3/serp/google/locations"), 7 * 86400)
+        self.assertEqual(cache.ttl_for("/v3/keywords_data/google_trends/categories/live"), 7 * 86400)
+        custom = ResponseCache(self.dir, ttl=60, endpoint_ttls={"/v3/serp/*": 5})
+        self.assertEqual(custom.ttl_for("/v3/serp/google/organic/live/advanced"), 5)
+        self.assertEqual(custom.ttl_for("/v3/backlinks/summary/live"), 60)
+
+    def test_lru_eviction_by_size(self):
+        from scripts.dataforseo import CACHE_MISS, ResponseCache
+
+        cache = ResponseCache(self.dir, max_bytes=700)  # room for three entries
+        blob = "x" * 150
+        for i, key in enumerate(("aa", "bb", "cc")):
+            cache.put(key * 32, "/v3/test", blob)
+            os.utime(cache._path(key * 32), (1000 + i, 1000 + i))
+        # Touch "aa" so "bb" becomes least recently used
+        cache.get("aa" * 32, "/v3/test")
+        cache.put("dd" * 32, "/v3/test", blob)
+        self.assertIs(cache.get("bb" * 32, "/v3/test"), CACHE_MISS)
+        self.assertEqual(cache.get("aa" * 32, "/v3/test"), blob)
+        self.assertEqual(cache.get("dd" * 32, "/v3/test"), blob)
+
+    def test_overwriting_a_key_counts_its_size_once(self):
+        from scripts.dataforseo import ResponseCache
+
+        cache = ResponseCache(self.dir)
+        for _ in range(5):
+            cache.put("ab" * 32, "/v3/test", "x" * 1000)
+        cache.put("cd" * 32, "/v3/test", "y")
+        on_disk = sum(size for _, size, _ in cache._entries())
+        self.assertEqual(cache._size, on_disk)
+
+    def test_expired_entry_removed_on_read_leaves_the_size_total(self):
+        from scripts.dataforseo import CACHE_MISS, ResponseCache
+
+        cache = ResponseCache(self.dir, ttl=3600)
+        cache.put("ab" * 32, "/v3/test", "x" * 1000)
+        cache.put("cd" * 32, "/v3/test", "y")
+        cache.ttl = -1
+        self.assertIs(cache.get("ab" * 32, "/v3/test"), CACHE_MISS)
+        on_disk = sum(size for _, size, _ in cache._entries())
+        self.assertEqual(cache._size, on_disk)
+
+
+class TestMakeRequestCache(unittest.TestCase):
+    """Test that make_request serves repeats from the cache."""
+
+    def test_second_identical_request_skips_network_and_validation(self):
+        from scripts.dataforseo import ResponseCache, make_request
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                StubAPIServer(lambda m, p, b: make_full_response()) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            cache = ResponseCache(tmp)
+            kwargs = dict(full_response=True, username="u", password="p", cache=cache)
+            first = make_request("/v3/test", body={"a": 1, "b": 2}, **kwargs)
+            with patch("scripts.dataforseo.validate_full_response") as validate:
+                second = make_request("/v3/test", body={"b": 2, "a": 1}, **kwargs)
+                validate.assert_not_called()
+            self.assertEqual(first, second)
+            self.assertEqual(len(server.requests), 1)
+
+    def test_errors_are_not_cached(self):
+        from scripts.dataforseo import ResponseCache, make_request
+
+        replies = [make_ai_response(status_code=40501, status_message="Invalid Field."), make_ai_response()]
+        with tempfile.TemporaryDirectory() as tmp, \
+                StubAPIServer(lambda m, p, b: replies.pop(0)) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            cache = ResponseCache(tmp)
+            self.assertEqual(make_request("/v3/test", username="u", password="p", cache=cache)["status"], "error")
+            self.assertEqual(make_request("/v3/test", username="u", password="p", cache=cache)["status"], "ok")
+            self.assertEqual(len(server.requests), 2)
+
+
+class TestCacheCLI(unittest.TestCase):
+    """Test --cache-dir / --no-cache flags."""
+
+    def test_cache_dir_and_no_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, StubAPIServer() as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            argv = ["--endpoint", "/v3/test", "--cache-dir", tmp]
+            _, first, _ = run_cli(argv, '{"keyword": "seo"}')
+            _, second, _ = run_cli(argv, '{"keyword": "seo"}')
+            self.assertEqual(first, second)
+            self.assertEqual(len(server.requests), 1)
+            run_cli(argv + ["--no-cache"], '{"keyword": "seo"}')
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(json.loads(first)["status"], "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Test cases for splitting oversized bulk keyword/target arrays."""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+VOLUME = "/v3/keywords_data/google_ads/search_volume/live"
+OVERVIEW = "/v3/dataforseo_labs/google/keyword_overview/live"
+
+
+def echo_items(method, path, body):
+    """Answer with one item per keyword/target, in the AI or full format."""
+    task = json.loads(body)[0]
+    values = task.get("keywords") or task.get("targets")
+    items = [{"keyword": value} for value in values]
+    if path.endswith(".ai"):
+        return make_ai_response(items=items)
+    result = [{"items_count": len(items), "total_count": len(items), "items": items}]
+    return make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": result}])
+
+
+class TestSplitBulkPayload(unittest.TestCase):
+    """Test chunk planning from the per-endpoint limits."""
+
+    def test_splits_at_the_endpoint_limit(self):
+        from scripts.dataforseo import split_bulk_payload
+
+        body = {"keywords": [f"k{i}" for i in range(1500)], "location_code": 2840}
+        chunks = split_bulk_payload(OVERVIEW, body)
+        self.assertEqual([len(c["keywords"]) for c in chunks], [700, 700, 100])
+        self.assertEqual(sum((c["keywords"] for c in chunks), []), body["keywords"])
+        self.assertTrue(all(c["location_code"] == 2840 for c in chunks))
+
+    def test_targets_and_wrapped_bodies(self):
+        from scripts.dataforseo import split_bulk_payload
+
+        body = [{"targets": [f"d{i}.com" for i in range(2001)]}]
+        chunks = split_bulk_payload("/v3/backlinks/bulk_ranks/live/", body)
+        self.assertEqual([len(c[0]["targets"]) for c in chunks], [1000, 1000, 1])
+
+    def test_leaves_small_and_unknown_requests_alone(self):
+        from scripts.dataforseo import split_bulk_payload
+
+        self.assertIsNone(split_bulk_payload(VOLUME, {"keywords": ["a"] * 1000}))
+        self.assertIsNone(split_bulk_payload("/v3/keywords_data/google_trends/explore/live", {"keywords": ["a"] * 9}))
+        self.assertIsNone(split_bulk_payload(VOLUME, [{"keywords": ["a"] * 2000}, {}]))
+        self.assertIsNone(split_bulk_payload(VOLUME, None))
+
+
+class TestMergeChunkResults(unittest.TestCase):
+    """Test merging chunk results back into one response."""
+
+    def test_ai_results(self):
+        from scripts.dataforseo import merge_chunk_results
+
+        merged = merge_chunk_results([{"items": [1, 2], "items_count": 2, "x": "a"}, {"items": None, "x": "b"},
+                                      {"items": [3], "items_count": 1, "x": "c"}])
+        self.assertEqual(merged, {"items": [1, 2, 3], "items_count": 2, "x": "a"})
+
+    def test_full_results_merge_by_position(self):
+        from scripts.dataforseo import merge_chunk_results
+
+        merged = merge_chunk_results([[{"items": [1], "total_count": 1}], [{"items": [2], "total_count": 1}]])
+        self.assertEqual(merged, [{"items": [1, 2], "total_count": 2}])
+
+    def test_flat_full_results_are_concatenated(self):
+        from scripts.dataforseo import merge_chunk_results
+
+        merged = merge_chunk_results([[{"keyword": "a"}, {"keyword": "b"}], [{"keyword": "c"}]])
+        self.assertEqual(merged, [{"keyword": "a"}, {"keyword": "b"}, {"keyword": "c"}])
+
+
+class TestMakeChunkedRequest(unittest.TestCase):
+    """Test sending chunks and merging their items end to end."""
+
+    def test_items_come_back_in_input_order(self):
+        from scripts.dataforseo import make_chunked_request
+
+        keywords = [f"k{i}" for i in range(2500)]
+        with StubAPIServer(echo_items) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = make_chunked_request(VOLUME, body={"keywords": keywords}, full_response=True,
+                                       username="u", password="p")
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(out["status"], "ok")
+        self.assertEqual([item["keyword"] for item in out["result"][0]["items"]], keywords)
+        self.assertEqual(out["result"][0]["items_count"], 2500)
+
+    def test_search_volume_results_keep_every_keyword(self):
+        from scripts.dataforseo import make_chunked_request
+
+        def handler(method, path, body):
+            # search_volume's full result is one object per keyword, with no items
+            result = [{"keyword": k, "search_volume": 10} for k in json.loads(body)[0]["keywords"]]
+            return make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": result}])
+
+        keywords = [f"k{i}" for i in range(1500)]
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = make_chunked_request(VOLUME, body={"keywords": keywords}, full_response=True,
+                                       username="u", password="p")
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(out["status"], "ok")
+        self.assertEqual([entry["keyword"] for entry in out["result"]], keywords)
+
+    def test_failed_chunk_fails_the_request(self):
+        from scripts.dataforseo import make_chunked_request
+
+        def handler(method, path, body):
+            if json.loads(body)[0]["keywords"][0] == "k1000":
+                return 500, {}, b"boom"
+            return echo_items(method, path, body)
+
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = make_chunked_request(VOLUME, body={"keywords": [f"k{i}" for i in range(1200)]},
+                                       username="u", password="p")
+        self.assertEqual(out["status"], "error")
+        self.assertTrue(out["message"].startswith("Chunk 2/2: HTTP 500"))
+
+    def test_cli_chunks_before_local_top(self):
+        stdin = json.dumps({"keywords": [f"k{i:04d}" for i in range(1400)]})
+        with StubAPIServer(echo_items) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(["--endpoint", OVERVIEW, "--order-by", "keyword,desc", "--top", "2",
+                                    "--format", "ndjson", "--fields", "keyword"], stdin)
+        self.assertEqual(code, 0)
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual([json.loads(line) for line in out.splitlines()], [{"keyword": "k1399"}, {"keyword": "k1398"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
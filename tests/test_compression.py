@@ -0,0 +1,176 @@
+"""Test cases for gzip/deflate response decoding and request compression."""
+
+import asyncio
+import gzip
+import http.client
+import io
+import json
+import os
+import sys
+import unittest
+import zlib
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+ITEMS = [{"keyword": f"keyword {i}", "search_volume": i * 10} for i in range(500)]
+
+
+def gzipped(method, path, body):
+    """Answer with a gzip-encoded AI response of 500 items."""
+    return 200, {"Content-Encoding": "gzip"}, gzip.compress(json.dumps(make_ai_response(items=ITEMS)).encode())
+
+
+def raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class TestBodyReader(unittest.TestCase):
+    """Test incremental decoding of response bodies."""
+
+    DATA = json.dumps(ITEMS).encode()
+
+    def read_all(self, encoded: bytes, encoding: str, amt: int | None):
+        from scripts.dataforseo import _BodyReader
+
+        reader = _BodyReader(io.BytesIO(encoded), encoding)
+        if amt is None:
+            return reader.read(), reader
+        chunks = []
+        while chunk := reader.read(amt):
+            self.assertLessEqual(len(chunk), amt)
+            chunks.append(chunk)
+        return b"".join(chunks), reader
+
+    def test_encodings_decode_whole_and_in_small_reads(self):
+        for encoding, encoded in [
+            ("gzip", gzip.compress(self.DATA)),
+            ("deflate", zlib.compress(self.DATA)),
+            ("deflate", raw_deflate(self.DATA)),
+            ("identity", self.DATA),
+            (None, self.DATA),
+        ]:
+            for amt in (None, 7, 4096):
+                with self.subTest(encoding=encoding, amt=amt):
+                    data, reader = self.read_all(encoded, encoding, amt)
+                    self.assertEqual(data, self.DATA)
+                    self.assertEqual((reader.wire_bytes, reader.bytes), (len(encoded), len(self.DATA)))
+
+    def test_deflate_header_split_across_reads(self):
+        from scripts.dataforseo import _BodyReader
+
+        class Trickle(io.BytesIO):
+            def read(self, size=-1):
+                return super().read(1)
+
+        for encoded in (zlib.compress(self.DATA), raw_deflate(self.DATA)):
+            with self.subTest(zlib_wrapped=encoded[0] == 0x78):
+                self.assertEqual(_BodyReader(Trickle(encoded), "deflate").read(), self.DATA)
+
+    def test_truncated_body_raises(self):
+        from scripts.dataforseo import _BodyReader
+
+        with self.assertRaises(http.client.IncompleteRead):
+            _BodyReader(io.BytesIO(gzip.compress(self.DATA)[:-20]), "gzip").read()
+
+    def test_corrupt_or_unknown_encoding_raises(self):
+        from scripts.dataforseo import _BodyReader
+
+        with self.assertRaises(http.client.HTTPException):
+            _BodyReader(io.BytesIO(b"not gzip at all"), "gzip").read()
+        with self.assertRaises(http.client.HTTPException):
+            _BodyReader(io.BytesIO(b"x"), "br").read()
+
+
+class TestCompressBody(unittest.TestCase):
+    """Test the request body compression threshold."""
+
+    def test_threshold(self):
+        from scripts.dataforseo import _compress_body
+
+        headers = {}
+        self.assertEqual(_compress_body(b"small", headers, 100), b"small")
+        self.assertEqual(_compress_body(b"x" * 200, headers, None), b"x" * 200)
+        self.assertEqual(headers, {})
+        self.assertEqual(gzip.decompress(_compress_body(b"x" * 200, headers, 100)), b"x" * 200)
+        self.assertEqual(headers, {"Content-Encoding": "gzip"})
+
+
+class TestCompressedRequests(unittest.TestCase):
+    """Test compression end to end against the stub server."""
+
+    def test_decodes_over_session_and_urllib_and_reuses_connection(self):
+        from scripts.dataforseo import RequestStats, Session, make_request
+
+        stats = RequestStats()
+        with StubAPIServer(gzipped) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            plain = make_request("/v3/test", body={"a": 1}, username="u", password="p", stats=stats)
+            with Session() as session:
+                pooled = [
+                    make_request("/v3/test", body={"a": 1}, username="u", password="p", session=session, stats=stats)
+                    for _ in range(2)
+                ]
+        self.assertEqual(plain["result"]["items"], ITEMS)
+        self.assertEqual(pooled, [plain, plain])
+        self.assertTrue(all(h["Accept-Encoding"] == "gzip, deflate" for h in server.request_headers))
+        self.assertEqual(len({port for _, _, _, port in server.requests[1:]}), 1)
+        totals = stats.transfer()["/v3/test"]
+        self.assertLess(totals["wire_bytes"] * 5, totals["bytes"])
+        self.assertEqual(stats.summary()["/v3/test"]["decode"]["count"], 3)
+
+    def test_large_bodies_are_sent_gzipped(self):
+        from scripts.dataforseo import make_request
+
+        def echo(method, path, body):
+            return make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": [len(body)]}])
+
+        with StubAPIServer(echo) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            for keywords in (["a"], [f"keyword {i}" for i in range(1000)]):
+                make_request(
+                    "/v3/test", body={"keywords": keywords}, full_response=True,
+                    username="u", password="p", compress_min_bytes=1024,
+                )
+        small, large = server.requests
+        self.assertEqual(json.loads(small[2]), [{"keywords": ["a"]}])
+        self.assertNotIn("Content-Encoding", server.request_headers[0])
+        self.assertEqual(server.request_headers[1]["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(large[2]))[0]["keywords"]), 1000)
+
+    def test_stream_items_decodes_incrementally(self):
+        from scripts.dataforseo import RequestStats, Session, stream_items
+
+        stats = RequestStats()
+        with StubAPIServer(gzipped) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            direct = list(stream_items("/v3/test", body={"a": 1}, username="u", password="p"))
+            with Session() as session:
+                pooled = list(stream_items("/v3/test", body={"a": 1}, username="u", password="p",
+                                           session=session, stats=stats))
+        self.assertEqual(direct, ITEMS)
+        self.assertEqual(pooled, ITEMS)
+        self.assertIn("decode", stats.summary()["/v3/test"])
+
+    def test_async_client_decodes(self):
+        from scripts.dataforseo import async_make_request
+
+        with StubAPIServer(gzipped) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            result = asyncio.run(async_make_request("/v3/test", body={"a": 1}, username="u", password="p"))
+        self.assertEqual(result["result"]["items"], ITEMS)
+        self.assertEqual(server.request_headers[0]["Accept-Encoding"], "gzip, deflate")
+
+    def test_cli_stats_report_bytes(self):
+        with StubAPIServer(gzipped) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, _, err = run_cli(["--endpoint", "/v3/test", "--stats"], '{"a": 1}')
+        self.assertEqual(code, 0)
+        self.assertIn("received", err)
+        self.assertRegex(err, r"/v3/test\s+\d+\s+\d+\s+\d+\s+\d+\.\d\dx")
+
+
+if __name__ == "__main__":
+    unittest.main()
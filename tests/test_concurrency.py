@@ -0,0 +1,94 @@
+"""Test cases for the bounded concurrent executor."""
+
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, run_cli
+
+
+class TestRunConcurrently(unittest.TestCase):
+    """Test ordering, parallelism and error isolation of run_concurrently."""
+
+    def test_results_keep_input_order(self):
+        from scripts.dataforseo import run_concurrently
+
+        def slow_echo(n):
+            time.sleep(0.01 * (5 - n))
+            return n
+
+        self.assertEqual(list(run_concurrently(slow_echo, range(5), concurrency=5)), [0, 1, 2, 3, 4])
+
+    def test_parallelism_is_bounded(self):
+        from scripts.dataforseo import run_concurrently
+
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def work(n):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return n
+
+        list(run_concurrently(work, range(20), concurrency=3))
+        self.assertEqual(peak[0], 3)
+
+    def test_exception_becomes_error_envelope_for_that_item(self):
+        from scripts.dataforseo import run_concurrently
+
+        def work(n):
+            if n == 1:
+                raise RuntimeError("boom")
+            return n
+
+        for concurrency in (1, 4):
+            out = list(run_concurrently(work, range(3), concurrency=concurrency))
+            self.assertEqual(out, [0, {"status": "error", "message": "boom"}, 2])
+
+    def test_consumes_lazy_iterators(self):
+        from scripts.dataforseo import run_concurrently
+
+        out = run_concurrently(lambda n: n * 2, iter(range(100)), concurrency=4)
+        self.assertEqual(list(out), [n * 2 for n in range(100)])
+
+
+class TestConcurrentBatchCLI(unittest.TestCase):
+    """Test --batch --concurrency against a stub server."""
+
+    def test_concurrent_batch_preserves_order(self):
+        def handler(method, path, body):
+            keyword = json.loads(body)[0]["keyword"]
+            time.sleep(0.001 * (20 - int(keyword)))
+            return make_ai_response(items=[{"keyword": keyword}])
+
+        stdin = "".join(json.dumps({"keyword": str(i)}) + "\n" for i in range(20))
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(["--batch", "--endpoint", "/v3/test", "--concurrency", "8"], stdin)
+
+        self.assertEqual(code, 0)
+        keywords = [json.loads(line)["result"]["items"][0]["keyword"] for line in out.splitlines()]
+        self.assertEqual(keywords, [str(i) for i in range(20)])
+        self.assertLessEqual(len(server.client_ports), 8)
+
+    def test_concurrency_must_be_positive(self):
+        code, _, _ = run_cli(["--batch", "--endpoint", "/v3/test", "--concurrency", "0"], "")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -258,5 +258,96 @@ class TestFieldConfigPath(EnvVarMixin, unittest.TestCase):
             os.unlink(tmp_path)
 
 
+class TestFieldConfigProjection(unittest.TestCase):
+    """Test FieldConfig resolution, reloading and CLI wiring."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "fields.json")
+        self.write({"backlinks_anchors": ["items.anchor"], "serp_organic_live_advanced": ["items.url"]})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, supported, mtime_ns=None):
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump({"supported_fields": supported}, fh)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_endpoint_tool_names(self):
+        from scripts.dataforseo import endpoint_tool_names
+
+        self.assertIn("backlinks_anchors", endpoint_tool_names("/v3/backlinks/anchors/live"))
+        self.assertIn("serp_organic_live_advanced", endpoint_tool_names("/v3/serp/google/organic/live/advanced"))
+        self.assertIn(
+            "dataforseo_labs_google_keyword_ideas",
+            endpoint_tool_names("/v3/dataforseo_labs/google/keyword_ideas/live"),
+        )
+        self.assertEqual(endpoint_tool_names("/v3/on_page/instant_pages")[0], "/v3/on_page/instant_pages")
+
+    def test_spec_for_endpoint(self):
+        from scripts.dataforseo import FieldConfig
+
+        config = FieldConfig(self.path)
+        self.assertEqual(config.spec_for("/v3/backlinks/anchors/live"), "items.anchor")
+        self.assertEqual(config.spec_for("/v3/serp/bing/organic/live/advanced"), "items.url")
+        self.assertIsNone(config.spec_for("/v3/backlinks/summary/live"))
+
+    def test_reloads_only_when_file_changes(self):
+        from unittest.mock import patch
+
+        import scripts.dataforseo as client
+
+        self.write({"backlinks_anchors": ["items.anchor"]}, mtime_ns=1_000_000_000)
+        config = client.FieldConfig(self.path)
+        with patch.object(client, "load_field_config", wraps=client.load_field_config) as loader:
+            for _ in range(5):
+                config.spec_for("/v3/backlinks/anchors/live")
+            self.assertEqual(loader.call_count, 1)
+            self.write({"backlinks_anchors": ["items.rank"]}, mtime_ns=2_000_000_000)
+            self.assertEqual(config.spec_for("/v3/backlinks/anchors/live"), "items.rank")
+            self.assertEqual(loader.call_count, 2)
+
+    def test_cli_applies_config_unless_fields_given(self):
+        from unittest.mock import patch
+
+        from tests.conftest import StubAPIServer, make_ai_response, run_cli
+
+        reply = make_ai_response(items=[{"anchor": "a", "rank": 1}])
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            _, out, _ = run_cli(["--endpoint", "/v3/backlinks/anchors/live", "--field-config", self.path], "{}")
+            self.assertEqual(json.loads(out)["result"], {"items": [{"anchor": "a"}]})
+            _, out, _ = run_cli(
+                ["--endpoint", "/v3/backlinks/anchors/live", "--fields", "items.rank"],
+                "{}",
+                env={"FIELD_CONFIG_PATH": self.path},
+            )
+            self.assertEqual(json.loads(out)["result"], {"items": [{"rank": 1}]})
+
+    def test_config_paths_work_in_every_output_mode(self):
+        from unittest.mock import patch
+
+        from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+        item = {"anchor": "a", "rank": 1}
+
+        def handler(method, path, body):
+            if path.endswith(".ai"):
+                return make_ai_response(items=[item])
+            result = [{"total_count": 1, "items_count": 1, "items": [item]}]
+            return make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": result}])
+
+        endpoint = ["--endpoint", "/v3/backlinks/anchors/live"]
+        env = {"FIELD_CONFIG_PATH": self.path}
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(endpoint + ["--paginate"], "{}", env)
+            self.assertEqual((code, [json.loads(line) for line in out.splitlines()]), (0, [{"anchor": "a"}]))
+            code, out, _ = run_cli(endpoint + ["--format", "csv"], "{}", env)
+            self.assertEqual((code, out.splitlines()), (0, ["anchor", "a"]))
+            code, out, _ = run_cli(endpoint + ["--full-response"], "{}", env)
+            self.assertEqual((code, json.loads(out)["result"]), (0, [{"items": [{"anchor": "a"}]}]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,179 @@
+"""Test cases for cost accounting, budgets and dry-run estimates."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_full_response, run_cli
+
+
+def costly(method, path, body):
+    """Answer every request with a full response costing $0.01."""
+    response = make_full_response()
+    response["cost"] = 0.01
+    return response
+
+
+class TestCostLedger(unittest.TestCase):
+    """Test ledger totals, roll-up and budget checks."""
+
+    def test_totals_per_endpoint_and_parent(self):
+        from scripts.dataforseo import CostLedger
+
+        process = CostLedger()
+        batch = CostLedger(parent=process)
+        batch.add("/v3/a/live.ai", 0.5)
+        batch.add("/v3/a/live", None)
+        process.add("/v3/b", 0.25)
+        self.assertEqual(batch.snapshot(), {
+            "total": 0.5, "requests": 2, "endpoints": {"/v3/a/live": {"requests": 2, "cost": 0.5}},
+        })
+        self.assertEqual(process.snapshot()["total"], 0.75)
+        self.assertEqual(process.requests, 3)
+
+    def test_parent_budget_applies_to_child(self):
+        from scripts.dataforseo import BudgetExceeded, CostLedger
+
+        process = CostLedger(budget=1.0)
+        batch = CostLedger(parent=process)
+        batch.check()
+        batch.add("/v3/a", 1.0)
+        with self.assertRaises(BudgetExceeded):
+            batch.check()
+
+
+class TestMakeRequestCost(unittest.TestCase):
+    """Test cost capture and the budget cap in make_request."""
+
+    def test_envelope_carries_cost_and_budget_stops_requests(self):
+        from scripts.dataforseo import CostLedger, make_request
+
+        ledger = CostLedger(budget=0.02)
+        with StubAPIServer(costly) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = [make_request("/v3/test", body={"k": i}, full_response=True, username="u", password="p",
+                                ledger=ledger) for i in range(3)]
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual([o.get("cost") for o in out[:2]], [0.01, 0.01])
+        self.assertEqual(out[2]["status"], "error")
+        self.assertIn("Budget of $0.0200 reached", out[2]["message"])
+        self.assertAlmostEqual(ledger.total, 0.02)
+
+    def test_cost_is_summed_over_retries(self):
+        from scripts.dataforseo import CostLedger, RetryPolicy, make_request
+
+        def busy_then_ok(method, path, body):
+            response = make_full_response(status_code=50000 if len(server.requests) == 1 else 20000)
+            response["cost"] = 0.01
+            return response
+
+        ledger = CostLedger()
+        with StubAPIServer(busy_then_ok) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = make_request("/v3/test", body={}, full_response=True, username="u", password="p", ledger=ledger,
+                               retry=RetryPolicy(max_retries=1, base_delay=0.01, max_delay=0.01))
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(out["cost"], 0.02)
+        self.assertAlmostEqual(ledger.total, 0.02)
+
+    def test_no_cost_key_without_ledger(self):
+        from scripts.dataforseo import make_request
+
+        with StubAPIServer(costly) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = make_request("/v3/test", body={}, full_response=True, username="u", password="p")
+        self.assertNotIn("cost", out)
+
+    def test_packed_tasks_carry_their_own_cost(self):
+        from scripts.dataforseo import CostLedger, send_packed
+
+        def handler(method, path, body):
+            tasks = [{"id": str(i), "status_code": 20000, "cost": 0.002 * (i + 1), "result": [p]}
+                     for i, p in enumerate(json.loads(body))]
+            response = make_full_response(tasks=tasks)
+            response["cost"] = 0.006
+            return response
+
+        ledger = CostLedger()
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = send_packed("/v3/test", [{"a": 1}, {"a": 2}], username="u", password="p", ledger=ledger)
+        self.assertEqual([o["cost"] for o in out], [0.002, 0.004])
+        self.assertAlmostEqual(ledger.total, 0.006)
+
+
+class TestPriceTable(unittest.TestCase):
+    """Test dry-run price lookups and estimates."""
+
+    def test_longest_prefix_and_keyword_prices(self):
+        from scripts.dataforseo import PriceTable
+
+        prices = PriceTable({
+            "/v3/dataforseo_labs/": {"task": 0.01, "keyword": 0.0001},
+            "/v3/dataforseo_labs/google/keyword_overview/live": {"task": 0.02},
+            "/v3/serp/google/organic/live/advanced": 0.002,
+        })
+        self.assertEqual(prices.estimate("/v3/serp/google/organic/live/advanced", {"keyword": "a"}), (1, 0.002))
+        tasks, cost = prices.estimate("/v3/dataforseo_labs/google/keyword_overview/live", {"keywords": ["a"] * 800})
+        self.assertEqual((tasks, round(cost, 6)), (2, 0.04))
+        tasks, cost = prices.estimate("/v3/dataforseo_labs/google/search_intent/live", {"keywords": ["a"] * 10})
+        self.assertEqual((tasks, round(cost, 6)), (1, 0.011))
+        self.assertEqual(prices.estimate("/v3/backlinks/summary/live", [{}, {}]), (2, None))
+
+    def test_bad_prices_raise_value_error(self):
+        from scripts.dataforseo import PriceTable
+
+        with self.assertRaises(ValueError):
+            PriceTable({"/v3/x": "cheap"})
+
+
+class TestCostCLI(unittest.TestCase):
+    """Test --budget and --dry-run end to end."""
+
+    def test_budget_caps_a_batch(self):
+        stdin = "".join(json.dumps({"k": i}) + "\n" for i in range(4))
+        with StubAPIServer(costly) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, err = run_cli(["--batch", "--full-response", "--endpoint", "/v3/test", "--budget", "0.02"],
+                                     stdin)
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual([line["status"] for line in lines], ["ok", "ok", "error", "error"])
+        self.assertEqual(lines[0]["cost"], 0.01)
+        self.assertEqual(len(server.requests), 2)
+        self.assertIn("Spent $0.0200 of $0.0200 budget on 2 requests", err)
+
+    def test_dry_run_estimates_without_sending_or_credentials(self):
+        prices = {"/v3/serp/": 0.002}
+        stdin = '{"keyword": "a"}\n{"keyword": "A"}\nnot json\n{"endpoint": "/v3/other", "body": {}}\n'
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(prices, f)
+        try:
+            code, out, err = run_cli(
+                ["--batch", "--dry-run", "--dedupe", "--price-config", f.name, "--budget", "0.001",
+                 "--endpoint", "/v3/serp/google/organic/live/advanced"],
+                stdin,
+                env={"DATAFORSEO_USERNAME": "", "DATAFORSEO_PASSWORD": ""},
+            )
+        finally:
+            os.unlink(f.name)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual([line.get("result", {}).get("estimated_cost") for line in lines], [0.002, 0, None, None])
+        self.assertEqual(lines[2]["status"], "error")
+        self.assertEqual(lines[3]["result"]["tasks"], 1)
+        self.assertIn("Estimated $0.0020 for 2 tasks (1 lines have no price); exceeds budget", err)
+        self.assertEqual(code, 1)
+
+    def test_dry_run_requires_batch_and_prices(self):
+        self.assertEqual(run_cli(["--dry-run", "--endpoint", "/v3/x"], "")[0], 2)
+        code, _, err = run_cli(["--batch", "--dry-run", "--endpoint", "/v3/x"], "", env={"DATAFORSEO_PRICE_CONFIG": ""})
+        self.assertEqual(code, 2)
+        self.assertIn("--price-config", err)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""Test cases for the --serve daemon and the client that forwards CLI calls to it."""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+SCRIPT = os.path.join(SKILL_DIR, "scripts", "dataforseo.py")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, run_cli
+
+CREDENTIALS = {"DATAFORSEO_USERNAME": "user", "DATAFORSEO_PASSWORD": "pass"}
+
+
+def answer(method, path, body):
+    """Echo the GET path or the POSTed keywords as items; a ``fail`` payload gets HTTP 500."""
+    if method == "GET":
+        return make_ai_response(items=[{"path": path}])
+    payloads = json.loads(body)
+    if payloads[0].get("fail"):
+        return 500, {}, b"boom"
+    return make_ai_response(items=[{"keyword": p.get("keyword"), "rank": i} for i, p in enumerate(payloads)])
+
+
+def client(args, stdin="", env=None, cwd=None):
+    """Run the script as a separate process; returns ``(code, stdout_bytes, stderr_bytes)``."""
+    full_env = {k: v for k, v in os.environ.items() if not k.startswith("DATAFORSEO_")}
+    full_env.update(CREDENTIALS)
+    full_env.update(env or {})
+    proc = subprocess.run(
+        [sys.executable, SCRIPT, *args], input=stdin.encode(), capture_output=True, env=full_env, cwd=cwd, timeout=60
+    )
+    return proc.returncode, proc.stdout, proc.stderr
+
+
+class DaemonTestCase(unittest.TestCase):
+    """Start a daemon thread on a temporary socket against a stub API server."""
+
+    @classmethod
+    def setUpClass(cls):
+        from scripts.dataforseo import serve
+
+        cls.tmp = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.tmp, ignore_errors=True)
+        cls.socket_path = os.path.join(cls.tmp, "d.sock")
+        cls.server = StubAPIServer(answer).__enter__()
+        cls.addClassCleanup(cls.server.__exit__, None, None, None)
+        base_url = patch("scripts.dataforseo.BASE_URL", cls.server.base_url)
+        base_url.start()
+        cls.addClassCleanup(base_url.stop)
+        with patch("sys.stderr"):
+            thread = threading.Thread(target=serve, args=(cls.socket_path, 1.0), daemon=True)
+            thread.start()
+            for _ in range(500):
+                if os.path.exists(cls.socket_path):
+                    break
+                threading.Event().wait(0.01)
+        # Runs first: the daemon exits once it has been idle for a second
+        cls.addClassCleanup(thread.join, 10)
+        cls.env = {"DATAFORSEO_SOCKET": cls.socket_path}
+
+    def in_process(self, args, stdin="", env=None):
+        code, out, err = run_cli(args, stdin, env)
+        return code, out.encode(), err.encode()
+
+
+class TestForwarding(DaemonTestCase):
+    """Output through the daemon matches an in-process run byte for byte."""
+
+    def assert_same(self, args, stdin="", env=None):
+        expected = self.in_process(args, stdin, env)
+        requests_before = len(self.server.requests)
+        got = client(args, stdin, {**self.env, **(env or {})})
+        self.assertEqual(got, expected)
+        return requests_before
+
+    def test_single_request(self):
+        before = self.assert_same(["--endpoint", "/v3/test/live", "--fields", "items.*.keyword"], '{"keyword": "a"}')
+        self.assertEqual(len(self.server.requests), before + 1)
+
+    def test_get_request_with_pretty_output(self):
+        self.assert_same(["--endpoint", "/v3/test/ready", "--method", "GET", "--pretty"])
+
+    def test_batch_with_errors_and_exit_status(self):
+        stdin = '{"keyword": "a"}\nnot json\n{"fail": true}\n'
+        self.assert_same(["--batch", "--endpoint", "/v3/test/live", "--max-retries", "0"], stdin)
+
+    def test_csv_items(self):
+        stdin = '{"keyword": "a"}\n{"keyword": "b"}\n'
+        self.assert_same(["--batch", "--endpoint", "/v3/test/live", "--format", "csv"], stdin)
+
+    def test_late_argument_error_and_environment(self):
+        self.assert_same(["--endpoint", "/v3/test/live", "--dry-run"])
+        self.assert_same(["--endpoint", "/v3/test/live"], '{"keyword": "a"}', {"DATAFORSEO_PASSWORD": ""})
+
+    def test_relative_paths_use_client_cwd(self):
+        code, _, _ = client(
+            ["--batch", "--endpoint", "/v3/test/live", "--journal", "run.journal"],
+            '{"keyword": "a"}\n',
+            self.env,
+            cwd=self.tmp,
+        )
+        self.assertEqual(code, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "run.journal")))
+
+
+class TestWarmState(DaemonTestCase):
+    """The daemon keeps connections open between client calls."""
+
+    def test_connection_reused_across_calls(self):
+        for keyword in ("a", "b", "c"):
+            code, _, _ = client(["--endpoint", "/v3/test/live"], json.dumps({"keyword": keyword}), self.env)
+            self.assertEqual(code, 0)
+        ports = {request[3] for request in self.server.requests}
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(ports), 1)
+
+    def test_stale_script_signature_is_refused(self):
+        from scripts.dataforseo import _read_frame
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps({"signature": ["old", 0, 0]}).encode() + b"\n")
+            self.assertEqual(_read_frame(sock.makefile("rb")), (b"s", b""))
+
+
+class TestFallback(unittest.TestCase):
+    """Without a daemon the client runs the command itself."""
+
+    def test_missing_socket_runs_in_process(self):
+        env = {"DATAFORSEO_SOCKET": os.path.join(tempfile.gettempdir(), "no-such-dataforseo.sock")}
+        code, out, err = client(["--endpoint", "/v3/test/live"], "not json", env)
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(out)["status"], "error")
+        self.assertEqual(err, b"")
+
+    def test_argument_errors_never_reach_the_daemon(self):
+        code, _, err = client(["--concurrency"], "", {"DATAFORSEO_SOCKET": "/nonexistent/d.sock"})
+        self.assertEqual(code, 2)
+        self.assertIn(b"usage: dataforseo.py", err)
+
+
+class TestServe(unittest.TestCase):
+    """Socket file handling of serve()."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = os.path.join(self.tmp, "d.sock")
+
+    def test_replaces_stale_socket_and_removes_it_on_exit(self):
+        from scripts.dataforseo import serve
+
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        with patch("sys.stderr"):
+            serve(self.path, idle_timeout=0.05)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_refuses_when_a_daemon_is_listening(self):
+        from scripts.dataforseo import serve
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+            live.bind(self.path)
+            live.listen(1)
+            with self.assertRaises(OSError):
+                serve(self.path, idle_timeout=0.05)
+
+    def test_serve_requires_a_socket_path(self):
+        code, _, err = run_cli(["--serve"], "")
+        self.assertEqual(code, 2)
+        self.assertIn("DATAFORSEO_SOCKET", err)
+
+
+if __name__ == "__main__":
+    unittest.main()
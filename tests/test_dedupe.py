@@ -0,0 +1,165 @@
+"""Test cases for batch payload canonicalization and deduplication."""
+
+import functools
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+
+def echo_keyword(method, path, body):
+    keyword = json.loads(body)[0]["keyword"]
+    return make_ai_response(items=[{"keyword": keyword, "volume": 10}])
+
+
+class TestCanonicalPayload(unittest.TestCase):
+    """Test canonical_payload normalization."""
+
+    def test_keywords_are_normalized_and_keys_sorted(self):
+        from scripts.dataforseo import canonical_payload
+
+        body = {"keywords": ["  Best   Coffee ", "SEO"], "keyword": "\tAI  Agents\n", "target": " example.com "}
+        out = canonical_payload(body)
+        self.assertEqual(out, {"keyword": "ai agents", "keywords": ["best coffee", "seo"], "target": "example.com"})
+        self.assertEqual(list(out), ["keyword", "keywords", "target"])
+        self.assertEqual(body["keyword"], "\tAI  Agents\n")
+
+    def test_defaults_fill_only_missing_prefixes(self):
+        from scripts.dataforseo import canonical_payload
+
+        defaults = {"location_code": 2840, "language_code": "en"}
+        self.assertEqual(
+            canonical_payload({"keyword": "a"}, defaults),
+            {"keyword": "a", "language_code": "en", "location_code": 2840},
+        )
+        self.assertEqual(
+            canonical_payload({"keyword": "a", "location_name": "Germany", "language_code": "de"}, defaults),
+            {"keyword": "a", "language_code": "de", "location_name": "Germany"},
+        )
+
+    def test_arrays_and_scalars(self):
+        from scripts.dataforseo import canonical_payload
+
+        self.assertEqual(canonical_payload([{"keyword": " A"}, 3]), [{"keyword": "a"}, 3])
+        self.assertIsNone(canonical_payload(None, {"location_code": 1}))
+
+
+class TestBatchPlanner(unittest.TestCase):
+    """Test planning and fan-out of duplicate batch lines."""
+
+    def test_iter_batch_sends_each_unique_spec_once(self):
+        from scripts.dataforseo import BatchPlanner, iter_batch
+
+        lines = ['{"keyword": "SEO"}', '{"keyword": " seo "}', "bad", '{"keyword": "sem"}', '{"keyword": "seo"}']
+        sent = []
+
+        def send(spec):
+            sent.append(spec["body"])
+            return {"status": "ok", "result": {"keyword": spec["body"]["keyword"]}}
+
+        planner = BatchPlanner()
+        out = list(iter_batch(lines, send, "/v3/test", planner=planner))
+        # The first spelling of each request is sent as written
+        self.assertEqual(sent, [{"keyword": "SEO"}, {"keyword": "sem"}])
+        self.assertEqual([o.get("result", {}).get("keyword") for o in out], ["SEO", "SEO", None, "sem", "SEO"])
+        self.assertEqual((planner.lines, planner.sent, planner.saved), (4, 2, 2))
+
+    def test_plan_with_packs_fans_out_across_windows(self):
+        from scripts.dataforseo import BatchPlanner, iter_batch
+
+        packs = []
+
+        def send_packed(endpoint, payloads):
+            packs.append(payloads)
+            return [{"status": "ok", "result": [p]} for p in payloads]
+
+        lines = ['{"keyword": "a"}', '{"keyword": "A"}', '{"keyword": "b"}', '{"keyword": "a"}', '{"keyword": "c"}']
+        planner = BatchPlanner()
+        out = list(iter_batch(lines, None, "/v3/test", send_packed=send_packed, pack_size=2, planner=planner))
+        self.assertEqual(packs, [[{"keyword": "a"}], [{"keyword": "b"}], [{"keyword": "c"}]])
+        self.assertEqual([o["result"][0]["keyword"] for o in out], ["a", "a", "b", "a", "c"])
+        self.assertEqual(planner.saved, 2)
+
+    def test_failures_are_not_remembered(self):
+        from scripts.dataforseo import BatchPlanner
+
+        planner = BatchPlanner()
+        spec = {"endpoint": "/v3/test", "method": "POST", "body": {"keyword": "a"}}
+        fail = {"status": "error", "message": "boom"}
+        self.assertEqual(planner.call(spec, lambda s: fail), fail)
+        self.assertEqual(planner.call(spec, lambda s: {"status": "ok", "result": 1}), {"status": "ok", "result": 1})
+        self.assertEqual(planner.sent, 2)
+
+    def test_without_dedupe_only_fills_defaults(self):
+        from scripts.dataforseo import BatchPlanner
+
+        planner = BatchPlanner({"location_code": 2840}, dedupe=False)
+        unique, slots = planner.plan([{"endpoint": "/x", "method": "POST", "body": {"keyword": " A  b", "z": 1}}] * 2)
+        self.assertEqual([s["body"] for s in unique], [{"keyword": " A  b", "z": 1, "location_code": 2840}] * 2)
+        self.assertEqual(list(slots), [0, 1])
+        self.assertEqual(planner.saved, 0)
+
+
+class TestDedupeCLI(unittest.TestCase):
+    """Test --dedupe and default location/language end to end."""
+
+    def test_duplicates_share_one_call_and_report_savings(self):
+        stdin = '{"keyword": "SEO"}\n{"keyword": "seo", "location_code": 2840}\n{"keyword": "sem"}\n'
+        with StubAPIServer(echo_keyword) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, err = run_cli(
+                ["--batch", "--dedupe", "--default-location-code", "2840", "--endpoint", "/v3/test",
+                 "--concurrency", "3"],
+                stdin,
+            )
+
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual([line["result"]["items"][0]["keyword"] for line in lines], ["SEO", "SEO", "sem"])
+        self.assertEqual(len(server.requests), 2)
+        bodies = sorted(json.loads(r[2])[0]["keyword"] for r in server.requests)
+        self.assertEqual(bodies, ["SEO", "sem"])
+        self.assertIn([{"keyword": "SEO", "location_code": 2840}], [json.loads(r[2]) for r in server.requests])
+        self.assertIn("3 batch lines into 2 requests (1 calls saved)", err)
+
+    def test_standard_queue_fans_out_results(self):
+        from scripts import dataforseo
+
+        def handler(method, path, body):
+            if path.endswith("/task_post"):
+                tasks = [{"id": f"id{i}", "status_code": 20100, "result": None} for i, _ in enumerate(json.loads(body))]
+                return make_full_response(tasks=tasks)
+            if path.endswith("/tasks_ready"):
+                return make_full_response(tasks=[{"id": "r", "status_code": 20000,
+                                                  "result": [{"id": "id0"}, {"id": "id1"}]}])
+            return make_full_response(tasks=[{"id": "g", "status_code": 20000, "result": [{"task": path}]}])
+
+        stdin = '{"keyword": "a"}\n{"keyword": "b"}\n{"keyword": "A "}\n'
+        fast = functools.partial(dataforseo.run_standard_tasks, poll_interval=0.01, max_poll_interval=0.02)
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url), \
+                patch("scripts.dataforseo.run_standard_tasks", fast):
+            code, out, err = run_cli(["--batch", "--standard", "--dedupe", "--endpoint", "/v3/x/live/advanced"], stdin)
+
+        self.assertEqual(code, 0)
+        posted = json.loads(next(r[2] for r in server.requests if r[1].endswith("/task_post")))
+        self.assertEqual(posted, [{"keyword": "a"}, {"keyword": "b"}])
+        lines = {json.loads(line)["index"]: json.loads(line) for line in out.splitlines()}
+        self.assertEqual(lines[0]["result"], lines[2]["result"])
+        self.assertEqual(lines[0]["result"], [{"task": "/v3/x/task_get/advanced/id0"}])
+        self.assertIn("(1 calls saved)", err)
+
+    def test_dedupe_requires_batch(self):
+        code, _, _ = run_cli(["--dedupe", "--endpoint", "/v3/test"], "")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 """Test cases for dot-notation field filtering with wildcard support."""
 
+import copy
+import json
 import os
 import sys
 import unittest
@@ -171,5 +173,85 @@ class TestEdgeCases(unittest.TestCase):
         self.assertNotIn("noise", result["level1"]["level2"]["level3"])
 
 
+def _serp_response(n=50):
+    return [
+        {
+            "keyword": "seo",
+            "items_count": n,
+            "items": [
+                {
+                    "type": "organic",
+                    "rank_group": i,
+                    "url": f"https://example.com/{i}",
+                    "title": f"Title {i}",
+                    "rating": {"value": 4.5, "votes_count": i} if i % 3 else None,
+                    "links": [{"url": f"https://example.com/{i}/{j}", "title": "t"} for j in range(i % 4)],
+                }
+                for i in range(n)
+            ],
+        }
+    ]
+
+
+class TestFieldProjector(unittest.TestCase):
+    """Test the compiled single-pass projector against filter_fields."""
+
+    SPECS = [
+        "",
+        "keyword",
+        "*.keyword",
+        "*.items.*.url",
+        "*.items.*.url,*.items.*.title,*.items.*.rank_group",
+        "*.items.*.rating.value,*.items.*.links.*.url,*.keyword",
+        "*.items.*.links.url,*.items_count",
+        "*.items.*",
+        "*.items",
+        "*.*",
+        "*.items[0]",
+        "*.items.*.missing.deeper,*.nope",
+    ]
+
+    def test_matches_filter_fields(self):
+        from scripts.dataforseo import FieldProjector, filter_fields
+
+        data = _serp_response()
+        for spec in self.SPECS:
+            with self.subTest(spec=spec):
+                expected = json.dumps(filter_fields(copy.deepcopy(data), spec))
+                self.assertEqual(json.dumps(FieldProjector(spec).project(data)), expected)
+
+    def test_matches_filter_fields_on_dict_roots(self):
+        from scripts.dataforseo import FieldProjector, filter_fields
+
+        data = {"items": [{"backlinks": 1, "rank": 2, "url": "a"}], "results": {"x": {"score": 1}, "y": {"score": 2}}}
+        for spec in ("items.*.backlinks,items.*.rank", "results.*.score", "items.url", "name,value", "items.*"):
+            with self.subTest(spec=spec):
+                self.assertEqual(FieldProjector(spec).project(data), filter_fields(copy.deepcopy(data), spec))
+
+    def test_overlapping_paths_keep_the_whole_value(self):
+        from scripts.dataforseo import FieldProjector
+
+        data = {"items": [{"url": "a", "title": "t"}, "plain"]}
+        original = copy.deepcopy(data)
+        for spec in ("items,items.*.url", "items.*.url,items", "items.*,items.*.url.x"):
+            with self.subTest(spec=spec):
+                self.assertEqual(FieldProjector(spec).project(data)["items"], original["items"])
+        self.assertEqual(data, original)
+
+    def test_none_and_empty_spec(self):
+        from scripts.dataforseo import FieldProjector
+
+        self.assertIsNone(FieldProjector("a").project(None))
+        data = {"a": 1}
+        self.assertIs(FieldProjector(None).project(data), data)
+        self.assertIs(FieldProjector(" , ").project(data), data)
+
+    def test_compiled_specs_are_cached(self):
+        from scripts.dataforseo import compile_fields
+
+        self.assertIs(compile_fields("a.b,c"), compile_fields("a.b,c"))
+        self.assertIsNot(compile_fields("a.b,c"), compile_fields("c,a.b"))
+
+
 if __name__ == "__main__":
     unittest.main()
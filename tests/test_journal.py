@@ -0,0 +1,224 @@
+"""Test cases for the resumable batch journal (--journal / --resume)."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+NO_RETRIES = {"DATAFORSEO_MAX_RETRIES": "0"}
+
+
+def keyword_handler(failing=()):
+    """Answer each one-task request with its keyword; keywords in *failing* get HTTP 500."""
+
+    def handler(method, path, body):
+        keyword = json.loads(body)[0]["keyword"]
+        if keyword in failing:
+            return 500, {}, b"boom"
+        return make_ai_response(items=[{"keyword": keyword}])
+
+    return handler
+
+
+def packed_handler(method, path, body):
+    tasks = [{"id": "t", "status_code": 20000, "result": [payload]} for payload in json.loads(body)]
+    return make_full_response(tasks=tasks)
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "run.journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def records(self) -> list[dict]:
+        """Return the journal's request records, without the settings header."""
+        with open(self.path, encoding="utf-8") as fp:
+            return [record for record in map(json.loads, fp) if "key" in record]
+
+
+class TestBatchJournal(JournalTestCase):
+    """Test journal records, resume and compaction."""
+
+    def test_resume_answers_finished_requests_and_resends_the_rest(self):
+        from scripts.dataforseo import BatchJournal
+
+        journal = BatchJournal(self.path)
+        ok, failed, pending = (BatchJournal.key("/v3/a", "POST", {"n": n}) for n in range(3))
+        for key in (ok, failed, pending):
+            journal.begin(key)
+        journal.finish(ok, {"status": "ok", "result": {"n": 0}, "cost": 0.01})
+        journal.finish(failed, {"status": "error", "message": "HTTP 500: boom"})
+        journal.close()
+        self.assertEqual([r["status"] for r in self.records()], ["pending"] * 3 + ["ok", "error"])
+
+        resumed = BatchJournal(self.path, resume=True)
+        self.assertEqual(resumed.lookup(ok), {"status": "ok", "result": {"n": 0}, "cost": 0.01})
+        self.assertIsNone(resumed.lookup(failed))
+        self.assertIsNone(resumed.lookup(pending))
+        self.assertEqual(resumed.pending(), 2)
+
+        sent = []
+
+        def send_many(bodies):
+            sent.extend(bodies)
+            # Out of order, as Standard tasks complete
+            return [(1, {"status": "ok", "result": bodies[1]}), (0, {"status": "ok", "result": bodies[0]})]
+
+        out = dict(resumed.run("/v3/a", "POST", [{"n": 0}, {"n": 1}, {"n": 2}], send_many))
+        self.assertEqual(sent, [{"n": 1}, {"n": 2}])
+        self.assertEqual(out, {
+            0: {"status": "ok", "result": {"n": 0}, "cost": 0.01},
+            1: {"status": "ok", "result": {"n": 1}},
+            2: {"status": "ok", "result": {"n": 2}},
+        })
+        self.assertEqual((resumed.resumed, resumed.sent, resumed.failed), (1, 2, 0))
+
+        resumed.compact()
+        resumed.close()
+        records = self.records()
+        self.assertEqual([r["key"] for r in records], [ok, failed, pending])
+        self.assertEqual({r["status"] for r in records}, {"ok"})
+        self.assertEqual(BatchJournal(self.path, resume=True).lookup(pending), {"status": "ok", "result": {"n": 2}})
+
+    def test_torn_last_record_is_ignored(self):
+        from scripts.dataforseo import BatchJournal
+
+        journal = BatchJournal(self.path)
+        key = BatchJournal.key("/v3/a", "POST", {"n": 0})
+        journal.finish(key, {"status": "ok", "result": 1})
+        journal.close()
+        with open(self.path, "a", encoding="utf-8") as fp:
+            fp.write('{"key": "abc", "sta')
+
+        resumed = BatchJournal(self.path, resume=True)
+        other = BatchJournal.key("/v3/a", "POST", {"n": 1})
+        resumed.finish(other, {"status": "ok", "result": 2})
+        resumed.close()
+        again = BatchJournal(self.path, resume=True)
+        self.assertEqual(again.lookup(key), {"status": "ok", "result": 1})
+        self.assertEqual(again.lookup(other), {"status": "ok", "result": 2})
+
+    def test_missing_or_corrupt_results_are_sent_again(self):
+        from scripts.dataforseo import BatchJournal
+
+        journal = BatchJournal(self.path)
+        keys = [BatchJournal.key("/v3/a", "POST", {"n": n}) for n in range(2)]
+        for n, key in enumerate(keys):
+            journal.finish(key, {"status": "ok", "result": n})
+        journal.close()
+        with open(self.path + ".results", "r+b") as fp:
+            fp.write(b"#")  # corrupt the first envelope
+            fp.truncate(fp.seek(0, os.SEEK_END) - 3)  # and cut the second short
+
+        resumed = BatchJournal(self.path, resume=True)
+        self.assertEqual([resumed.lookup(key) for key in keys], [None, None])
+        resumed.close()
+
+
+class TestJournalCLI(JournalTestCase):
+    """Test --journal / --resume end to end."""
+
+    def test_resume_sends_only_failed_lines(self):
+        stdin = "".join(json.dumps({"keyword": f"k{i}"}) + "\n" for i in range(5))
+        argv = ["--batch", "--endpoint", "/v3/test", "--journal", self.path]
+        with StubAPIServer(keyword_handler(failing={"k1", "k3"})) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, first, err = run_cli(argv, stdin, NO_RETRIES)
+        self.assertEqual(code, 0)
+        self.assertIn("Journal: 0 requests resumed, 5 sent (2 failed)", err)
+        self.assertEqual([json.loads(line)["status"] for line in first.splitlines()],
+                         ["ok", "error", "ok", "error", "ok"])
+
+        with StubAPIServer(keyword_handler()) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, second, err = run_cli(argv + ["--resume"], stdin, NO_RETRIES)
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(json.loads(r[2])[0]["keyword"] for r in server.requests), ["k1", "k3"])
+        self.assertIn("Journal: 3 requests resumed, 2 sent (0 failed)", err)
+        lines = [json.loads(line) for line in second.splitlines()]
+        self.assertEqual([line["result"]["items"][0]["keyword"] for line in lines], [f"k{i}" for i in range(5)])
+        self.assertEqual(len(self.records()), 5)
+
+    def test_resume_packed_batch(self):
+        stdin = "".join(json.dumps({"keyword": f"k{i}"}) + "\n" for i in range(6))
+        argv = ["--batch", "--endpoint", "/v3/test", "--pack", "3", "--journal", self.path]
+        with StubAPIServer(packed_handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, first, _ = run_cli(argv, stdin, NO_RETRIES)
+        self.assertEqual(code, 0)
+
+        more = stdin + json.dumps({"keyword": "k6"}) + "\n"
+        with StubAPIServer(packed_handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, second, _ = run_cli(argv + ["--resume"], more, NO_RETRIES)
+        self.assertEqual(code, 0)
+        self.assertEqual([json.loads(r[2]) for r in server.requests], [[{"keyword": "k6"}]])
+        self.assertEqual(second.splitlines()[:6], first.splitlines())
+
+    def test_existing_journal_needs_resume(self):
+        with open(self.path, "w", encoding="utf-8") as fp:
+            fp.write('{"key": "k", "status": "pending"}\n')
+        code, _, err = run_cli(["--batch", "--endpoint", "/v3/test", "--journal", self.path], "")
+        self.assertEqual(code, 2)
+        self.assertIn("--resume", err)
+
+    def test_existing_results_file_needs_resume(self):
+        with open(self.path + ".results", "wb") as fp:
+            fp.write(b'{"status": "ok", "result": 1}')
+        code, _, err = run_cli(["--batch", "--endpoint", "/v3/test", "--journal", self.path], "")
+        self.assertEqual(code, 2)
+        self.assertIn(".results exists", err)
+
+    def test_resume_resends_lines_whose_results_were_lost(self):
+        stdin = "".join(json.dumps({"keyword": f"k{i}"}) + "\n" for i in range(3))
+        argv = ["--batch", "--endpoint", "/v3/test", "--journal", self.path]
+        with StubAPIServer(keyword_handler()) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, first, _ = run_cli(argv, stdin, NO_RETRIES)
+        self.assertEqual(code, 0)
+        os.truncate(self.path + ".results", 0)
+
+        with StubAPIServer(keyword_handler()) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, second, _ = run_cli(argv + ["--resume"], stdin, NO_RETRIES)
+        self.assertEqual(code, 0)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(second, first)
+
+    def test_resume_refuses_different_response_settings(self):
+        stdin = json.dumps({"keyword": "k0"}) + "\n"
+        argv = ["--batch", "--endpoint", "/v3/test", "--journal", self.path]
+        with StubAPIServer(keyword_handler()) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, _, _ = run_cli(argv, stdin, NO_RETRIES)
+        self.assertEqual(code, 0)
+        with open(self.path, encoding="utf-8") as fp:
+            self.assertEqual(json.loads(fp.readline())["settings"]["full_response"], False)
+
+        for extra, changed in (
+            (["--full-response"], "full_response"),
+            (["--filter", '["keyword", "=", "k0"]'], "filter"),
+            (["--fields", "items.*.keyword"], "fields"),
+        ):
+            with self.subTest(changed=changed), StubAPIServer(keyword_handler()) as server, \
+                    patch("scripts.dataforseo.BASE_URL", server.base_url):
+                code, _, err = run_cli(argv + ["--resume", *extra], stdin, NO_RETRIES)
+                self.assertEqual(code, 2)
+                self.assertIn(f"different {changed} settings", err)
+                self.assertEqual(server.requests, [])
+
+    def test_journal_requires_batch(self):
+        code, _, _ = run_cli(["--endpoint", "/v3/test", "--journal", self.path], "{}")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
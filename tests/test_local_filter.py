@@ -0,0 +1,142 @@
+"""Test cases for local evaluation of DataForSEO filter expressions."""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+ITEMS = [
+    {"domain": "a.com", "rank": 900, "dofollow": True, "page_types": ["ecommerce"], "info": {"category": [10994]}},
+    {"domain": "b.org", "rank": 500, "dofollow": False, "page_types": ["blogs"], "info": {"category": [1]}},
+    {"domain": "blog.c.com", "rank": 850, "dofollow": True, "page_types": [], "info": {"category": [10994]}},
+    {"domain": "d.com", "rank": None, "dofollow": True, "page_types": ["news"], "info": {}},
+]
+
+
+def matching(filters, items=ITEMS):
+    from scripts.dataforseo import compile_filter
+
+    predicate = compile_filter(filters)
+    return [item["domain"] for item in items if predicate(item)]
+
+
+class TestConditions(unittest.TestCase):
+    """Test single-condition operators."""
+
+    def test_equality(self):
+        self.assertEqual(matching(["dofollow", "=", False]), ["b.org"])
+        self.assertEqual(matching(["domain", "<>", "a.com"]), ["b.org", "blog.c.com", "d.com"])
+
+    def test_ordering_skips_nulls_and_mismatched_types(self):
+        self.assertEqual(matching(["rank", ">", 800]), ["a.com", "blog.c.com"])
+        self.assertEqual(matching(["rank", "<", 800]), ["b.org"])
+        self.assertEqual(matching(["rank", ">=", 850]), ["a.com", "blog.c.com"])
+        self.assertEqual(matching(["domain", ">", 5]), [])
+
+    def test_membership(self):
+        self.assertEqual(matching(["domain", "in", ["a.com", "d.com"]]), ["a.com", "d.com"])
+        self.assertEqual(matching(["domain", "not_in", ["a.com", "d.com"]]), ["b.org", "blog.c.com"])
+
+    def test_string_operators(self):
+        self.assertEqual(matching(["domain", "contains", "blog"]), ["blog.c.com"])
+        self.assertEqual(matching(["domain", "not_contains", ".com"]), ["b.org"])
+        self.assertEqual(matching(["domain", "like", "%.com"]), ["a.com", "blog.c.com", "d.com"])
+        self.assertEqual(matching(["domain", "like", "_.com"]), ["a.com", "d.com"])
+        self.assertEqual(matching(["domain", "ilike", "B%"]), ["b.org", "blog.c.com"])
+        self.assertEqual(matching(["domain", "not_like", "%.com"]), ["b.org"])
+        self.assertEqual(matching(["domain", "regex", r"^[ab]\."]), ["a.com", "b.org"])
+        self.assertEqual(matching(["domain", "like", "a.%"]), ["a.com"])
+        self.assertEqual(matching(["domain", "match", "BLOG com"]), ["blog.c.com"])
+
+    def test_array_operators_and_dot_paths(self):
+        self.assertEqual(matching(["page_types", "has", "ecommerce"]), ["a.com"])
+        self.assertEqual(matching(["page_types", "has_not", "news"]), ["a.com", "b.org", "blog.c.com"])
+        self.assertEqual(matching(["info.category", "has", 10994]), ["a.com", "blog.c.com"])
+        self.assertEqual(matching(["info.category.0", "=", 1]), ["b.org"])
+
+
+class TestCompound(unittest.TestCase):
+    """Test and/or nesting and normalization."""
+
+    def test_documented_nested_example(self):
+        filters = [
+            ["rank", ">", 800],
+            "and",
+            [["page_types", "has", "ecommerce"], "or", ["info.category", "has", 10994]],
+        ]
+        self.assertEqual(matching(filters), ["a.com", "blog.c.com"])
+
+    def test_and_binds_tighter_than_or(self):
+        filters = [["domain", "=", "b.org"], "or", ["rank", ">", 800], "and", ["dofollow", "=", False]]
+        self.assertEqual(matching(filters), ["b.org"])
+
+    def test_singly_nested_arrays_are_unwrapped_without_mutation(self):
+        filters = [[["rank", ">", 800]], "and", [["dofollow", "=", True]]]
+        original = json.dumps(filters)
+        self.assertEqual(matching(filters), ["a.com", "blog.c.com"])
+        self.assertEqual(matching([["rank", "<", 600]]), ["b.org"])
+        self.assertEqual(json.dumps(filters), original)
+
+    def test_empty_filter_matches_everything(self):
+        self.assertEqual(len(matching([])), 4)
+        self.assertEqual(len(matching(None)), 4)
+
+    def test_invalid_expressions_raise(self):
+        from scripts.dataforseo import compile_filter
+
+        for bad in (["rank", "~", 1], [["rank", ">", 1], "xor", ["rank", "<", 5]], ["rank", "in", 5], [1, 2]):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                compile_filter(bad)
+
+
+class TestFilterCLI(unittest.TestCase):
+    """Test --filter on envelope and item modes."""
+
+    def test_filters_ai_items_before_fields(self):
+        reply = make_ai_response(items=ITEMS)
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--endpoint", "/v3/test/live", "--filter", '["rank", ">", 800]', "--fields", "items.*.domain"], "{}"
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["result"], {"items": [{"domain": "a.com"}, {"domain": "blog.c.com"}]})
+
+    def test_filters_full_results_in_batch(self):
+        reply = make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": [{"items": ITEMS}]}])
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--batch", "--endpoint", "/v3/test/live", "--full-response", "--filter", '["dofollow", "=", false]'],
+                "{}\n",
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual([i["domain"] for i in json.loads(out)["result"][0]["items"]], ["b.org"])
+
+    def test_filters_streamed_items(self):
+        reply = make_ai_response(items=ITEMS)
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--endpoint", "/v3/test/live", "--stream", "--filter", '["domain", "like", "%.com"]',
+                 "--fields", "domain"],
+                "{}",
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(), ['{"domain": "a.com"}', '{"domain": "blog.c.com"}', '{"domain": "d.com"}'])
+
+    def test_invalid_filter_is_a_usage_error(self):
+        code, _, _ = run_cli(["--endpoint", "/v3/test/live", "--filter", '["rank", "~", 1]'], "{}")
+        self.assertEqual(code, 2)
+        code, _, _ = run_cli(["--endpoint", "/v3/test/live", "--filter", "not json"], "{}")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
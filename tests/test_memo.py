@@ -0,0 +1,157 @@
+"""Test cases for the in-process MemoCache and single-flight deduplication."""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoCacheBounds(unittest.TestCase):
+    """Test LRU bounds and TTL."""
+
+    def test_max_entries_evicts_least_recently_used(self):
+        from scripts.dataforseo import CACHE_MISS, MemoCache
+
+        memo = MemoCache(max_entries=2)
+        memo.put("a", 1)
+        memo.put("b", 2)
+        memo.get("a")
+        memo.put("c", 3)
+        self.assertIs(memo.get("b"), CACHE_MISS)
+        self.assertEqual(memo.get("a"), 1)
+        self.assertEqual(memo.get("c"), 3)
+
+    def test_max_bytes(self):
+        from scripts.dataforseo import CACHE_MISS, MemoCache
+
+        memo = MemoCache(max_bytes=25)
+        memo.put("a", "x" * 10)  # 12 bytes as JSON
+        memo.put("b", "y" * 10)
+        memo.put("c", "z" * 10)
+        self.assertIs(memo.get("a"), CACHE_MISS)
+        self.assertEqual(len(memo), 2)
+        memo.put("huge", "h" * 100)
+        self.assertIs(memo.get("huge"), CACHE_MISS)
+
+    def test_ttl_expiry(self):
+        from scripts.dataforseo import CACHE_MISS, MemoCache
+
+        clock = FakeClock()
+        memo = MemoCache(ttl=10, clock=clock)
+        memo.put("a", 1)
+        clock.now = 9.9
+        self.assertEqual(memo.get("a"), 1)
+        clock.now = 10.0
+        self.assertIs(memo.get("a"), CACHE_MISS)
+        self.assertEqual(len(memo), 0)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test that concurrent identical calls share one fetch."""
+
+    def test_concurrent_callers_share_one_fetch(self):
+        from scripts.dataforseo import MemoCache
+
+        memo = MemoCache()
+        calls = []
+        gate = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            gate.wait(1)
+            return {"status": "ok", "result": {"n": 1}}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(memo.call("k", fetch))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"status": "ok", "result": {"n": 1}}] * 8)
+        # Callers get independent envelopes
+        self.assertEqual(len({id(r) for r in results}), 8)
+
+    def test_errors_are_shared_but_not_memoised(self):
+        from scripts.dataforseo import MemoCache
+
+        memo = MemoCache()
+        replies = [{"status": "error", "message": "boom"}, {"status": "ok", "result": 2}]
+        self.assertEqual(memo.call("k", lambda: replies.pop(0))["status"], "error")
+        self.assertEqual(memo.call("k", lambda: replies.pop(0)), {"status": "ok", "result": 2})
+        self.assertEqual(memo.call("k", lambda: self.fail("should be memoised")), {"status": "ok", "result": 2})
+
+
+class TestMakeRequestMemo(unittest.TestCase):
+    """Test make_request with a MemoCache."""
+
+    def test_repeated_and_concurrent_requests_hit_network_once(self):
+        from scripts.dataforseo import MemoCache, Session, make_request
+
+        def handler(method, path, body):
+            time.sleep(0.05)
+            return make_ai_response(items=[{"rank": 1}])
+
+        memo = MemoCache()
+        results = []
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url), \
+                Session() as session:
+
+            def call():
+                results.append(make_request(
+                    "/v3/dataforseo_labs/google/domain_rank_overview/live",
+                    body={"target": "example.com"},
+                    username="u",
+                    password="p",
+                    session=session,
+                    memo=memo,
+                ))
+
+            threads = [threading.Thread(target=call) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            call()
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(r["status"] == "ok" for r in results))
+
+    def test_get_requests_are_memoised(self):
+        from scripts.dataforseo import MemoCache, make_request
+
+        memo = MemoCache()
+        with StubAPIServer() as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            for _ in range(3):
+                make_request(
+                    "/v3/keywords_data/google_trends/categories/live",
+                    method="GET",
+                    username="u",
+                    password="p",
+                    memo=memo,
+                )
+        self.assertEqual(len(server.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
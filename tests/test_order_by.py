@@ -0,0 +1,102 @@
+"""Test cases for local order_by sorting and top-k selection."""
+
+import json
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, run_cli
+
+ITEMS = [
+    {"kw": "a", "info": {"volume": 100}, "cpc": 1.5},
+    {"kw": "b", "info": {"volume": 300}, "cpc": 0.5},
+    {"kw": "c", "info": {"volume": None}, "cpc": 2.0},
+    {"kw": "d", "info": {"volume": 300}, "cpc": 1.0},
+    {"kw": "e", "info": {}, "cpc": 0.1},
+]
+
+
+def keywords(items):
+    return [item["kw"] for item in items]
+
+
+class TestOrderItems(unittest.TestCase):
+    """Test order_items sorting and top-k."""
+
+    def test_desc_with_nulls_last(self):
+        from scripts.dataforseo import order_items
+
+        self.assertEqual(keywords(order_items(ITEMS, ["info.volume,desc"])), ["b", "d", "a", "c", "e"])
+        self.assertEqual(keywords(order_items(ITEMS, ["info.volume"])), ["a", "b", "d", "c", "e"])
+
+    def test_multiple_rules_break_ties(self):
+        from scripts.dataforseo import order_items
+
+        self.assertEqual(keywords(order_items(ITEMS, ["info.volume,desc", "cpc,asc"]))[:2], ["b", "d"])
+        self.assertEqual(keywords(order_items(ITEMS, ["kw,desc"])), ["e", "d", "c", "b", "a"])
+
+    def test_top_uses_a_heap_over_an_iterator(self):
+        from scripts.dataforseo import order_items
+
+        rng = random.Random(7)
+        items = [{"n": rng.randint(0, 50), "s": rng.choice("xyz"), "i": i} for i in range(2000)]
+        rules = ["n,desc", "s,asc"]
+        expected = order_items(items, rules)[:25]
+        self.assertEqual(order_items(iter(items), rules, top=25), expected)
+        self.assertEqual(order_items(iter(items), top=3), items[:3])
+
+    def test_mixed_types_do_not_raise(self):
+        from scripts.dataforseo import order_items
+
+        items = [{"v": "x"}, {"v": 2}, {"v": [1]}, {"v": None}, {"v": 1}]
+        self.assertEqual([i["v"] for i in order_items(items, ["v"])], [1, 2, "x", [1], None])
+        self.assertEqual([i["v"] for i in order_items(items, ["v,desc"])], [2, 1, "x", [1], None])
+
+    def test_invalid_rule(self):
+        from scripts.dataforseo import compile_order_by
+
+        for rule in ("kw,sideways", ",desc"):
+            with self.subTest(rule=rule), self.assertRaises(ValueError):
+                compile_order_by([rule])
+
+
+class TestOrderByCLI(unittest.TestCase):
+    """Test --order-by and --top."""
+
+    def test_single_request(self):
+        reply = make_ai_response(items=ITEMS)
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--endpoint", "/v3/test/live", "--order-by", "info.volume,desc", "--order-by", "cpc",
+                 "--top", "3", "--fields", "items.*.kw"],
+                "{}",
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["result"]["items"], [{"kw": "b"}, {"kw": "d"}, {"kw": "a"}])
+
+    def test_streamed_items_with_filter(self):
+        reply = make_ai_response(items=ITEMS)
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--endpoint", "/v3/test/live", "--stream", "--filter", '["cpc", "<", 1.8]',
+                 "--order-by", "cpc,desc", "--top", "2", "--fields", "kw"],
+                "{}",
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(), ['{"kw": "a"}', '{"kw": "d"}'])
+
+    def test_bad_arguments(self):
+        self.assertEqual(run_cli(["--endpoint", "/v3/x", "--order-by", "kw,up"], "{}")[0], 2)
+        self.assertEqual(run_cli(["--endpoint", "/v3/x", "--top", "0"], "{}")[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
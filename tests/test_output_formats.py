@@ -0,0 +1,134 @@
+"""Test cases for --format output modes and the ItemWriter."""
+
+import io
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+ITEMS = [
+    {"keyword": "seo, tools", "info": {"volume": 1000, "cpc": 1.25}, "tags": ["a", "b"], "note": None},
+    {"keyword": "line\nbreak\ttab", "info": {"volume": 10}, "tags": [], "note": "x"},
+]
+
+
+def write(fmt, field_spec=None, items=ITEMS):
+    from scripts.dataforseo import ItemWriter
+
+    out = io.StringIO()
+    writer = ItemWriter(out, fmt, field_spec)
+    for item in items:
+        writer.write(item)
+    return out.getvalue()
+
+
+class TestItemWriter(unittest.TestCase):
+    """Test row rendering for each item format."""
+
+    def test_csv_columns_from_fields(self):
+        self.assertEqual(
+            write("csv", "items.*.keyword,info.volume,info.cpc,tags"),
+            'keyword,info.volume,info.cpc,tags\n"seo, tools",1000,1.25,"[""a"",""b""]"\n'
+            '"line\nbreak\ttab",10,,[]\n',
+        )
+
+    def test_tsv_escapes_control_characters(self):
+        self.assertEqual(
+            write("tsv", "keyword,note"),
+            "keyword\tnote\nseo, tools\t\nline\\nbreak\\ttab\tx\n",
+        )
+
+    def test_default_columns_are_first_item_leaves(self):
+        self.assertEqual(write("csv").splitlines()[0], "keyword,info.volume,info.cpc,tags,note")
+
+    def test_wildcard_column_gives_list(self):
+        items = [{"links": [{"url": "u1"}, {"url": "u2"}]}]
+        self.assertEqual(write("csv", "links.*.url", items), 'links.*.url\n"[""u1"",""u2""]"\n')
+
+    def test_ndjson_records(self):
+        rows = [json.loads(line) for line in write("ndjson", "keyword,info.volume").splitlines()]
+        self.assertEqual(rows, [
+            {"keyword": "seo, tools", "info.volume": 1000},
+            {"keyword": "line\nbreak\ttab", "info.volume": 10},
+        ])
+        self.assertEqual([json.loads(line) for line in write("ndjson").splitlines()], ITEMS)
+
+    def test_output_is_deterministic(self):
+        for fmt in ("csv", "tsv", "ndjson"):
+            self.assertEqual(write(fmt, "keyword,info,tags"), write(fmt, "keyword,info,tags"))
+        shuffled = [{"info": {"cpc": 1.25, "volume": 1000}, "keyword": "seo, tools", "tags": ["a", "b"]}]
+        self.assertEqual(write("csv", "keyword,info", ITEMS[:1]), write("csv", "keyword,info", shuffled))
+
+    def test_no_items_no_output(self):
+        self.assertEqual(write("csv", "keyword", []), "")
+
+
+class TestFormatCLI(unittest.TestCase):
+    """Test --format across CLI modes."""
+
+    def run_with(self, reply, argv, stdin="{}"):
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            return run_cli(argv, stdin)
+
+    def test_single_csv(self):
+        code, out, _ = self.run_with(
+            make_ai_response(items=ITEMS),
+            ["--endpoint", "/v3/t/live", "--format", "csv", "--fields", "items.*.keyword,info.volume"],
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(out, 'keyword,info.volume\n"seo, tools",1000\n"line\nbreak\ttab",10\n')
+
+    def test_full_response_items_are_flattened_across_results(self):
+        results = [{"items": ITEMS[:1]}, {"items": ITEMS[1:]}]
+        reply = make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": results}])
+        code, out, _ = self.run_with(
+            reply, ["--endpoint", "/v3/t/live", "--full-response", "--format", "tsv", "--fields", "info.volume"]
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "info.volume\n1000\n10\n")
+
+    def test_json_compact(self):
+        code, out, _ = self.run_with(
+            make_ai_response(items=[{"a": 1}]), ["--endpoint", "/v3/t/live", "--format", "json-compact"]
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(out.strip(), json.dumps(json.loads(out), separators=(",", ":")))
+
+    def test_stream_tsv(self):
+        code, out, _ = self.run_with(
+            make_ai_response(items=ITEMS),
+            ["--endpoint", "/v3/t/live", "--stream", "--format", "tsv", "--fields", "keyword"],
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "keyword\nseo, tools\nline\\nbreak\\ttab\n")
+
+    def test_batch_csv_reports_failed_lines_on_stderr(self):
+        code, out, err = self.run_with(
+            make_ai_response(items=ITEMS[:1]),
+            ["--batch", "--endpoint", "/v3/t/live", "--format", "csv", "--fields", "info.volume"],
+            "{}\nnot json\n{}\n",
+        )
+        self.assertEqual(code, 1)
+        self.assertEqual(out, "info.volume\n1000\n1000\n")
+        self.assertEqual(json.loads(err)["index"], 1)
+
+    def test_error_goes_to_stderr_for_csv(self):
+        code, out, err = self.run_with(
+            (401, {}, b"no"), ["--endpoint", "/v3/t/live", "--format", "csv", "--max-retries", "0"]
+        )
+        self.assertEqual(code, 1)
+        self.assertEqual(out, "")
+        self.assertEqual(json.loads(err)["message"], "HTTP 401: Unauthorized")
+
+
+if __name__ == "__main__":
+    unittest.main()
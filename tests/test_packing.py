@@ -0,0 +1,120 @@
+"""Test cases for packing many tasks into one POST array."""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+
+def echo_tasks(method, path, body):
+    """Answer a POST array with one task per payload; "bad" payloads fail."""
+    if method == "GET":
+        return make_ai_response(items=[{"get": path}])
+    tasks = []
+    for payload in json.loads(body):
+        if payload.get("bad"):
+            tasks.append({"id": "x", "status_code": 40501, "status_message": "Invalid Field.", "result": None})
+        else:
+            tasks.append({"id": "t", "status_code": 20000, "status_message": "Ok.", "result": [payload]})
+    return make_full_response(tasks=tasks, tasks_error=sum(t["status_code"] != 20000 for t in tasks))
+
+
+class TestSendPacked(unittest.TestCase):
+    """Test send_packed splitting and per-task validation."""
+
+    def test_one_request_per_pack_and_results_split_in_order(self):
+        from scripts.dataforseo import send_packed
+
+        payloads = [{"keyword": f"k{i}"} for i in range(25)]
+        with StubAPIServer(echo_tasks) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = send_packed("/v3/test/live", payloads, pack_size=10, username="u", password="p")
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual([len(json.loads(r[2])) for r in server.requests], [10, 10, 5])
+        self.assertTrue(all(r[1] == "/v3/test/live" for r in server.requests))
+        self.assertEqual(out, [{"status": "ok", "result": [p]} for p in payloads])
+
+    def test_failed_task_does_not_fail_neighbours(self):
+        from scripts.dataforseo import send_packed
+
+        payloads = [{"keyword": "a"}, {"keyword": "b", "bad": True}, {"keyword": "c"}]
+        with StubAPIServer(echo_tasks) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = send_packed("/v3/test/live", payloads, username="u", password="p")
+        self.assertEqual([o["status"] for o in out], ["ok", "error", "ok"])
+        self.assertIn("40501", out[1]["message"])
+
+    def test_http_failure_fails_every_task_in_the_pack(self):
+        from scripts.dataforseo import send_packed
+
+        with StubAPIServer(lambda m, p, b: (401, {}, b"no")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = send_packed("/v3/test/live", [{"a": 1}, {"a": 2}], username="u", password="p")
+        self.assertEqual(out, [{"status": "error", "message": "HTTP 401: Unauthorized"}] * 2)
+
+    def test_missing_tasks_are_reported(self):
+        from scripts.dataforseo import send_packed
+
+        reply = make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": [1]}])
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            out = send_packed("/v3/test/live", [{"a": 1}, {"a": 2}], username="u", password="p")
+        self.assertEqual(out[0], {"status": "ok", "result": [1]})
+        self.assertEqual(out[1]["status"], "error")
+
+
+class TestPlanPacks(unittest.TestCase):
+    """Test grouping of batch specs into packs."""
+
+    def test_groups_by_endpoint_and_leaves_gets_alone(self):
+        from scripts.dataforseo import _plan_packs
+
+        specs = [
+            {"endpoint": "/a", "method": "POST", "body": {"n": 0}},
+            {"endpoint": "/b", "method": "POST", "body": {"n": 1}},
+            {"endpoint": "/a", "method": "POST", "body": {"n": 2}},
+            {"endpoint": "/a", "method": "GET", "body": None},
+            ValueError("bad"),
+            {"endpoint": "/a", "method": "POST", "body": {"n": 5}},
+        ]
+        jobs = _plan_packs(specs, pack_size=2)
+        self.assertEqual([(positions, packed) for positions, _, packed in jobs], [
+            ([0, 2], True), ([1], True), ([3], False), ([4], False), ([5], True),
+        ])
+
+
+class TestPackedBatchCLI(unittest.TestCase):
+    """Test --batch --pack end to end."""
+
+    def test_packed_batch_keeps_input_order(self):
+        lines = [{"keyword": f"k{i}"} for i in range(7)]
+        lines.insert(3, {"endpoint": "/v3/other/live", "body": {"keyword": "other"}})
+        lines.insert(5, {"endpoint": "/v3/test/live", "method": "GET"})
+        stdin = "".join(json.dumps(line) + "\n" for line in lines)
+        with StubAPIServer(echo_tasks) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--batch", "--endpoint", "/v3/test/live", "--pack", "3", "--concurrency", "2"], stdin
+            )
+        self.assertEqual(code, 0)
+        results = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(results), 9)
+        self.assertEqual(results[3]["result"], [{"keyword": "other"}])
+        self.assertEqual(results[5]["result"]["items"], [{"get": "/v3/test/live.ai"}])
+        keywords = [r["result"][0]["keyword"] for i, r in enumerate(results) if i not in (3, 5)]
+        self.assertEqual(keywords, [f"k{i}" for i in range(7)])
+        # 7 payloads for /v3/test/live in packs of up to 3, 1 for /v3/other, 1 GET
+        self.assertLess(len(server.requests), 9)
+
+    def test_pack_size_bounds(self):
+        code, _, _ = run_cli(["--batch", "--endpoint", "/v3/test", "--pack", "101"], "")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
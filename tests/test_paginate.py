@@ -0,0 +1,134 @@
+"""Test cases for auto-pagination over offset / search_after_token endpoints."""
+
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_full_response, run_cli
+
+
+class Pager:
+    """Stub handler serving *total* numbered items by offset or by token."""
+
+    def __init__(self, total, tokens=False, fail_at=None):
+        self.total = total
+        self.tokens = tokens
+        self.fail_at = fail_at
+        self.bodies = []
+        self.lock = threading.Lock()
+
+    def __call__(self, method, path, body):
+        task = json.loads(body)[0]
+        with self.lock:
+            self.bodies.append(task)
+        if self.tokens:
+            start = int(task.get("search_after_token", "0"))
+        else:
+            start = task.get("offset", 0)
+        if self.fail_at is not None and start >= self.fail_at:
+            return (500, {}, b"boom")
+        items = [{"n": n, "url": f"https://e.com/{n}"} for n in range(start, min(start + task["limit"], self.total))]
+        result = {"total_count": self.total, "items_count": len(items), "items": items}
+        if self.tokens and start + len(items) < self.total:
+            result["search_after_token"] = str(start + len(items))
+        return make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": [result]}])
+
+
+class TestPaginate(unittest.TestCase):
+    """Test the paginate() generator."""
+
+    def run_pager(self, pager, **kwargs):
+        from scripts.dataforseo import paginate
+
+        with StubAPIServer(pager) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            items = list(paginate("/v3/backlinks/backlinks/live", {"target": "e.com"}, username="u", password="p", **kwargs))
+        return items, server
+
+    def test_offset_pages_until_total_count(self):
+        pager = Pager(25)
+        items, server = self.run_pager(pager, page_size=10)
+        self.assertEqual([i["n"] for i in items], list(range(25)))
+        self.assertEqual([(b["offset"] if "offset" in b else 0, b["limit"]) for b in pager.bodies], [(0, 10), (10, 10), (20, 10)])
+        self.assertTrue(server.requests[0][1].endswith("/live"))
+
+    def test_exact_multiple_stops_at_total_count(self):
+        pager = Pager(20)
+        items, _ = self.run_pager(pager, page_size=10)
+        self.assertEqual(len(items), 20)
+        self.assertEqual(len(pager.bodies), 2)
+
+    def test_search_after_token(self):
+        pager = Pager(25, tokens=True)
+        items, _ = self.run_pager(pager, page_size=10)
+        self.assertEqual([i["n"] for i in items], list(range(25)))
+        self.assertNotIn("search_after_token", pager.bodies[0])
+        self.assertEqual([b.get("search_after_token") for b in pager.bodies[1:]], ["10", "20"])
+        self.assertTrue(all("offset" not in b for b in pager.bodies))
+
+    def test_max_items_shrinks_last_request(self):
+        pager = Pager(100)
+        items, _ = self.run_pager(pager, page_size=10, max_items=15)
+        self.assertEqual(len(items), 15)
+        self.assertEqual([b["limit"] for b in pager.bodies], [10, 5])
+
+    def test_limit_is_capped_at_1000(self):
+        pager = Pager(3)
+        self.run_pager(pager, page_size=5000)
+        self.assertEqual(pager.bodies[0]["limit"], 1000)
+
+    def test_next_page_is_prefetched(self):
+        from scripts.dataforseo import paginate
+
+        pager = Pager(30)
+        with StubAPIServer(pager) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            pages = paginate("/v3/test/live", {}, page_size=10, username="u", password="p")
+            next(pages)
+            for _ in range(100):
+                if len(pager.bodies) == 2:
+                    break
+                threading.Event().wait(0.01)
+            self.assertEqual(len(pager.bodies), 2)
+            pages.close()
+
+    def test_failed_page_raises(self):
+        from scripts.dataforseo import APIError
+
+        with self.assertRaises(APIError):
+            self.run_pager(Pager(30, fail_at=10), page_size=10)
+
+
+class TestPaginateCLI(unittest.TestCase):
+    """Test --paginate end to end."""
+
+    def test_writes_items_with_item_relative_fields(self):
+        pager = Pager(25)
+        with StubAPIServer(pager) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--endpoint", "/v3/test/live", "--paginate", "--max-items", "12", "--fields", "items.*.n"],
+                '{"target": "e.com"}',
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual([json.loads(line) for line in out.splitlines()], [{"n": n} for n in range(12)])
+
+    def test_error_exits_nonzero(self):
+        with StubAPIServer(Pager(30, fail_at=0)) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(["--endpoint", "/v3/test/live", "--paginate", "--max-retries", "0"], "{}")
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(out)["status"], "error")
+
+    def test_max_items_requires_paginate(self):
+        code, _, _ = run_cli(["--endpoint", "/v3/test/live", "--max-items", "5"], "{}")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
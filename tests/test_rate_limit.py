@@ -0,0 +1,158 @@
+"""Test cases for the client-side token-bucket rate limiter."""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import EnvVarMixin, MockHTTPResponse, make_ai_response
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEndpointFamily(unittest.TestCase):
+    """Test mapping endpoints to rate-limit families."""
+
+    def test_families(self):
+        from scripts.dataforseo import endpoint_family
+
+        self.assertEqual(endpoint_family("/v3/serp/google/organic/live/advanced"), "serp")
+        self.assertEqual(endpoint_family("/v3/dataforseo_labs/google/ranked_keywords/live"), "dataforseo_labs")
+        self.assertEqual(endpoint_family("/v3/ai_optimization/llm_mentions/search/live"), "ai_optimization")
+        self.assertEqual(endpoint_family("backlinks/summary/live"), "backlinks")
+        self.assertEqual(endpoint_family("/"), "")
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test token bucket accounting with a fake clock."""
+
+    def test_burst_then_queue(self):
+        from scripts.dataforseo import TokenBucket
+
+        clock = FakeClock()
+        bucket = TokenBucket(60, burst=2, clock=clock)  # 1 token/sec
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+        self.assertAlmostEqual(bucket.reserve(), 2.0)
+
+    def test_refills_over_time_up_to_capacity(self):
+        from scripts.dataforseo import TokenBucket
+
+        clock = FakeClock()
+        bucket = TokenBucket(60, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now = 100.0
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertGreater(bucket.reserve(), 0.0)
+
+    def test_default_burst_is_one_second_of_requests(self):
+        from scripts.dataforseo import TokenBucket
+
+        self.assertEqual(TokenBucket(600).capacity, 10)
+        self.assertEqual(TokenBucket(6).capacity, 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test per-family budgets and queue statistics."""
+
+    def test_account_budget_is_shared_across_families(self):
+        from scripts.dataforseo import RateLimiter
+
+        limiter = RateLimiter(default_per_minute=120)
+        self.assertEqual(limiter.reserve("/v3/serp/a"), 0.0)
+        self.assertEqual(limiter.reserve("/v3/backlinks/summary/live"), 0.0)
+        # Two families together exhaust the one account-wide bucket
+        self.assertGreater(limiter.reserve("/v3/dataforseo_labs/a"), 0.0)
+
+    def test_family_override_caps_only_that_family(self):
+        from scripts.dataforseo import RateLimiter
+
+        limiter = RateLimiter(default_per_minute=6000, family_limits={"serp": 60})
+        self.assertEqual(limiter.reserve("/v3/serp/a"), 0.0)
+        self.assertGreater(limiter.reserve("/v3/serp/a"), 0.0)
+        # backlinks only draws from the (roomy) account bucket
+        self.assertEqual(limiter.reserve("/v3/backlinks/summary/live"), 0.0)
+
+    def test_zero_limit_disables_family(self):
+        from scripts.dataforseo import RateLimiter
+
+        limiter = RateLimiter(default_per_minute=1, family_limits={"serp": 0})
+        for _ in range(10):
+            self.assertEqual(limiter.reserve("/v3/serp/a"), 0.0)
+
+    def test_stats_report_queue_time(self):
+        from scripts.dataforseo import RateLimiter
+
+        limiter = RateLimiter(default_per_minute=60)
+        limiter.reserve("/v3/serp/a")
+        wait = limiter.reserve("/v3/serp/a")
+        stats = limiter.stats()["serp"]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["queued"], 1)
+        self.assertAlmostEqual(stats["wait_total"], wait)
+        self.assertAlmostEqual(stats["wait_max"], wait)
+
+    def test_make_request_acquires_before_sending(self):
+        from scripts.dataforseo import RateLimiter, make_request
+
+        limiter = RateLimiter()
+        with patch("urllib.request.urlopen", return_value=MockHTTPResponse(make_ai_response())), \
+                patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire:
+            result = make_request("/v3/serp/test", username="u", password="p", rate_limiter=limiter)
+        self.assertEqual(result["status"], "ok")
+        acquire.assert_called_once_with("/v3/serp/test")
+
+
+class TestRateLimitEnvVars(EnvVarMixin, unittest.TestCase):
+    """Test DATAFORSEO_RATE_LIMIT* env var parsing."""
+
+    def setUp(self):
+        self._original_env = {}
+
+    def tearDown(self):
+        self.restore_env()
+
+    def test_defaults(self):
+        from scripts.dataforseo import DEFAULT_RATE_LIMIT_PER_MINUTE, get_config
+
+        self.set_env(DATAFORSEO_RATE_LIMIT=None, DATAFORSEO_RATE_LIMIT_SERP=None)
+        config = get_config()
+        self.assertEqual(config["rate_limit"], DEFAULT_RATE_LIMIT_PER_MINUTE)
+        self.assertNotIn("serp", config["rate_limits"])
+
+    def test_family_overrides(self):
+        from scripts.dataforseo import RateLimiter, get_config
+
+        self.set_env(DATAFORSEO_RATE_LIMIT="1000", DATAFORSEO_RATE_LIMIT_DATAFORSEO_LABS="250")
+        config = get_config()
+        self.assertEqual(config["rate_limit"], 1000.0)
+        self.assertEqual(config["rate_limits"]["dataforseo_labs"], 250.0)
+        limiter = RateLimiter.from_config(config)
+        self.assertEqual(limiter.family_limits["dataforseo_labs"], 250.0)
+
+    def test_invalid_value_falls_back_to_default(self):
+        from scripts.dataforseo import DEFAULT_RATE_LIMIT_PER_MINUTE, get_config
+
+        self.set_env(DATAFORSEO_RATE_LIMIT="lots")
+        self.assertEqual(get_config()["rate_limit"], DEFAULT_RATE_LIMIT_PER_MINUTE)
+
+
+if __name__ == "__main__":
+    unittest.main()
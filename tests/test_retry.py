@@ -0,0 +1,171 @@
+"""Test cases for retry with exponential backoff and full jitter."""
+
+import email.utils
+import http.client
+import os
+import ssl
+import sys
+import time
+import unittest
+import urllib.error
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response
+
+
+def http_error(code, headers=None):
+    return urllib.error.HTTPError("https://api.dataforseo.com/v3/test", code, "err", headers or {}, None)
+
+
+class TestRetryClassification(unittest.TestCase):
+    """Test which failures are considered transient."""
+
+    def test_http_statuses(self):
+        from scripts.dataforseo import RetryPolicy
+
+        for code in (429, 500, 502, 503, 504):
+            self.assertTrue(RetryPolicy.is_retryable(http_error(code)), code)
+        for code in (400, 401, 403, 404):
+            self.assertFalse(RetryPolicy.is_retryable(http_error(code)), code)
+
+    def test_network_errors(self):
+        from scripts.dataforseo import RetryPolicy
+
+        self.assertTrue(RetryPolicy.is_retryable(urllib.error.URLError(ConnectionResetError())))
+        self.assertTrue(RetryPolicy.is_retryable(urllib.error.URLError(http.client.RemoteDisconnected())))
+        self.assertTrue(RetryPolicy.is_retryable(TimeoutError()))
+        self.assertFalse(RetryPolicy.is_retryable(urllib.error.URLError(ssl.SSLCertVerificationError())))
+        self.assertFalse(RetryPolicy.is_retryable(urllib.error.URLError("unknown url type")))
+
+    def test_api_status_codes(self):
+        from scripts.dataforseo import APIError, RetryPolicy
+
+        self.assertTrue(RetryPolicy.is_retryable(APIError("x", 50000)))
+        self.assertTrue(RetryPolicy.is_retryable(APIError("x", 50301)))
+        self.assertTrue(RetryPolicy.is_retryable(APIError("x", 40202)))
+        self.assertFalse(RetryPolicy.is_retryable(APIError("x", 40501)))
+        self.assertFalse(RetryPolicy.is_retryable(APIError("x")))
+        self.assertFalse(RetryPolicy.is_retryable(ValueError("bad json")))
+
+    def test_validation_raises_api_error_with_code(self):
+        from scripts.dataforseo import APIError, validate_full_response
+
+        response = make_full_response(
+            tasks=[{"id": "t", "status_code": 50000, "status_message": "Internal Error.", "result": None}]
+        )
+        with self.assertRaises(APIError) as ctx:
+            validate_full_response(response)
+        self.assertEqual(ctx.exception.code, 50000)
+        self.assertIsInstance(ctx.exception, ValueError)
+
+
+class TestRetryDelays(unittest.TestCase):
+    """Test backoff, jitter, Retry-After and the total time cap."""
+
+    def test_full_jitter_exponential_backoff(self):
+        from scripts.dataforseo import RetryPolicy
+
+        policy = RetryPolicy(max_retries=5, base_delay=1.0, max_delay=5.0, max_total=100.0, rand=lambda: 1.0)
+        delays = [policy.next_delay(n, http_error(503), 0.0) for n in range(5)]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0, 5.0])
+        policy = RetryPolicy(base_delay=1.0, rand=lambda: 0.25)
+        self.assertEqual(policy.next_delay(2, http_error(503), 0.0), 1.0)
+
+    def test_gives_up_after_max_retries(self):
+        from scripts.dataforseo import RetryPolicy
+
+        policy = RetryPolicy(max_retries=2)
+        self.assertIsNotNone(policy.next_delay(1, http_error(503), 0.0))
+        self.assertIsNone(policy.next_delay(2, http_error(503), 0.0))
+
+    def test_non_retryable_error_gives_up_immediately(self):
+        from scripts.dataforseo import RetryPolicy
+
+        self.assertIsNone(RetryPolicy().next_delay(0, http_error(400), 0.0))
+
+    def test_retry_after_seconds_is_honoured(self):
+        from scripts.dataforseo import RetryPolicy
+
+        policy = RetryPolicy(rand=lambda: 0.0)
+        self.assertEqual(policy.next_delay(0, http_error(429, {"Retry-After": "7"}), 0.0), 7.0)
+
+    def test_retry_after_http_date_is_honoured(self):
+        from scripts.dataforseo import RetryPolicy
+
+        when = email.utils.formatdate(time.time() + 10, usegmt=True)
+        delay = RetryPolicy().next_delay(0, http_error(503, {"Retry-After": when}), 0.0)
+        self.assertGreater(delay, 5.0)
+        self.assertLessEqual(delay, 10.0)
+
+    def test_total_time_cap(self):
+        from scripts.dataforseo import RetryPolicy
+
+        policy = RetryPolicy(max_total=10.0, rand=lambda: 1.0)
+        self.assertIsNone(policy.next_delay(0, http_error(429, {"Retry-After": "30"}), 0.0))
+        self.assertIsNone(policy.next_delay(0, http_error(503), 9.9))
+
+
+class TestMakeRequestRetries(unittest.TestCase):
+    """Test make_request retry behaviour against a stub server."""
+
+    def _fast_policy(self, **kwargs):
+        from scripts.dataforseo import RetryPolicy
+
+        return RetryPolicy(base_delay=0.001, max_delay=0.01, **kwargs)
+
+    def test_recovers_from_transient_http_errors(self):
+        from scripts.dataforseo import Session, make_request
+
+        replies = [(503, {}, b"busy"), (429, {"Retry-After": "0"}, b"slow down"), make_ai_response()]
+        with StubAPIServer(lambda m, p, b: replies.pop(0)) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url), Session() as session:
+            result = make_request("/v3/test", username="u", password="p", session=session, retry=self._fast_policy())
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(len(server.requests), 3)
+
+    def test_recovers_from_api_50000_status(self):
+        from scripts.dataforseo import make_request
+
+        replies = [make_ai_response(status_code=50000, status_message="Internal Error."), make_ai_response()]
+        with StubAPIServer(lambda m, p, b: replies.pop(0)) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            result = make_request("/v3/test", username="u", password="p", retry=self._fast_policy())
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(len(server.requests), 2)
+
+    def test_does_not_retry_client_errors(self):
+        from scripts.dataforseo import make_request
+
+        with StubAPIServer(lambda m, p, b: (401, {}, b"no")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            result = make_request("/v3/test", username="u", password="p", retry=self._fast_policy())
+        self.assertEqual(result, {"status": "error", "message": "HTTP 401: Unauthorized"})
+        self.assertEqual(len(server.requests), 1)
+
+    def test_returns_last_error_when_retries_exhausted(self):
+        from scripts.dataforseo import make_request
+
+        with StubAPIServer(lambda m, p, b: (502, {}, b"bad gateway")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            result = make_request("/v3/test", username="u", password="p", retry=self._fast_policy(max_retries=2))
+        self.assertEqual(result["status"], "error")
+        self.assertIn("HTTP 502", result["message"])
+        self.assertEqual(len(server.requests), 3)
+
+    def test_no_retry_without_policy(self):
+        from scripts.dataforseo import make_request
+
+        with StubAPIServer(lambda m, p, b: (503, {}, b"busy")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            make_request("/v3/test", username="u", password="p")
+        self.assertEqual(len(server.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Test cases for the keep-alive connection pool (Session)."""
+
+import json
+import os
+import sys
+import threading
+import unittest
+import urllib.error
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response
+
+
+class TestSessionPooling(unittest.TestCase):
+    """Test that a Session reuses keep-alive connections."""
+
+    def test_sequential_requests_share_one_connection(self):
+        from scripts.dataforseo import Session
+
+        with StubAPIServer() as server, Session() as session:
+            for _ in range(5):
+                resp = session.request("POST", server.base_url + "/v3/test", body=b"[]")
+                self.assertEqual(resp.status, 200)
+            self.assertEqual(len(server.requests), 5)
+            self.assertEqual(len(server.client_ports), 1)
+
+    def test_without_session_each_request_opens_a_connection(self):
+        from scripts.dataforseo import make_request
+
+        with StubAPIServer() as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            for _ in range(3):
+                result = make_request("/v3/test", body={"keyword": "seo"}, username="u", password="p")
+                self.assertEqual(result["status"], "ok")
+            self.assertEqual(len(server.client_ports), 3)
+
+    def test_pool_is_bounded_per_host(self):
+        from scripts.dataforseo import Session
+
+        release = threading.Event()
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def handler(method, path, body):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            release.wait(0.2)
+            with lock:
+                active.pop()
+            return make_ai_response()
+
+        with StubAPIServer(handler) as server, Session(max_per_host=2) as session:
+            threads = [
+                threading.Thread(target=session.request, args=("GET", server.base_url + "/v3/test"))
+                for _ in range(6)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertLessEqual(max(peak), 2)
+            self.assertLessEqual(len(server.client_ports), 2)
+
+    def test_http_error_status_raises_http_error(self):
+        from scripts.dataforseo import Session
+
+        with StubAPIServer(lambda m, p, b: (403, {}, {"error": "forbidden"})) as server, Session() as session:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                session.request("GET", server.base_url + "/v3/test")
+            self.assertEqual(ctx.exception.code, 403)
+
+    def test_connection_refused_raises_url_error(self):
+        from scripts.dataforseo import Session
+
+        with StubAPIServer() as server:
+            url = server.base_url
+        with Session() as session, self.assertRaises(urllib.error.URLError):
+            session.request("GET", url + "/v3/test")
+
+
+class TestMakeRequestWithSession(unittest.TestCase):
+    """Test make_request over a pooled Session."""
+
+    def test_full_response_over_session(self):
+        from scripts.dataforseo import Session, make_request
+
+        with StubAPIServer(lambda m, p, b: make_full_response()) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url), Session() as session:
+            result = make_request(
+                "/v3/test",
+                body={"keyword": "seo"},
+                full_response=True,
+                username="u",
+                password="p",
+                session=session,
+            )
+            self.assertEqual(result, {"status": "ok", "result": [{"some": "data"}]})
+            method, path, body, _ = server.requests[0]
+            self.assertEqual((method, path), ("POST", "/v3/test"))
+            self.assertEqual(json.loads(body), [{"keyword": "seo"}])
+
+    def test_http_error_over_session_produces_error_envelope(self):
+        from scripts.dataforseo import Session, make_request
+
+        with StubAPIServer(lambda m, p, b: (500, {}, b"oops")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url), Session() as session:
+            result = make_request("/v3/test", username="u", password="p", session=session)
+            self.assertEqual(result["status"], "error")
+            self.assertIn("HTTP 500", result["message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
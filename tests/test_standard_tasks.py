@@ -0,0 +1,179 @@
+"""Test cases for the Standard task queue pipeline (task_post / tasks_ready / task_get)."""
+
+import functools
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_full_response, run_cli
+
+
+class FakeTaskQueue:
+    """Stub-server handler emulating DataForSEO's Standard queue.
+
+    Task *n* becomes ready after *n* ``tasks_ready`` polls, so tasks finish
+    out of submission order (or never, with *never_ready*).  Payloads with
+    ``"bad": true`` are rejected.
+    """
+
+    def __init__(self, base="/v3/serp/google/organic", never_ready=False):
+        self.base = base
+        self.never_ready = never_ready
+        self.tasks = {}
+        self.polls = 0
+        self.posts = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, body):
+        with self._lock:
+            if path == f"{self.base}/task_post":
+                self.posts += 1
+                tasks = []
+                for payload in json.loads(body):
+                    if payload.get("bad"):
+                        tasks.append({"id": None, "status_code": 40501, "status_message": "Invalid Field."})
+                        continue
+                    task_id = f"task-{len(self.tasks)}"
+                    ready_at = float("inf") if self.never_ready else (len(self.tasks) % 3) + 1
+                    self.tasks[task_id] = {"payload": payload, "ready_at": ready_at}
+                    tasks.append({"id": task_id, "status_code": 20100, "status_message": "Task Created."})
+                return make_full_response(tasks=tasks)
+            if path == f"{self.base}/tasks_ready":
+                self.polls += 1
+                ready = [{"id": tid} for tid, t in self.tasks.items() if t["ready_at"] <= self.polls and not t.get("got")]
+                return make_full_response(tasks=[{"id": "r", "status_code": 20000, "result": ready}])
+            if path.startswith(f"{self.base}/task_get/advanced/"):
+                task_id = path.rsplit("/", 1)[1]
+                self.tasks[task_id]["got"] = True
+                keyword = self.tasks[task_id]["payload"]["keyword"]
+                return make_full_response(tasks=[{"id": task_id, "status_code": 20000, "result": [{"keyword": keyword}]}])
+        return 404, {}, b"not found"
+
+
+class TestStandardTaskEndpoints(unittest.TestCase):
+    """Test deriving queue endpoints from Live endpoints."""
+
+    def test_serp_live_advanced(self):
+        from scripts.dataforseo import standard_task_endpoints
+
+        self.assertEqual(
+            standard_task_endpoints("/v3/serp/google/organic/live/advanced"),
+            (
+                "/v3/serp/google/organic/task_post",
+                "/v3/serp/google/organic/tasks_ready",
+                "/v3/serp/google/organic/task_get/advanced/{id}",
+            ),
+        )
+
+    def test_live_without_result_type(self):
+        from scripts.dataforseo import standard_task_endpoints
+
+        post, ready, get = standard_task_endpoints("/v3/keywords_data/google_ads/search_volume/live")
+        self.assertEqual(post, "/v3/keywords_data/google_ads/search_volume/task_post")
+        self.assertEqual(ready, "/v3/keywords_data/google_ads/search_volume/tasks_ready")
+        self.assertEqual(get, "/v3/keywords_data/google_ads/search_volume/task_get/{id}")
+
+    def test_base_or_task_post_endpoint(self):
+        from scripts.dataforseo import standard_task_endpoints
+
+        expected = standard_task_endpoints("/v3/on_page/lighthouse")
+        self.assertEqual(standard_task_endpoints("/v3/on_page/lighthouse/task_post"), expected)
+        self.assertEqual(expected[0], "/v3/on_page/lighthouse/task_post")
+
+
+class TestPostTasks(unittest.TestCase):
+    """Test task submission in chunks of 100."""
+
+    def test_chunks_and_per_task_status(self):
+        from scripts.dataforseo import post_tasks
+
+        queue = FakeTaskQueue()
+        payloads = [{"keyword": f"k{i}"} for i in range(150)]
+        payloads[3] = {"keyword": "x", "bad": True}
+        with StubAPIServer(queue) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            outcomes = post_tasks("/v3/serp/google/organic/task_post", payloads, username="u", password="p")
+        self.assertEqual(queue.posts, 2)
+        self.assertEqual(len(outcomes), 150)
+        self.assertEqual(outcomes[3]["status"], "error")
+        self.assertIn("40501", outcomes[3]["message"])
+        self.assertEqual(sum(o["status"] == "ok" for o in outcomes), 149)
+
+
+class TestRunStandardTasks(unittest.TestCase):
+    """Test the full post / poll / download pipeline against the fake queue."""
+
+    def test_every_payload_yields_once_with_its_result(self):
+        from scripts.dataforseo import run_standard_tasks
+
+        queue = FakeTaskQueue()
+        payloads = [{"keyword": f"k{i}"} for i in range(7)] + [{"keyword": "x", "bad": True}]
+        with StubAPIServer(queue) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            results = list(run_standard_tasks(
+                "/v3/serp/google/organic/live/advanced",
+                payloads,
+                poll_interval=0.01,
+                max_poll_interval=0.02,
+                username="u",
+                password="p",
+            ))
+        by_index = dict(results)
+        self.assertEqual(sorted(by_index), list(range(8)))
+        for i in range(7):
+            self.assertEqual(by_index[i], {"status": "ok", "result": [{"keyword": f"k{i}"}]})
+        self.assertEqual(by_index[7]["status"], "error")
+        # Results stream in completion order, not submission order
+        self.assertNotEqual([index for index, _ in results], sorted(index for index, _ in results))
+
+    def test_timeout_reports_pending_tasks(self):
+        from scripts.dataforseo import run_standard_tasks
+
+        queue = FakeTaskQueue(never_ready=True)
+        with StubAPIServer(queue) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            results = list(run_standard_tasks(
+                "/v3/serp/google/organic/live/advanced",
+                [{"keyword": "a"}],
+                poll_interval=0.01,
+                timeout=0.0,
+                username="u",
+                password="p",
+            ))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][1]["status"], "error")
+        self.assertIn("Timed out", results[0][1]["message"])
+
+
+class TestStandardCLI(unittest.TestCase):
+    """Test --batch --standard end to end."""
+
+    def test_standard_batch_output_carries_index(self):
+        from scripts import dataforseo
+
+        fast = functools.partial(dataforseo.run_standard_tasks, poll_interval=0.01, max_poll_interval=0.02)
+        stdin = "".join(json.dumps({"keyword": f"k{i}"}) + "\n" for i in range(5))
+        with StubAPIServer(FakeTaskQueue()) as server, patch("scripts.dataforseo.BASE_URL", server.base_url), \
+                patch("scripts.dataforseo.run_standard_tasks", fast):
+            code, out, _ = run_cli(
+                ["--batch", "--standard", "--endpoint", "/v3/serp/google/organic/live/advanced"], stdin
+            )
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(sorted(line["index"] for line in lines), list(range(5)))
+        for line in lines:
+            self.assertEqual(line["result"], [{"keyword": f"k{line['index']}"}])
+
+    def test_standard_requires_batch(self):
+        code, _, _ = run_cli(["--standard", "--endpoint", "/v3/test"], "")
+        self.assertEqual(code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Startup cost checks for the CLI entry point, based on ``python -X importtime``."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+SCRIPT = os.path.join(SKILL_DIR, "scripts", "dataforseo.py")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+# Modules that only a request going over the network needs.
+NETWORK_MODULES = {
+    "asyncio", "concurrent.futures", "email.utils", "http.client", "socket", "ssl", "tempfile", "urllib.request",
+}
+
+# Opt-in budget for the cumulative time (ms) of the stdlib imports made by
+# ``import scripts.dataforseo``, compilation of the module itself excluded,
+# e.g. DATAFORSEO_IMPORT_BUDGET_MS=40 on a quiet machine.  Wall-clock checks
+# are flaky on loaded runners, so the default suite relies on the
+# deterministic NETWORK_MODULES checks instead.
+IMPORT_BUDGET_MS = os.environ.get("DATAFORSEO_IMPORT_BUDGET_MS")
+
+
+def importtime(args, stdin="", env=None):
+    """Run ``python -X importtime *args*``; return ``(returncode, stdout, {module: (self_us, cumulative_us)})``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        cwd=SKILL_DIR,
+        env={**os.environ, **(env or {})},
+        timeout=60,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            own, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = (int(own), int(cumulative))
+    return proc.returncode, proc.stdout, modules
+
+
+class TestImportTime(unittest.TestCase):
+    """Test what importing the module costs."""
+
+    def test_import_skips_network_modules(self):
+        _, _, modules = importtime(["-c", "import scripts.dataforseo"])
+        self.assertIn("scripts.dataforseo", modules)
+        self.assertEqual(NETWORK_MODULES & set(modules), set())
+
+    @unittest.skipUnless(IMPORT_BUDGET_MS, "set DATAFORSEO_IMPORT_BUDGET_MS to check import time")
+    def test_import_time_within_budget(self):
+        runs = []
+        for _ in range(3):
+            _, _, modules = importtime(["-c", "import scripts.dataforseo"])
+            own, cumulative = modules["scripts.dataforseo"]
+            runs.append((cumulative - own) / 1000)
+        self.assertLess(min(runs), float(IMPORT_BUDGET_MS), f"stdlib imports took {min(runs):.1f} ms")
+
+
+class TestCLIStartup(unittest.TestCase):
+    """Test that short CLI calls never load the network stack."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_argument_error(self):
+        code, _, modules = importtime([SCRIPT])
+        self.assertEqual(code, 2)
+        self.assertEqual(NETWORK_MODULES & set(modules), set())
+
+    def test_cache_hit(self):
+        from scripts.dataforseo import ResponseCache, build_url, request_cache_key
+
+        body = {"keyword": "seo"}
+        key = request_cache_key(build_url("/v3/test"), "POST", [body], "ai")
+        ResponseCache(self.cache_dir).put(key, "/v3/test", {"items": [1]})
+        env = {"DATAFORSEO_USERNAME": "u", "DATAFORSEO_PASSWORD": "p", "DATAFORSEO_CACHE_DIR": self.cache_dir}
+        code, out, modules = importtime([SCRIPT, "--endpoint", "/v3/test"], json.dumps(body), env)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["result"], {"items": [1]})
+        self.assertEqual(NETWORK_MODULES & set(modules), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Test cases for request timing instrumentation, --stats and --trace."""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, run_cli
+
+
+class TestRequestStats(unittest.TestCase):
+    """Test sample aggregation and percentiles."""
+
+    def test_percentiles_per_endpoint_and_phase(self):
+        from scripts.dataforseo import RequestStats
+
+        stats = RequestStats()
+        for ms in range(1, 101):
+            stats.record("/v3/a.ai", {"ttfb": ms / 1000, "parse": 0.001})
+        summary = stats.summary()
+        self.assertEqual(list(summary), ["/v3/a"])
+        self.assertEqual(list(summary["/v3/a"]), ["ttfb", "parse"])
+        self.assertEqual(summary["/v3/a"]["ttfb"], {"count": 100, "p50": 50.0, "p95": 95.0, "p99": 99.0})
+        self.assertIn("/v3/a", stats.format_summary().splitlines()[1])
+
+    def test_timer_and_trace(self):
+        from scripts.dataforseo import RequestStats
+
+        ticks = iter([1.0, 1.25])
+        trace = io.StringIO()
+        stats = RequestStats(trace, clock=lambda: next(ticks))
+        with stats.timer("/v3/a", "fields"):
+            pass
+        line = json.loads(trace.getvalue())
+        self.assertEqual((line["endpoint"], line["kind"], line["fields_ms"]), ("/v3/a", "stage", 250.0))
+        self.assertEqual(stats.summary()["/v3/a"]["fields"]["count"], 1)
+
+
+class TestSessionTimings(unittest.TestCase):
+    """Test phase timings reported by pooled connections."""
+
+    def test_connection_phases_only_for_new_connections(self):
+        from scripts.dataforseo import Session
+
+        with StubAPIServer() as server, Session() as session:
+            first = session.request("GET", server.base_url + "/v3/a").timings
+            second = session.request("GET", server.base_url + "/v3/a").timings
+        self.assertTrue({"dns", "connect", "ttfb", "download"} <= set(first))
+        self.assertNotIn("tls", first)
+        self.assertEqual(set(second), {"ttfb", "download"})
+        self.assertTrue(all(value >= 0 for value in [*first.values(), *second.values()]))
+
+    def test_failed_address_is_not_charged_to_connect(self):
+        import socket
+        import time
+
+        from scripts.dataforseo import Session
+
+        create_connection = socket.create_connection
+        attempts = []
+
+        def slow_then_real(address, *args):
+            attempts.append(address)
+            if len(attempts) == 1:
+                time.sleep(0.2)
+                raise ConnectionRefusedError("first address down")
+            return create_connection(address, *args)
+
+        with StubAPIServer() as server, Session() as session:
+            port = int(server.base_url.rsplit(":", 1)[1])
+            real = socket.getaddrinfo("127.0.0.1", port, 0, socket.SOCK_STREAM)
+            with patch("socket.getaddrinfo", return_value=real * 2), \
+                    patch("socket.create_connection", slow_then_real):
+                timings = session.request("GET", server.base_url + "/v3/a").timings
+        self.assertEqual(len(attempts), 2)
+        self.assertLess(timings["connect"], 0.1)
+        self.assertLess(timings["dns"], 0.1)
+
+
+class TestMakeRequestTimings(unittest.TestCase):
+    """Test that make_request records every attempt."""
+
+    def test_ok_and_failed_attempts_are_traced(self):
+        from scripts.dataforseo import RequestStats, Session, make_request
+
+        trace = io.StringIO()
+        stats = RequestStats(trace)
+        replies = iter([make_ai_response(), make_ai_response(status_code=40501)])
+        with StubAPIServer(lambda m, p, b: next(replies)) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url), Session() as session:
+            for _ in range(2):
+                make_request("/v3/test", body={}, username="u", password="p", session=session, stats=stats)
+        lines = [json.loads(line) for line in trace.getvalue().splitlines()]
+        self.assertEqual([line["status"] for line in lines], ["ok", "error"])
+        for key in ("ttfb_ms", "download_ms", "parse_ms", "validate_ms", "total_ms"):
+            self.assertIn(key, lines[1])
+        self.assertEqual(lines[0]["kind"], "request")
+        self.assertGreater(lines[0]["bytes"], 0)
+        self.assertEqual(stats.summary()["/v3/test"]["total"]["count"], 2)
+
+
+class TestStatsCLI(unittest.TestCase):
+    """Test --stats and --trace end to end."""
+
+    def test_stats_summary_and_trace_file(self):
+        with tempfile.TemporaryDirectory() as tmp, StubAPIServer() as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            path = os.path.join(tmp, "trace.jsonl")
+            code, out, err = run_cli(
+                ["--batch", "--endpoint", "/v3/test", "--fields", "items", "--top", "1", "--stats", "--trace", path],
+                '{"k": 1}\n{"k": 2}\n',
+            )
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(code, 0)
+        self.assertEqual(len(out.splitlines()), 2)
+        phases = {line.split()[1] for line in err.splitlines()[1:] if line.startswith("/v3/test")}
+        self.assertTrue({"ttfb", "parse", "validate", "total", "filter", "fields", "serialize"} <= phases)
+        self.assertEqual(sum(line["kind"] == "request" for line in lines), 2)
+        self.assertTrue(any("serialize_ms" in line for line in lines))
+
+    def test_trace_file_error_is_a_usage_error(self):
+        code, _, err = run_cli(["--endpoint", "/v3/test", "--trace", "/nonexistent/dir/trace.jsonl"], "")
+        self.assertEqual(code, 2)
+        self.assertIn("--trace", err)
+
+
+if __name__ == "__main__":
+    unittest.main()
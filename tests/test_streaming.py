@@ -0,0 +1,142 @@
+"""Test cases for incremental parsing of response items."""
+
+import io
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_DIR = os.path.join(PROJECT_ROOT, "dataforseo")
+for _p in (PROJECT_ROOT, SKILL_DIR):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from tests.conftest import StubAPIServer, make_ai_response, make_full_response, run_cli
+
+
+def full_with_items(*item_lists, **kwargs):
+    tasks = [
+        {"id": f"t{i}", "status_code": 20000, "status_message": "Ok.", "result": [{"total_count": len(items), "items": items}]}
+        for i, items in enumerate(item_lists)
+    ]
+    return make_full_response(tasks=tasks, **kwargs)
+
+
+class TestIterResponseItems(unittest.TestCase):
+    """Test iter_response_items over in-memory streams."""
+
+    def parse(self, response, chunk_size=7, envelope=None):
+        from scripts.dataforseo import iter_response_items
+
+        data = response if isinstance(response, bytes) else json.dumps(response).encode("utf-8")
+        return list(iter_response_items(io.BytesIO(data), envelope, chunk_size=chunk_size))
+
+    def test_full_response_items_across_tiny_chunks(self):
+        items = [{"rank": 12345, "title": "café ☃", "nested": {"a": [1, 2.5, None, True]}} for _ in range(20)]
+        envelope = {}
+        self.assertEqual(self.parse(full_with_items(items[:15], items[15:]), envelope=envelope), items)
+        self.assertEqual(envelope["status_code"], 20000)
+        self.assertEqual([t["id"] for t in envelope["tasks"]], ["t0", "t1"])
+        self.assertEqual(envelope["tasks"][0]["result"], [{"total_count": 15}])
+
+    def test_chunk_size_does_not_change_result(self):
+        response = full_with_items([{"n": n, "s": "x" * n} for n in range(50)])
+        expected = self.parse(response, chunk_size=65536)
+        for chunk_size in (1, 2, 3, 64):
+            self.assertEqual(self.parse(response, chunk_size=chunk_size), expected)
+
+    def test_ai_response_items(self):
+        self.assertEqual(self.parse(make_ai_response(items=[{"k": 1}, {"k": 2}])), [{"k": 1}, {"k": 2}])
+
+    def test_null_and_empty_results(self):
+        response = make_full_response(tasks=[{"id": "t", "status_code": 20000, "result": None}])
+        self.assertEqual(self.parse(response), [])
+        self.assertEqual(self.parse(full_with_items([])), [])
+
+    def test_failed_task_raises_before_items(self):
+        from scripts.dataforseo import APIError
+
+        response = make_full_response(
+            tasks=[{"id": "t", "status_code": 40501, "status_message": "Invalid Field.", "result": [{"items": [1]}]}]
+        )
+        with self.assertRaises(APIError):
+            self.parse(response)
+
+    def test_tasks_error_is_checked_at_end(self):
+        from scripts.dataforseo import APIError
+
+        with self.assertRaises(APIError):
+            self.parse(full_with_items([{"a": 1}], tasks_error=1))
+
+    def test_malformed_json_raises(self):
+        with self.assertRaises(ValueError):
+            self.parse(b'{"status_code": 20000, "items": [{"a": 1}, {"b": ')
+
+    def test_items_are_yielded_before_the_stream_is_read(self):
+        from scripts.dataforseo import iter_response_items
+
+        data = json.dumps(full_with_items([{"n": n, "pad": "x" * 100} for n in range(5000)])).encode("utf-8")
+        fp = io.BytesIO(data)
+        items = iter_response_items(fp, chunk_size=4096)
+        self.assertEqual(next(items)["n"], 0)
+        self.assertLess(fp.tell(), len(data) // 10)
+
+
+class TestStreamItems(unittest.TestCase):
+    """Test stream_items over HTTP."""
+
+    def test_streams_over_session_and_reuses_connection(self):
+        from scripts.dataforseo import Session, stream_items
+
+        reply = full_with_items([{"n": n} for n in range(300)])
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            with Session() as session:
+                first = list(stream_items("/v3/test/live", "POST", {"k": 1}, full_response=True, session=session))
+                second = list(stream_items("/v3/test/live", "POST", {"k": 1}, full_response=True, session=session))
+        self.assertEqual([i["n"] for i in first], list(range(300)))
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(server.client_ports)), 1)
+        self.assertEqual(json.loads(server.requests[0][2]), [{"k": 1}])
+
+    def test_retries_before_first_item(self):
+        from scripts.dataforseo import RetryPolicy, stream_items
+
+        calls = []
+
+        def handler(method, path, body):
+            calls.append(path)
+            if len(calls) == 1:
+                return (503, {}, b"busy")
+            return make_ai_response(items=[{"ok": True}])
+
+        retry = RetryPolicy(max_retries=2, base_delay=0.0, rand=lambda: 0.0)
+        with StubAPIServer(handler) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            items = list(stream_items("/v3/test/live", "POST", {}, retry=retry))
+        self.assertEqual(items, [{"ok": True}])
+        self.assertEqual(calls, ["/v3/test/live.ai", "/v3/test/live.ai"])
+
+
+class TestStreamCLI(unittest.TestCase):
+    """Test --stream end to end."""
+
+    def test_writes_projected_items(self):
+        reply = full_with_items([{"keyword": f"k{n}", "cpc": n} for n in range(3)])
+        with StubAPIServer(lambda m, p, b: reply) as server, patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(
+                ["--endpoint", "/v3/test/live", "--full-response", "--stream", "--fields", "items.*.keyword"], "{}"
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(), ['{"keyword": "k0"}', '{"keyword": "k1"}', '{"keyword": "k2"}'])
+
+    def test_http_error_line(self):
+        with StubAPIServer(lambda m, p, b: (401, {}, b"no")) as server, \
+                patch("scripts.dataforseo.BASE_URL", server.base_url):
+            code, out, _ = run_cli(["--endpoint", "/v3/test/live", "--stream"], "{}")
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(out), {"status": "error", "message": "HTTP 401: Unauthorized"})
+
+
+if __name__ == "__main__":
+    unittest.main()